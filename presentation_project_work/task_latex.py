@@ -5,29 +5,47 @@ import shutil
 
 import pytask
 from financial_development_and_income_inequality.config import BLD, PAPER_DIR
-from pytask_latex import compilation_steps as cs
+from financial_development_and_income_inequality.final.document_build import (
+    build_document,
+    document_inputs,
+    undeclared_inputs,
+)
 
 ### document used for compiling the pdf file ###
 document = "financial_development_and_income_inequality_pres"
 
 
-@pytask.mark.latex(
-    script=PAPER_DIR / f"{document}.tex",
-    document=BLD / "latex" / f"{document}.pdf",
-    compilation_steps=cs.latexmk(
-        options=(
-            "--pdf",
-            "--interaction=nonstopmode",
-            "--synctex=1",
-            "--cd",
-            "--quiet",
-            "--shell-escape",
-        ),
-    ),
+# input files (the document and the tables, figures and bibliography it includes)
+@pytask.mark.depends_on(
+    {
+        "document": PAPER_DIR / f"{document}.tex",
+        **{
+            f"input_{i}": path
+            for i, path in enumerate(document_inputs(PAPER_DIR / f"{document}.tex"))
+        },
+    },
 )
+# output file
+@pytask.mark.produces(BLD / "latex" / f"{document}.pdf")
 @pytask.mark.task(id=document)
-def task_compile_document():
-    """Compile the document specified in the latex decorator."""
+def task_compile_document(depends_on, produces):
+    """Compile the document if its content or the content of its inputs has changed, reusing
+    the precompiled preamble (the duration of every stage is stored in the build directory).
+    The inputs are found again when the task runs, such that inputs added to the document
+    after the dependencies were collected are not silently missed.
+    """
+    missing = undeclared_inputs(
+        depends_on["document"],
+        [path for key, path in depends_on.items() if key != "document"],
+    )
+    if missing:
+        raise RuntimeError(
+            "The inputs {} of {} are not declared as dependencies, run pytask again.".format(
+                ", ".join(str(path) for path in missing),
+                depends_on["document"].name,
+            ),
+        )
+    build_document(depends_on["document"], produces.parent)
 
 
 kwargs = {
@@ -0,0 +1,279 @@
+####################################### Descriptive Statistics #######################################
+### the summary statistics (count, mean, standard deviation, minimum, quartiles and     ###
+### maximum) and the correlation matrix of all variables of the final data set are      ###
+### calculated in a single pass over the data, chunk by chunk of observations           ###
+
+### every chunk is reduced to its counts, means and centered cross products (pairwise   ###
+### over the observations where both variables are available, as in pandas) and to a   ###
+### quantile sketch, which are merged with the formulas of Chan, Golub and LeVeque      ###
+### (1979). The chunks are reduced as they are read (in parallel, a bounded number of  ###
+### chunks is submitted ahead) and the merge follows the chunk order                    ###
+
+
+### packages ###
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+
+# quartiles reported in the summary statistics
+default_quantiles = [0.25, 0.5, 0.75]
+
+
+# function that splits a data frame into chunks of observations
+def data_chunks(data, chunk_size=10000):
+    """Splits a data frame into chunks of consecutive observations.
+
+    Parameters:
+    data (pandas.DataFrame): Data frame.
+    chunk_size (int): Number of observations per chunk.
+
+    Returns:
+    chunks (generator): Data frames of (at most) chunk_size observations.
+
+    """
+    for start in range(0, len(data), chunk_size):
+        yield data.iloc[start : start + chunk_size]
+
+
+# function that reduces the size of a quantile sketch
+def compress_sketch(values, weights, sketch_size):
+    """Reduces a weighted sample of sorted values to sketch_size equally weighted points,
+    by interpolating the weighted empirical distribution function.
+
+    Parameters:
+    values (numpy.ndarray): Sorted values.
+    weights (numpy.ndarray): Weight of every value.
+    sketch_size (int): Maximum number of points of the sketch.
+
+    Returns:
+    values (numpy.ndarray): Sorted values of the sketch.
+    weights (numpy.ndarray): Weights of the sketch.
+
+    """
+    if len(values) <= sketch_size:
+        return values, weights
+    total = weights.sum()
+    positions = np.cumsum(weights) - weights / 2
+    targets = (np.arange(sketch_size) + 0.5) * total / sketch_size
+    return np.interp(targets, positions, values), np.full(
+        sketch_size, total / sketch_size
+    )
+
+
+# function that calculates quantiles from a quantile sketch
+def sketch_quantiles(values, weights, quantiles):
+    """Calculates quantiles from a quantile sketch. If the sketch contains all values, the
+    quantiles are exact (linear interpolation, as in pandas).
+
+    Parameters:
+    values (numpy.ndarray): Sorted values of the sketch.
+    weights (numpy.ndarray): Weights of the sketch.
+    quantiles (list): Quantiles.
+
+    Returns:
+    quantiles (numpy.ndarray): Values of the quantiles (NaN for empty sketches).
+
+    """
+    if not len(values):
+        return np.full(len(quantiles), np.nan)
+    if np.all(weights == 1):
+        return np.quantile(values, quantiles)
+    positions = (np.cumsum(weights) - weights / 2) / weights.sum()
+    return np.interp(quantiles, positions, values)
+
+
+# function that reduces a chunk of observations to its moments
+def chunk_moments(values, sketch_size=1000):
+    """Calculates the pairwise counts, means and centered cross products, the minima and
+    maxima and the quantile sketches of a chunk of observations.
+
+    Parameters:
+    values (numpy.ndarray): Observations with shape (observations, variables), NaN if missing.
+    sketch_size (int): Maximum number of points of the quantile sketches.
+
+    Returns:
+    moments (dict): Dictionary containing the pairwise counts ("n"), the means of every
+        variable over the observations of every pair ("mean"), the centered cross products
+        ("cross") and sums of squares ("squares") of every pair, the "minimum", "maximum"
+        and the quantile "sketches" of every variable.
+
+    """
+    present = ~np.isnan(values)
+    # shifting by the chunk means reduces the rounding errors of the cross products
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shift = np.nan_to_num(values.sum(axis=0, where=present) / present.sum(axis=0))
+    X = np.where(present, values - shift, 0)
+    M = present.astype(float)
+    n = M.T @ M
+    sums = X.T @ M
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(n > 0, sums / n, 0)
+    sketches = []
+    for column in range(values.shape[1]):
+        sample = np.sort(values[present[:, column], column])
+        sketches.append(compress_sketch(sample, np.ones(len(sample)), sketch_size))
+    return {
+        "n": n,
+        "mean": mean + shift[:, None],
+        "cross": X.T @ X - mean * sums.T,
+        "squares": (X**2).T @ M - mean * sums,
+        "minimum": np.where(present, values, np.inf).min(axis=0),
+        "maximum": np.where(present, values, -np.inf).max(axis=0),
+        "sketches": sketches,
+    }
+
+
+def _worker_chunk(values, sketch_size):
+    return chunk_moments(values, sketch_size)
+
+
+# function that reduces chunks in worker processes, in the order of the chunks
+# chunks are only submitted while fewer than n_ahead are pending, hence at most n_ahead
+# chunks are held in memory at once
+def parallel_moments(executor, arrays, sketch_size=1000, n_ahead=2):
+    """Reduces the chunks of observations to their moments (see chunk_moments) in the worker
+    processes of an executor, submitting the chunks lazily.
+
+    Parameters:
+    executor (concurrent.futures.Executor): Executor reducing the chunks.
+    arrays (iterable of numpy.ndarray): Observations of every chunk.
+    sketch_size (int): Maximum number of points of the quantile sketches.
+    n_ahead (int): Maximum number of chunks which are submitted but not yet merged.
+
+    Returns:
+    moments (generator): Moments of every chunk, in the order of the chunks.
+
+    """
+    pending = deque()
+    for values in arrays:
+        pending.append(executor.submit(_worker_chunk, values, sketch_size))
+        if len(pending) >= n_ahead:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+# function that merges the moments of two chunks
+def merge_moments(first, second, sketch_size=1000):
+    """Merges the moments of two chunks of observations (see chunk_moments).
+
+    Parameters:
+    first (dict): Moments of the first chunk.
+    second (dict): Moments of the second chunk.
+    sketch_size (int): Maximum number of points of the quantile sketches.
+
+    Returns:
+    moments (dict): Moments of both chunks.
+
+    """
+    n = first["n"] + second["n"]
+    delta = second["mean"] - first["mean"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weight = np.where(n > 0, first["n"] * second["n"] / n, 0)
+        mean = np.where(
+            n > 0,
+            (first["n"] * first["mean"] + second["n"] * second["mean"]) / n,
+            0,
+        )
+    sketches = []
+    for (values_a, weights_a), (values_b, weights_b) in zip(
+        first["sketches"],
+        second["sketches"],
+    ):
+        values = np.concatenate([values_a, values_b])
+        order = np.argsort(values, kind="stable")
+        sketches.append(
+            compress_sketch(
+                values[order],
+                np.concatenate([weights_a, weights_b])[order],
+                sketch_size,
+            ),
+        )
+    return {
+        "n": n,
+        "mean": mean,
+        "cross": first["cross"] + second["cross"] + delta * delta.T * weight,
+        "squares": first["squares"] + second["squares"] + delta**2 * weight,
+        "minimum": np.minimum(first["minimum"], second["minimum"]),
+        "maximum": np.maximum(first["maximum"], second["maximum"]),
+        "sketches": sketches,
+    }
+
+
+# function that calculates the summary statistics and the correlation matrix
+def descriptive_statistics(
+    chunks,
+    quantiles=None,
+    sketch_size=1000,
+    n_workers=1,
+):
+    """Calculates the summary statistics and the (pairwise complete) correlation matrix
+    of all variables in a single pass over the chunks of observations.
+
+    Parameters:
+    chunks (iterable of pandas.DataFrame): Chunks of observations with the same numeric variables.
+    quantiles (list or None): Quantiles reported in the summary statistics. If None, the quartiles.
+    sketch_size (int): Maximum number of points of the quantile sketches. The quantiles are exact
+        for up to sketch_size observations of a variable.
+    n_workers (int): Number of worker processes, each reducing one chunk at a time.
+
+    Returns:
+    summary (pandas.DataFrame): Count, mean, standard deviation, minimum, quantiles and maximum
+        of every variable (as in pandas.DataFrame.describe).
+    correlation (pandas.DataFrame): Correlation matrix of the variables.
+
+    """
+    quantiles = default_quantiles if quantiles is None else quantiles
+    # the variables of the first chunk are used for all chunks
+    chunks = iter(chunks)
+    first = next(chunks)
+    columns = first.columns
+    arrays = (
+        chunk[columns].to_numpy(dtype=float)
+        for chunk in itertools.chain([first], chunks)
+    )
+    with (
+        nullcontext() if n_workers == 1 else ProcessPoolExecutor(max_workers=n_workers)
+    ) as executor:
+        if n_workers == 1:
+            reduced = (chunk_moments(values, sketch_size) for values in arrays)
+        else:
+            reduced = parallel_moments(executor, arrays, sketch_size, 2 * n_workers)
+        moments = next(reduced)
+        for chunk in reduced:
+            moments = merge_moments(moments, chunk, sketch_size)
+
+    count = np.diagonal(moments["n"])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        std = np.sqrt(np.diagonal(moments["squares"]) / (count - 1))
+        correlation = moments["cross"] / np.sqrt(
+            moments["squares"] * moments["squares"].T,
+        )
+    correlation[moments["n"] < 2] = np.nan
+    summary = pd.DataFrame(
+        {
+            "count": count,
+            "mean": np.where(count > 0, np.diagonal(moments["mean"]), np.nan),
+            "std": np.where(count > 1, std, np.nan),
+            "min": np.where(count > 0, moments["minimum"], np.nan),
+            **{
+                f"{quantile:.0%}": values
+                for quantile, values in zip(
+                    quantiles,
+                    np.array(
+                        [
+                            sketch_quantiles(values, weights, quantiles)
+                            for values, weights in moments["sketches"]
+                        ],
+                    ).T,
+                )
+            },
+            "max": np.where(count > 0, moments["maximum"], np.nan),
+        },
+        index=columns,
+    )
+    return summary, pd.DataFrame(correlation, index=columns, columns=columns)
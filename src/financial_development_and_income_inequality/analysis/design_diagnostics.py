@@ -0,0 +1,265 @@
+####################################### Design Diagnostics #######################################
+### The regressors of the OLS and time fixed effects models enter at very different scales ###
+### and the design is exactly collinear (fin_dev_all = fin_dev_db + fin_dev_fb, and       ###
+### edu_att is constant within years). Here, the design matrix is factorized once by a   ###
+### singular value decomposition, which gives the variance inflation factors, condition  ###
+### number, rank and collinear sets of columns, and which is reused for fitting the      ###
+### models of all outcome variables                                                       ###
+
+
+### packages ###
+import numpy as np
+from scipy.linalg import qr
+
+
+# function that factorizes the design matrix
+# the columns are centered (intercept) and scaled to unit length, as in Belsley et al. (1980)
+def factorize_design(design, rcond=1e-10):
+    """Calculates the singular value decomposition of the centered design matrix whose
+    columns are scaled to unit length.
+
+    Parameters:
+    design (numpy.ndarray): Design matrix (without intercept) with shape (observations, regressors).
+    rcond (float): Relative cutoff for small singular values, which determines the rank.
+
+    Returns:
+    factorization (dict): Dictionary containing the column "mean" and "scale", the singular
+        vectors ("U", "Vt"), the singular values ("s"), the "rank" and the number of
+        observations ("nobs").
+
+    """
+    mean = design.mean(axis=0)
+    centered = design - mean
+    scale = np.sqrt((centered**2).sum(axis=0))
+    # constant columns cannot be scaled and are collinear with the intercept
+    scale[scale == 0] = 1
+    U, s, Vt = np.linalg.svd(centered / scale, full_matrices=False)
+    return {
+        "mean": mean,
+        "scale": scale,
+        "U": U,
+        "s": s,
+        "Vt": Vt,
+        "rank": int((s > rcond * s[0]).sum()) if len(s) else 0,
+        "nobs": len(design),
+    }
+
+
+# function that factorizes the design matrix from its cross products
+# used when the design matrix is never built as a whole (e.g. for interaction terms)
+def factorize_cross_products(n_obs, sums, gram, rcond=1e-7):
+    """Calculates the factorization of the design matrix (see factorize_design) from the
+    column sums and cross products of the design, by an eigendecomposition of the centered
+    and scaled cross products. The singular vectors of the observations ("U") are not
+    available. Since the cross products square the condition number, the cutoff for small
+    singular values is larger than for the design matrix itself.
+
+    Parameters:
+    n_obs (int): Number of observations.
+    sums (numpy.ndarray): Column sums of the design matrix with shape (regressors,).
+    gram (numpy.ndarray): Cross products of the design matrix with shape (regressors, regressors).
+    rcond (float): Relative cutoff for small singular values, which determines the rank.
+
+    Returns:
+    factorization (dict): Dictionary containing the column "mean" and "scale", the right
+        singular vectors ("Vt"), the singular values ("s"), the "rank" and the number of
+        observations ("nobs").
+
+    """
+    mean = sums / n_obs
+    centered = gram - n_obs * np.outer(mean, mean)
+    scale = np.sqrt(np.clip(np.diagonal(centered), 0, None))
+    scale[scale <= rcond * scale.max()] = 1
+    eigenvalues, eigenvectors = np.linalg.eigh(centered / np.outer(scale, scale))
+    s = np.sqrt(np.clip(eigenvalues[::-1], 0, None))
+    return {
+        "mean": mean,
+        "scale": scale,
+        "s": s,
+        "Vt": eigenvectors[:, ::-1].T,
+        "rank": int((s > rcond * s[0]).sum()) if len(s) else 0,
+        "nobs": n_obs,
+    }
+
+
+# function that finds the sets of collinear columns
+def collinear_sets(factorization, tol=1e-8):
+    """Finds the sets of columns which are linearly dependent (together with the intercept).
+    The null space of the design is brought to a reduced form with one identity column per
+    basis vector, such that separate linear dependencies do not mix.
+
+    Parameters:
+    factorization (dict): Factorization of the design matrix (see factorize_design).
+    tol (float): Tolerance for the entries of the null space basis.
+
+    Returns:
+    sets (list of list): Column indices of every set of collinear columns.
+
+    """
+    null_space = factorization["Vt"][factorization["rank"] :]
+    if not len(null_space):
+        return []
+    _, _, pivots = qr(null_space, pivoting=True)
+    reduced = np.linalg.solve(null_space[:, pivots[: len(null_space)]], null_space)
+    # columns which appear in the same linear dependency are merged (union-find)
+    parent = list(range(null_space.shape[1]))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    involved = np.abs(reduced) > tol
+    for row in involved:
+        columns = np.flatnonzero(row)
+        for column in columns[1:]:
+            parent[find(column)] = find(columns[0])
+    sets = {}
+    for column in np.flatnonzero(involved.any(axis=0)):
+        sets.setdefault(find(column), []).append(int(column))
+    return list(sets.values())
+
+
+# function that calculates the design diagnostics
+def design_diagnostics(factorization, terms, tol=1e-8):
+    """Calculates the variance inflation factors, condition number, rank and collinear
+    sets of columns from the factorization of the design matrix.
+
+    Parameters:
+    factorization (dict): Factorization of the design matrix (see factorize_design).
+    terms (list): Names of the columns of the design matrix.
+    tol (float): Tolerance for the entries of the null space basis.
+
+    Returns:
+    diagnostics (dict): Dictionary containing the variance inflation factors ("vif", infinite
+        for collinear columns), the "condition_number" of the scaled design, the "rank", the
+        number of columns ("n_columns") and the names of the "collinear_sets".
+
+    """
+    s, Vt, rank = factorization["s"], factorization["Vt"], factorization["rank"]
+    # the VIF of a column is the diagonal element of the inverse correlation matrix
+    vif = ((Vt[:rank] / s[:rank, None]) ** 2).sum(axis=0)
+    sets = collinear_sets(factorization, tol)
+    for columns in sets:
+        vif[columns] = np.inf
+    return {
+        "vif": vif,
+        "condition_number": s[0] / s[-1] if s[-1] > 0 else np.inf,
+        "rank": rank,
+        "n_columns": len(terms),
+        "collinear_sets": [[terms[column] for column in columns] for columns in sets],
+    }
+
+
+# function that marks the columns whose coefficients are not identified
+def collinear_columns(diagnostics, terms):
+    """Marks the columns which belong to a set of collinear columns (see design_diagnostics),
+    whose coefficients are not identified: only the minimum norm solution is reported for
+    them, and their standard errors from the pseudo-inverse are not meaningful.
+
+    Parameters:
+    diagnostics (dict): Design diagnostics (see design_diagnostics).
+    terms (list): Names of the columns.
+
+    Returns:
+    mask (numpy.ndarray): Boolean array with shape (columns,), True for collinear columns.
+
+    """
+    collinear = {term for names in diagnostics["collinear_sets"] for term in names}
+    return np.array([term in collinear for term in terms], dtype=bool)
+
+
+# function that returns the projection onto the identified coefficients
+# the null space of the unscaled design is the scaled null space divided by the scales
+def null_space_projection(factorization):
+    """Calculates the orthogonal projection which removes the null space of the (unscaled)
+    design matrix from coefficient vectors, giving minimum norm solutions.
+
+    Parameters:
+    factorization (dict): Factorization of the design matrix (see factorize_design).
+
+    Returns:
+    projection (numpy.ndarray): Projection matrix with shape (regressors, regressors).
+
+    """
+    scale = factorization["scale"]
+    null_space, _ = np.linalg.qr(
+        factorization["Vt"][factorization["rank"] :].T / scale[:, None]
+    )
+    return np.eye(len(scale)) - null_space @ null_space.T
+
+
+# function that converts coefficients of the orthonormal basis into the original coefficients
+def coefficients_from_basis(factorization, basis_coefficients):
+    """Converts the coefficients of the orthonormal basis of the centered design (the first
+    rank left singular vectors) into the minimum norm coefficients of the original columns.
+
+    Parameters:
+    factorization (dict): Factorization of the design matrix (see factorize_design).
+    basis_coefficients (numpy.ndarray): Coefficients with shape (rank, ...).
+
+    Returns:
+    coefficients (numpy.ndarray): Coefficients with shape (regressors, ...).
+
+    """
+    rank = factorization["rank"]
+    V, s = factorization["Vt"][:rank].T, factorization["s"][:rank]
+    scaled = np.tensordot(V / s, basis_coefficients, axes=1)
+    scaled = scaled / factorization["scale"].reshape((-1,) + (1,) * (scaled.ndim - 1))
+    return np.tensordot(null_space_projection(factorization), scaled, axes=1)
+
+
+# function that calculates the pseudo-inverse of the centered cross products
+def pseudo_inverse_gram(factorization):
+    """Calculates the pseudo-inverse of the cross products of the centered design matrix,
+    from which the covariance matrices of the coefficients are obtained.
+
+    Parameters:
+    factorization (dict): Factorization of the design matrix (see factorize_design).
+
+    Returns:
+    gram_inv (numpy.ndarray): Pseudo-inverse with shape (regressors, regressors).
+
+    """
+    rank, scale = factorization["rank"], factorization["scale"]
+    V, s = factorization["Vt"][:rank].T, factorization["s"][:rank]
+    projection = null_space_projection(factorization)
+    return projection @ (((V / s**2) @ V.T) / np.outer(scale, scale)) @ projection
+
+
+# function that fits linear regression models with the factorized design
+def factorized_least_squares(factorization, Y):
+    """Fits linear regression models with intercept for all outcome variables, using the
+    factorization of the design matrix. For collinear designs, the minimum norm solution
+    and the pseudo-inverse covariance in terms of the original columns are returned, as by
+    a least squares solver applied to the design matrix directly.
+
+    Parameters:
+    factorization (dict): Factorization of the design matrix (see factorize_design).
+    Y (numpy.ndarray): Outcome variables with shape (observations, outcomes).
+
+    Returns:
+    fit (dict): Dictionary containing the "coefficients" (regressors, outcomes), the
+        "intercept" and "rsquared" (outcomes), the "residuals", the "covariance" of the
+        coefficients (outcomes, regressors, regressors) and the residual degrees of
+        freedom ("df_resid").
+
+    """
+    U, nobs = factorization["U"][:, : factorization["rank"]], factorization["nobs"]
+    Y = np.asarray(Y, dtype=float).reshape(nobs, -1)
+    Y_centered = Y - Y.mean(axis=0)
+    projected = U.T @ Y_centered
+    coefficients = coefficients_from_basis(factorization, projected)
+    residuals = Y_centered - U @ projected
+    ssr = (residuals**2).sum(axis=0)
+    df_resid = nobs - factorization["rank"] - 1
+    gram_inv = pseudo_inverse_gram(factorization)
+    return {
+        "coefficients": coefficients,
+        "intercept": Y.mean(axis=0) - factorization["mean"] @ coefficients,
+        "rsquared": 1 - ssr / (Y_centered**2).sum(axis=0),
+        "residuals": residuals,
+        "covariance": (ssr / df_resid)[:, None, None] * gram_inv[None],
+        "df_resid": df_resid,
+    }
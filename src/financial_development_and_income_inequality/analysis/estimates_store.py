@@ -0,0 +1,294 @@
+####################################### Estimates Store #######################################
+### the estimates from the OLS and time fixed effects models are stored as plain  ###
+### numerical arrays in an uncompressed npz container, one row per specification ###
+### (model, group of regressions and outcome variable)                            ###
+
+### the container can be read lazily and every array is memory-mapped, hence     ###
+### tables, plots and comparisons of estimates do not need to unpickle any models ###
+
+
+### packages ###
+import struct
+import zipfile
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+### arrays contained in every estimates store ###
+# per specification arrays with one value for each term
+TERM_FIELDS = ["coefficients", "std_errors", "vif"]
+# per specification arrays with a single value
+SPEC_FIELDS = [
+    "intercept",
+    "rsquared",
+    "nobs",
+    "df_resid",
+    "rank",
+    "condition_number",
+    "collinear_sets",
+]
+# per specification arrays with one value for each pair of terms
+MATRIX_FIELDS = ["covariance", "projection"]
+# per specification metadata
+META_FIELDS = ["model", "group", "outcome"]
+
+
+### Creating the Estimates Store ###
+
+# function that converts the results of the model functions into arrays
+def estimates_to_store(estimates, model):
+    """Converts the results of the OLS or time fixed effects model functions into a
+    dictionary of arrays, with one row per specification.
+
+    Parameters:
+    estimates(dict): Dictionary where each key names a group of regressions (e.g. "ols_model_estimates")
+        and each value is the list of dictionaries returned by the model functions.
+    model(str): Name of the model used for fitting the regressions (e.g. "ols").
+
+    Returns:
+    store(dict): Dictionary of numpy arrays containing the estimates and the specification metadata.
+
+    """
+    results = [
+        (group, result) for group, models in estimates.items() for result in models
+    ]
+    # union of the terms over all specifications, keeping the order of appearance
+    terms = list(
+        dict.fromkeys(term for _, result in results for term in result["terms"])
+    )
+    position = {term: i for i, term in enumerate(terms)}
+
+    store = {
+        "terms": np.array(terms, dtype=str),
+        "model": np.array([model] * len(results), dtype=str),
+        "group": np.array([group for group, _ in results], dtype=str),
+        "outcome": np.array(
+            [str(result["outcome"]) for _, result in results], dtype=str
+        ),
+    }
+    # the design diagnostics are shared by the specifications of one model function,
+    # the variance inflation factors of the dummy variables are not stored
+    diagnostics = [result["diagnostics"] for _, result in results]
+    # terms which are not part of a specification are stored as NaN
+    for field in TERM_FIELDS:
+        values = np.full((len(results), len(terms)), np.nan)
+        for i, (_, result) in enumerate(results):
+            columns = [position[term] for term in result["terms"]]
+            if field in result:
+                values[i, columns] = np.ravel(result[field])
+            else:
+                values[i, columns] = diagnostics[i][field][: len(columns)]
+        store[field] = values
+    for field in MATRIX_FIELDS:
+        values = np.full((len(results), len(terms), len(terms)), np.nan)
+        for i, (_, result) in enumerate(results):
+            columns = [position[term] for term in result["terms"]]
+            values[i, np.ix_(columns, columns)[0], columns] = result[field][0]
+        store[field] = values
+    store["intercept"] = np.array(
+        [np.ravel(result["intercept"])[0] for _, result in results],
+        dtype=float,
+    )
+    store["rsquared"] = np.array(
+        [result["rsquared"] for _, result in results], dtype=float
+    )
+    store["nobs"] = np.array([result["nobs"] for _, result in results], dtype=np.int64)
+    store["df_resid"] = np.array(
+        [result["df_resid"] for _, result in results],
+        dtype=np.int64,
+    )
+    store["rank"] = np.array([d["rank"] for d in diagnostics], dtype=np.int64)
+    store["condition_number"] = np.array(
+        [d["condition_number"] for d in diagnostics],
+        dtype=float,
+    )
+    # collinear sets are stored as text, e.g. "fin_dev_all+fin_dev_db+fin_dev_fb"
+    store["collinear_sets"] = np.array(
+        [
+            ";".join("+".join(names) for names in d["collinear_sets"])
+            for d in diagnostics
+        ],
+        dtype=str,
+    )
+    return store
+
+
+# function that concatenates several estimates stores
+def combine_stores(*stores):
+    """Concatenates several estimates stores into a single one. The terms of the combined
+    store are the union of the terms of all stores.
+
+    Parameters:
+    stores(dict or EstimatesStore): Estimates stores which are combined.
+
+    Returns:
+    combined(dict): Dictionary of numpy arrays containing the estimates of all stores.
+
+    """
+    terms = list(dict.fromkeys(term for store in stores for term in store["terms"]))
+    position = {term: i for i, term in enumerate(terms)}
+
+    combined = {"terms": np.array(terms, dtype=str)}
+    for field in META_FIELDS + SPEC_FIELDS:
+        combined[field] = np.concatenate([np.asarray(store[field]) for store in stores])
+    for field in TERM_FIELDS:
+        blocks = []
+        for store in stores:
+            block = np.full((len(store["model"]), len(terms)), np.nan)
+            block[:, [position[term] for term in store["terms"]]] = store[field]
+            blocks.append(block)
+        combined[field] = np.concatenate(blocks)
+    for field in MATRIX_FIELDS:
+        blocks = []
+        for store in stores:
+            block = np.full((len(store["model"]), len(terms), len(terms)), np.nan)
+            columns = [position[term] for term in store["terms"]]
+            block[:, np.ix_(columns, columns)[0], columns] = store[field]
+            blocks.append(block)
+        combined[field] = np.concatenate(blocks)
+    return combined
+
+
+### Saving and Loading the Estimates Store ###
+
+# function that saves the estimates store
+def save_estimates_store(store, path):
+    """Saves an estimates store in an uncompressed npz container, such that the arrays can
+    be memory-mapped when loading the store.
+
+    Parameters:
+    store(dict or EstimatesStore): Estimates store to be saved.
+    path(pathlib.Path or str): Path of the npz file.
+
+    Returns:
+    None
+
+    """
+    with open(path, "wb") as f:
+        np.savez(f, **{field: np.asarray(store[field]) for field in store})
+
+
+# function that loads the estimates store
+def load_estimates_store(path, mmap_mode="r"):
+    """Loads an estimates store lazily. The arrays are only read once they are accessed.
+
+    Parameters:
+    path(pathlib.Path or str): Path of the npz file.
+    mmap_mode(str or None): Mode used for memory-mapping the arrays. If None, the arrays
+        are read into memory once accessed.
+
+    Returns:
+    store(EstimatesStore): Lazily loaded estimates store.
+
+    """
+    return EstimatesStore(path, mmap_mode=mmap_mode)
+
+
+class EstimatesStore(Mapping):
+    """Read-only mapping from the names of the arrays in an estimates store to the
+    (memory-mapped) arrays.
+    """
+
+    def __init__(self, path, mmap_mode="r"):
+        self.path = path
+        self.mmap_mode = mmap_mode
+        self._arrays = {}
+        with zipfile.ZipFile(path) as archive:
+            self._members = {
+                info.filename.removesuffix(".npy"): info for info in archive.infolist()
+            }
+
+    def __getitem__(self, field):
+        if field not in self._arrays:
+            self._arrays[field] = self._read_array(self._members[field])
+        return self._arrays[field]
+
+    def __iter__(self):
+        return iter(self._members)
+
+    def __len__(self):
+        return len(self._members)
+
+    def _read_array(self, info):
+        # compressed members cannot be memory-mapped and are read with numpy instead
+        if self.mmap_mode is None or info.compress_type != zipfile.ZIP_STORED:
+            with np.load(self.path) as archive:
+                return archive[info.filename.removesuffix(".npy")]
+        with open(self.path, "rb") as f:
+            # the local file header has a fixed size of 30 bytes, followed by the
+            # file name and the extra field
+            f.seek(info.header_offset)
+            header = f.read(30)
+            name_length, extra_length = struct.unpack("<HH", header[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            if np.lib.format.read_magic(f) == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            offset = f.tell()
+        if np.prod(shape) == 0:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(
+            self.path,
+            dtype=dtype,
+            mode=self.mmap_mode,
+            shape=shape,
+            order="F" if fortran_order else "C",
+            offset=offset,
+        )
+
+    def select(self, **criteria):
+        """Returns the row indices of the specifications matching all given metadata values.
+
+        Parameters:
+        criteria: Metadata fields (model, group, outcome) and the values to be matched.
+
+        Returns:
+        rows(numpy.ndarray): Row indices of the matching specifications.
+
+        """
+        return select_specifications(self, **criteria)
+
+
+### Reading the Estimates Store ###
+
+# function that selects the specifications of an estimates store by their metadata
+def select_specifications(store, **criteria):
+    """Returns the row indices of the specifications matching all given metadata values.
+
+    Parameters:
+    store(dict or EstimatesStore): Estimates store.
+    criteria: Metadata fields (model, group, outcome) and the values to be matched.
+
+    Returns:
+    rows(numpy.ndarray): Row indices of the matching specifications.
+
+    """
+    mask = np.ones(len(store["model"]), dtype=bool)
+    for field, value in criteria.items():
+        mask &= np.asarray(store[field]) == value
+    return np.flatnonzero(mask)
+
+
+# function that returns one field of the estimates store as a data frame
+def estimates_frame(store, field="coefficients"):
+    """Returns one field of an estimates store as a data frame, indexed by the
+    specification metadata. Useful for comparing the estimates of two stores.
+
+    Parameters:
+    store(dict or EstimatesStore): Estimates store.
+    field(str): Name of the field (e.g. "coefficients", "std_errors" or "rsquared").
+
+    Returns:
+    frame(pandas.DataFrame): Data frame with one row per specification.
+
+    """
+    index = pd.MultiIndex.from_arrays(
+        [np.asarray(store[name]) for name in META_FIELDS],
+        names=META_FIELDS,
+    )
+    values = np.asarray(store[field])
+    if field in TERM_FIELDS:
+        return pd.DataFrame(values, index=index, columns=np.asarray(store["terms"]))
+    return pd.DataFrame({field: values}, index=index)
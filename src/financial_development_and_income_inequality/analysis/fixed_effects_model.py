@@ -6,13 +6,24 @@
 ### packages ###
 import numpy as np
 import pandas as pd
-from sklearn.impute import SimpleImputer
-from sklearn.linear_model import LinearRegression
+
+from financial_development_and_income_inequality.analysis.design_diagnostics import (
+    collinear_columns,
+    design_diagnostics,
+    factorize_design,
+    factorized_least_squares,
+    null_space_projection,
+)
+from financial_development_and_income_inequality.analysis.least_squares import (
+    model_design,
+    model_variables,
+)
 
 
 # function used for fitting year fixed effects model
 # time fixed effects using linear regression
 # imputed mean values for NaN
+# the design matrix is the same for all outcome variables, hence it is factorized only once
 def fit_fixed_effects_model(data, X, ys, control_vars):
     """Fits multiple linear regression models with time fixed effects, each containing
     different dependent and same independent variables.
@@ -24,45 +35,46 @@ def fit_fixed_effects_model(data, X, ys, control_vars):
     control_vars (list): List of control variables.
 
     Returns:
-    models (list of dict): A list of dictionaries containing the fitted regression models, coefficients,
-        intercepts and R-squared values for each model.
+    models (list of dict): A list of dictionaries containing the coefficients, standard errors,
+        covariance matrices of the coefficients, projections onto the identified coefficients
+        (see null_space_projection), intercepts, R-squared values, number of
+        observations and design diagnostics (see design_diagnostics, including the
+        dummy variables) for each model. The standard errors of coefficients which are
+        not identified (collinear columns, see collinear_columns) are NaN.
 
     """
-    models = []
     # getting dummies according to the variable "Year"
     dummies = pd.get_dummies(data["Year"])
     # transforming column names into string type
     dummies.columns = dummies.columns.astype(str)
 
-    for y in ys:
-        # Concatenating main explanatory, control and dummy variables
-        X_ = pd.concat([X, control_vars, dummies], axis=1)
-
-        # Handling missing values in the data
-        # Imputing mean values for NaN in y and X
-        imp = SimpleImputer(strategy="mean")
-        X_imp = imp.fit_transform(X_)
-        y_imp = imp.fit_transform(y.values.reshape(-1, 1))
-
-        # Fitting the time fixed effects model
-        model = LinearRegression()
-        model.fit(X_imp, y_imp)
-
-        # Extracting statistics of interest
-        # Model coefficients (excluding coefficients of dummy variables)
-        coeff = len(X.columns) + len(control_vars.columns)
-        coeff_interest = model.coef_[:, :coeff]
-        # Intercept
-        intercept = model.intercept_
-        # Coefficient of determination
-        rsquared = np.array(model.score(X_imp, y_imp))
-
+    design, Y, terms = model_design(X, ys, control_vars, dummies)
+    factorization = factorize_design(design)
+    diagnostics = design_diagnostics(factorization, terms)
+    fit = factorized_least_squares(factorization, Y)
+    projection = null_space_projection(factorization)
+    std_errors = np.sqrt(np.diagonal(fit["covariance"], axis1=1, axis2=2))
+    # coefficients of collinear columns are not identified, their standard errors are NaN
+    # (the pseudo-inverse covariance is kept for tests of estimable combinations)
+    std_errors[:, collinear_columns(diagnostics, terms)] = np.nan
+
+    # Extracting statistics of interest (excluding coefficients of dummy variables)
+    coeff = len(X.columns) + len(control_vars.columns)
+    models = []
+    for i, y in enumerate(ys):
         # Adding the results to the list
         results = {
-            "model": model,
-            "coefficients": coeff_interest,
-            "intercept": intercept,
-            "rsquared": rsquared,
+            "coefficients": fit["coefficients"][:coeff, i].reshape(1, -1),
+            "std_errors": std_errors[i, :coeff].reshape(1, -1),
+            "covariance": fit["covariance"][i, :coeff, :coeff][None],
+            "projection": projection[:coeff, :coeff][None],
+            "intercept": fit["intercept"][i].reshape(1),
+            "rsquared": np.array(fit["rsquared"][i]),
+            "nobs": len(design),
+            "df_resid": fit["df_resid"],
+            "outcome": y.name,
+            "terms": terms[:coeff],
+            "diagnostics": diagnostics,
         }
 
         models.append(results)
@@ -83,27 +95,8 @@ def run_fixed_effects_model(data):
     results (list): A list of stats models results for the linear time fixed effect models.
 
     """
-    # main explanatory variables
-    X = data[["fin_dev_all", "fin_dev_db", "fin_dev_fb"]]
-    # outcome variables with leads
-    ys = [
-        data["fin_diff_all_lead"],
-        data["fin_diff_pc_lead"],
-        data["fin_diff_peh_lead"],
-    ]
-    # control variables
-    control_vars = data[
-        [
-            "GDP_nom",
-            "CPI",
-            "gvt_cs",
-            "FSI",
-            "GDP_per_cap",
-            "agri_gdp",
-            "edu_att",
-            "fincri_0708",
-        ]
-    ]
+    # main explanatory, outcome (with leads) and control variables
+    X, ys, control_vars = model_variables(data, leads=True)
     # fitting the models and obtaining results with the defined variables
     models_baseline = fit_fixed_effects_model(data, X, ys, control_vars)
     return models_baseline
@@ -124,23 +117,8 @@ def run_fixed_effects_model_robust(data):
     results (list): A list of stats models results for the linear time fixed effect models.
 
     """
-    # main explanatory variables
-    X = data[["fin_dev_all", "fin_dev_db", "fin_dev_fb"]]
-    # outcome variables with leads
-    ys_robust = [data["fin_diff_all"], data["fin_diff_pc"], data["fin_diff_peh"]]
-    # control variables
-    control_vars = data[
-        [
-            "GDP_nom",
-            "CPI",
-            "gvt_cs",
-            "FSI",
-            "GDP_per_cap",
-            "agri_gdp",
-            "edu_att",
-            "fincri_0708",
-        ]
-    ]
+    # main explanatory, outcome (without leads) and control variables
+    X, ys_robust, control_vars = model_variables(data, leads=False)
     # fitting the models and obtaining results with the defined variables
     models_robust_check = fit_fixed_effects_model(data, X, ys_robust, control_vars)
     return models_robust_check
@@ -0,0 +1,282 @@
+####################################### Forecast Evaluation #######################################
+### Here, it is evaluated whether financial development forecasts the labor cost       ###
+### differences four quarters ahead. The OLS and time fixed effects models are fitted  ###
+### at every forecast origin (expanding or rolling window) and their out-of-sample     ###
+### forecasts are compared with a naive forecast (no change in the outcome variables)  ###
+
+### the cross products of the training window are updated incrementally from one   ###
+### origin to the next and the factorizations of every training window are cached, ###
+### keyed by a fingerprint of the design and the bounds of the training window     ###
+
+
+### packages ###
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from financial_development_and_income_inequality.analysis.least_squares import (
+    model_variables,
+    outcome_variables,
+)
+
+
+# function that calculates the forecasts for a chunk of consecutive origins
+def forecast_chunk(shared, origins, cache=None):
+    """Fits a linear regression model at every origin and forecasts the outcome variables
+    of the respective origin. The cross products of the training window are updated by
+    adding (and removing) observations, instead of being recalculated.
+
+    Parameters:
+    shared (dict): Arrays shared by all origins (see forecast_origins).
+    origins (list): Consecutive forecast origins (row indices).
+    cache (dict or None): Factorizations of the training windows, with the fingerprint of the
+        design and (start, end) of the training window as keys. New factorizations are added
+        to the cache.
+
+    Returns:
+    forecasts (numpy.ndarray): Forecasts with shape (origins, outcomes).
+    factorizations (dict): Factorizations calculated for the chunk.
+
+    """
+    X, X_forecast, Y = shared["X"], shared["X_forecast"], shared["Y"]
+    fingerprint, horizon, window_size, rcond = (
+        shared["fingerprint"],
+        shared["horizon"],
+        shared["window_size"],
+        shared["rcond"],
+    )
+    cache = {} if cache is None else cache
+    factorizations = {}
+    forecasts = np.empty((len(origins), Y.shape[1]))
+    start, end = 0, 0
+    gram = np.zeros((X.shape[1], X.shape[1]))
+    cross = np.zeros((X.shape[1], Y.shape[1]))
+
+    for i, origin in enumerate(origins):
+        # the outcome of an observation is observed "horizon" periods later
+        new_end = origin - horizon + 1
+        new_start = 0 if window_size is None else max(0, new_end - window_size)
+        # adding the new and removing the old observations of the training window
+        added = slice(max(end, new_start), new_end)
+        removed = slice(start, min(end, new_start))
+        if new_start >= end:
+            gram[:], cross[:] = 0, 0
+            added = slice(new_start, new_end)
+            removed = slice(0, 0)
+        gram += X[added].T @ X[added] - X[removed].T @ X[removed]
+        cross += X[added].T @ Y[added] - X[removed].T @ Y[removed]
+        start, end = new_start, new_end
+
+        key = (fingerprint, start, end)
+        if key not in cache:
+            eigenvalues, eigenvectors = np.linalg.eigh(gram)
+            keep = eigenvalues > rcond * eigenvalues.max()
+            cache[key] = factorizations[key] = (
+                eigenvalues[keep],
+                eigenvectors[:, keep],
+            )
+        eigenvalues, eigenvectors = cache[key]
+        coefficients = eigenvectors @ ((eigenvectors.T @ cross) / eigenvalues[:, None])
+        forecasts[i] = X_forecast[origin] @ coefficients
+    return forecasts, factorizations
+
+
+def _worker_chunk(shared, origins):
+    return forecast_chunk(shared, origins)
+
+
+# function that calculates the out-of-sample forecasts at all origins
+def forecast_origins(
+    design,
+    Y,
+    origins,
+    horizon=4,
+    window_size=None,
+    design_forecast=None,
+    cache=None,
+    n_workers=1,
+    rcond=1e-12,
+):
+    """Calculates out-of-sample forecasts of linear regression models (with intercept)
+    fitted with an expanding or rolling window at every forecast origin.
+
+    Parameters:
+    design (numpy.ndarray): Design matrix (without intercept) with shape (observations, regressors).
+    Y (numpy.ndarray): Outcome variables with shape (observations, outcomes). Row t contains the
+        outcome which is observed "horizon" periods after t (e.g. variables with a lead).
+    origins (list): Row indices of the forecast origins.
+    horizon (int): Forecast horizon, i.e. number of periods until the outcome is observed.
+    window_size (int or None): Number of observations in the rolling window. If None, an
+        expanding window is used.
+    design_forecast (numpy.ndarray or None): Design matrix used for the forecasts, if different
+        from the design matrix used for fitting (e.g. carrying the last year effect forward).
+    cache (dict or None): Cache of the factorizations of the training windows, which can be
+        shared by different designs (e.g. of the OLS and time fixed effects models).
+    n_workers (int): Number of worker processes, each working on a chunk of consecutive origins.
+    rcond (float): Relative cutoff for small eigenvalues of the cross product matrix.
+
+    Returns:
+    forecasts (numpy.ndarray): Forecasts with shape (origins, outcomes).
+
+    """
+    design_forecast = design if design_forecast is None else design_forecast
+    # scaling does not change the forecasts, but improves the conditioning
+    # (without centering, regressors which are zero in a training window are dropped)
+    scale = np.sqrt((design**2).mean(axis=0))
+    scale[scale == 0] = 1
+    Y = np.asarray(Y, dtype=float).reshape(len(design), -1)
+    # observations without outcomes do not enter the cross products
+    observed = ~np.isnan(Y).any(axis=1)
+    X = np.column_stack([np.ones(len(design)), design / scale]) * observed[:, None]
+    # the factorizations only depend on the design of the training observations
+    fingerprint = hashlib.sha1(np.ascontiguousarray(X).view(np.uint8)).hexdigest()
+    shared = {
+        "X": X,
+        "fingerprint": f"{X.shape}:{fingerprint}",
+        "X_forecast": np.column_stack(
+            [np.ones(len(design)), design_forecast / scale],
+        ),
+        "Y": np.where(observed[:, None], Y, 0),
+        "horizon": horizon,
+        "window_size": window_size,
+        "rcond": rcond,
+    }
+    if n_workers == 1:
+        forecasts, _ = forecast_chunk(shared, list(origins), cache)
+        return forecasts
+
+    chunks = [list(chunk) for chunk in np.array_split(origins, n_workers) if len(chunk)]
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        results = list(executor.map(_worker_chunk, [shared] * len(chunks), chunks))
+    if cache is not None:
+        for _, factorizations in results:
+            cache.update(factorizations)
+    return np.concatenate([forecasts for forecasts, _ in results])
+
+
+# function that compares the accuracy of two forecasts
+def diebold_mariano_test(errors, errors_benchmark, horizon=4, loss="squared"):
+    """Runs the Diebold-Mariano test of equal forecast accuracy, with the small sample
+    correction of Harvey, Leybourne and Newbold (1997).
+
+    Parameters:
+    errors (numpy.ndarray): Forecast errors with shape (origins, outcomes).
+    errors_benchmark (numpy.ndarray): Forecast errors of the benchmark with the same shape.
+    horizon (int): Forecast horizon, the long-run variance uses horizon - 1 autocovariances.
+    loss (str): Loss function, either "squared" or "absolute".
+
+    Returns:
+    statistic (numpy.ndarray): Test statistics for every outcome (negative values indicate that
+        the forecasts are more accurate than the benchmark).
+    p_value (numpy.ndarray): Two-sided p-values for every outcome.
+
+    """
+    if loss == "squared":
+        differential = errors**2 - errors_benchmark**2
+    else:
+        differential = np.abs(errors) - np.abs(errors_benchmark)
+    n_origins = len(differential)
+    centered = differential - differential.mean(axis=0)
+    long_run_variance = (centered**2).mean(axis=0)
+    for lag in range(1, horizon):
+        long_run_variance += 2 * (centered[lag:] * centered[:-lag]).mean(axis=0)
+    statistic = differential.mean(axis=0) / np.sqrt(long_run_variance / n_origins)
+    correction = (
+        n_origins + 1 - 2 * horizon + horizon * (horizon - 1) / n_origins
+    ) / n_origins
+    statistic = statistic * np.sqrt(correction)
+    p_value = 2 * stats.t.sf(np.abs(statistic), df=n_origins - 1)
+    return statistic, p_value
+
+
+# function that evaluates the forecasts of the OLS or time fixed effects model
+def run_forecast_evaluation(
+    data,
+    model="ols",
+    window_size=None,
+    first_origin=40,
+    horizon=4,
+    n_workers=1,
+    cache=None,
+):
+    """Evaluates the out-of-sample forecasts of the OLS or time fixed effects model for
+    the outcome variables with leads, compared with the naive forecast which assumes
+    that the outcome variables do not change within the forecast horizon.
+
+    The missing values of the explanatory and control variables are forward filled, and
+    backward filled with the first observation at the start. The forecast origins follow
+    the first observation of every regressor, such that no later observations are used. In
+    the time fixed effects model, the effect of the latest year in the training window
+    is used for the forecasts and regressors which are constant within years are
+    excluded, since they are not identified separately from the year effects.
+
+    Parameters:
+    data(pandas.DataFrame): Data frame containing the variables used for fitting the models.
+    model(str): Either "ols" or "fixed_effects".
+    window_size(int or None): Number of observations in the rolling window. If None, an
+        expanding window is used.
+    first_origin(int): Row index of the first forecast origin.
+    horizon(int): Forecast horizon (four quarters for the outcome variables with leads).
+    n_workers(int): Number of worker processes.
+    cache(dict or None): Cache of the factorizations of the training windows.
+
+    Returns:
+    results(dict): Dictionary containing the "forecasts", "naive" forecasts and "actual" values
+        (origins, outcomes), the "rmse", "mae", "rmse_naive" and "mae_naive" of every outcome,
+        the Diebold-Mariano statistics and p-values ("dm_statistic", "dm_p_value"), the
+        "origins" and the names of the "outcomes".
+
+    """
+    X, ys, control_vars = model_variables(data, leads=True)
+    regressors = pd.concat([X, control_vars], axis=1)
+    # row of the first observation of every regressor
+    first_observed = regressors.notna().to_numpy().argmax(axis=0).max()
+    regressors = regressors.ffill().bfill()
+    design = regressors.to_numpy(dtype=float)
+    design_forecast = design
+    if model == "fixed_effects":
+        years = data["Year"].to_numpy()
+        # regressors which are constant within years (edu_att) are absorbed by the year effects
+        design = design[:, (regressors.groupby(years).nunique() > 1).any().to_numpy()]
+        dummies = (years[:, None] == np.unique(years)).astype(float)
+        # the forecast uses the year effect of the last observation in the training window
+        last_training = np.clip(np.arange(len(data)) - horizon, 0, None)
+        design_forecast = np.column_stack([design, dummies[last_training]])
+        design = np.column_stack([design, dummies])
+
+    Y = np.column_stack([y.to_numpy(dtype=float) for y in ys])
+    naive = data[outcome_variables].to_numpy(dtype=float)
+    origins = [
+        origin
+        for origin in range(max(first_origin, first_observed), len(data))
+        if not np.isnan(Y[origin]).any() and not np.isnan(naive[origin]).any()
+    ]
+    forecasts = forecast_origins(
+        design,
+        Y,
+        origins,
+        horizon=horizon,
+        window_size=window_size,
+        design_forecast=design_forecast,
+        cache=cache,
+        n_workers=n_workers,
+    )
+    actual, naive = Y[origins], naive[origins]
+    errors, errors_naive = actual - forecasts, actual - naive
+    dm_statistic, dm_p_value = diebold_mariano_test(errors, errors_naive, horizon)
+    return {
+        "forecasts": forecasts,
+        "naive": naive,
+        "actual": actual,
+        "rmse": np.sqrt((errors**2).mean(axis=0)),
+        "mae": np.abs(errors).mean(axis=0),
+        "rmse_naive": np.sqrt((errors_naive**2).mean(axis=0)),
+        "mae_naive": np.abs(errors_naive).mean(axis=0),
+        "dm_statistic": dm_statistic,
+        "dm_p_value": dm_p_value,
+        "origins": np.array(origins),
+        "outcomes": [y.name for y in ys],
+    }
@@ -0,0 +1,202 @@
+####################################### Hypothesis Tests #######################################
+### Whether domestic and foreign bank deposits (fin_dev_db, fin_dev_fb) have different  ###
+### effects, whether the main explanatory variables are jointly significant and whether ###
+### the year effects matter are tested here, using the estimates store. The tests do not ###
+### refit any model: the Wald tests use the stored coefficients and covariance matrices  ###
+### of all specifications at once, and the year effects are tested by comparing the     ###
+### stored fits of the OLS and time fixed effects models                                 ###
+
+### the main explanatory variables are collinear (fin_dev_all = fin_dev_db + fin_dev_fb), ###
+### restrictions are therefore tested on their estimable part (e.g. fin_dev_db = 0 alone ###
+### is not testable), with the degrees of freedom given by the rank of that part         ###
+
+
+### packages ###
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from financial_development_and_income_inequality.analysis.estimates_store import (
+    META_FIELDS,
+)
+
+
+# function that builds the restriction matrix of linear hypotheses
+def linear_restrictions(terms, hypotheses, values=None):
+    """Builds the restriction matrix R and the vector q of the linear hypotheses R b = q.
+
+    Parameters:
+    terms (list): Names of the coefficients.
+    hypotheses (list of str or dict): One entry per restriction, either the name of a single
+        coefficient or a dictionary mapping names of coefficients to their weights, e.g.
+        {"fin_dev_db": 1, "fin_dev_fb": -1} for the equality of two coefficients.
+    values (list or None): Right hand side of every restriction. If None, all restrictions
+        are tested against zero.
+
+    Returns:
+    R (numpy.ndarray): Restriction matrix with shape (restrictions, terms).
+    q (numpy.ndarray): Right hand side with shape (restrictions,).
+
+    """
+    position = {term: i for i, term in enumerate(terms)}
+    R = np.zeros((len(hypotheses), len(terms)))
+    for row, hypothesis in enumerate(hypotheses):
+        if isinstance(hypothesis, str):
+            hypothesis = {hypothesis: 1}
+        for term, weight in hypothesis.items():
+            R[row, position[term]] = weight
+    q = np.zeros(len(hypotheses)) if values is None else np.asarray(values, dtype=float)
+    return R, q
+
+
+# function that calculates Wald F-statistics for several specifications at once
+# the restrictions are first reduced to the combinations which are orthogonal to the null
+# space of the design (estimable), the non-estimable part does not enter the statistic
+def wald_statistics(
+    coefficients,
+    covariance,
+    df_resid,
+    R,
+    q,
+    projection=None,
+    rcond=1e-10,
+    tol=1e-8,
+):
+    """Calculates the Wald F-statistics of the linear hypotheses R b = q for all
+    specifications at once. Only the estimable combinations of the restrictions are tested,
+    i.e. the ones which are not changed by the projection onto the identified coefficients
+    (see null_space_projection). Singular restricted covariance matrices are inverted by
+    their pseudo-inverse.
+
+    Parameters:
+    coefficients (numpy.ndarray): Coefficients with shape (specifications, terms).
+    covariance (numpy.ndarray): Covariance matrices with shape (specifications, terms, terms).
+    df_resid (numpy.ndarray): Residual degrees of freedom of every specification.
+    R (numpy.ndarray): Restriction matrix with shape (restrictions, terms).
+    q (numpy.ndarray): Right hand side with shape (restrictions,).
+    projection (numpy.ndarray or None): Projections onto the identified coefficients with
+        shape (specifications, terms, terms). If None, all restrictions are estimable.
+    rcond (float): Relative cutoff for small eigenvalues of the restricted covariance matrices.
+    tol (float): Tolerance for the part of the restrictions in the null space of the design.
+
+    Returns:
+    results (dict): Dictionary containing the "statistic", its degrees of freedom ("df_num",
+        "df_denom") and the "p_value" for every specification. Specifications which do not
+        contain all restricted terms or without estimable restrictions are NaN.
+
+    """
+    # only the restricted terms are needed
+    columns = np.flatnonzero(np.any(R != 0, axis=0))
+    R_full, R = R, R[:, columns]
+    b = np.asarray(coefficients)[:, columns]
+    V = np.asarray(covariance)[:, columns[:, None], columns]
+    available = ~(np.isnan(b).any(axis=1) | np.isnan(V).any(axis=(1, 2)))
+    b, V = np.where(available[:, None], b, 0), np.where(available[:, None, None], V, 0)
+
+    # combinations of the restrictions without any part in the null space of the design
+    if projection is None:
+        null_part = np.zeros((len(b), len(R), 1))
+    else:
+        P = np.nan_to_num(np.asarray(projection)[:, columns, :])
+        null_part = R_full[None] - np.einsum("rc,mct->mrt", R, P)
+    U, s, _ = np.linalg.svd(null_part)
+    s = np.pad(s, ((0, 0), (0, len(R) - s.shape[1])))
+    estimable = s <= tol * max(np.abs(R).sum(axis=1).max(), 1)
+    weights = U * estimable[:, None, :]
+    R = np.einsum("mrk,rc->mkc", weights, R)
+    q = np.einsum("mrk,r->mk", weights, q)
+
+    difference = np.einsum("mkc,mc->mk", R, b) - q
+    eigenvalues, eigenvectors = np.linalg.eigh(R @ V @ R.transpose(0, 2, 1))
+    cutoff = rcond * np.abs(eigenvalues).max(axis=1, keepdims=True)
+    identified = eigenvalues > cutoff
+    inverse = np.where(identified, 1 / np.where(identified, eigenvalues, 1), 0)
+    projected = np.einsum("mrj,mr->mj", eigenvectors, difference)
+    df_num = identified.sum(axis=1)
+    statistic = (inverse * projected**2).sum(axis=1) / np.maximum(df_num, 1)
+    df_denom = np.asarray(df_resid, dtype=float)
+
+    statistic = np.where(available & (df_num > 0), statistic, np.nan)
+    return {
+        "statistic": statistic,
+        "df_num": df_num,
+        "df_denom": df_denom,
+        "p_value": stats.f.sf(statistic, df_num, df_denom),
+    }
+
+
+# function that runs Wald tests on all specifications of an estimates store
+def wald_tests(store, hypotheses, values=None):
+    """Tests the linear hypotheses on every specification of an estimates store by Wald
+    F-tests, using the stored coefficients, covariance matrices and projections onto the
+    identified coefficients.
+
+    Parameters:
+    store (dict or EstimatesStore): Estimates store (see estimates_store).
+    hypotheses (list of str or dict): Restrictions (see linear_restrictions).
+    values (list or None): Right hand side of every restriction. If None, all restrictions
+        are tested against zero.
+
+    Returns:
+    tests (pandas.DataFrame): Test statistic, degrees of freedom and p-value of every
+        specification, indexed by the specification metadata.
+
+    """
+    R, q = linear_restrictions(list(np.asarray(store["terms"])), hypotheses, values)
+    results = wald_statistics(
+        np.asarray(store["coefficients"]),
+        np.asarray(store["covariance"]),
+        np.asarray(store["df_resid"]),
+        R,
+        q,
+        np.asarray(store["projection"]) if "projection" in store else None,
+    )
+    index = pd.MultiIndex.from_arrays(
+        [np.asarray(store[name]) for name in META_FIELDS],
+        names=META_FIELDS,
+    )
+    return pd.DataFrame(results, index=index)
+
+
+# function that tests the year effects by comparing nested models
+# the restricted and unrestricted models share the outcome variables, hence the total sum of
+# squares is the same and the F-statistic follows from the R-squared values
+def nested_f_tests(store, restricted="ols", unrestricted="fixed_effects"):
+    """Compares nested models with the same outcome variables and observations by F-tests,
+    e.g. whether the year effects of the time fixed effects model are jointly significant.
+    The specifications of both models are matched by their outcome variables.
+
+    Parameters:
+    store (dict or EstimatesStore): Estimates store (see estimates_store).
+    restricted (str): Name of the restricted model.
+    unrestricted (str): Name of the unrestricted model.
+
+    Returns:
+    tests (pandas.DataFrame): Test statistic, degrees of freedom and p-value for every outcome
+        variable (and group of regressions of the unrestricted model).
+
+    """
+    frame = pd.DataFrame(
+        {
+            field: np.asarray(store[field])
+            for field in ["model", "group", "outcome", "rsquared", "df_resid"]
+        },
+    )
+    tests = frame[frame["model"] == unrestricted].merge(
+        frame[frame["model"] == restricted],
+        on="outcome",
+        suffixes=("", "_restricted"),
+    )
+    df_num = tests["df_resid_restricted"] - tests["df_resid"]
+    statistic = ((tests["rsquared"] - tests["rsquared_restricted"]) / df_num) / (
+        (1 - tests["rsquared"]) / tests["df_resid"]
+    )
+    return pd.DataFrame(
+        {
+            "statistic": statistic.to_numpy(),
+            "df_num": df_num.to_numpy(),
+            "df_denom": tests["df_resid"].to_numpy(),
+            "p_value": stats.f.sf(statistic, df_num, tests["df_resid"]),
+        },
+        index=pd.MultiIndex.from_frame(tests[["group", "outcome"]]),
+    )
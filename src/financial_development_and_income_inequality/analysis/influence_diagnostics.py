@@ -0,0 +1,227 @@
+####################################### Influence Diagnostics #######################################
+### Here, it is examined whether single quarters or years drive the estimates of the ###
+### OLS and time fixed effects models. Instead of refitting the models for every     ###
+### left out observation (or year), all of the diagnostics are calculated            ###
+### analytically from one factorization of the (scaled) design matrix               ###
+
+
+### packages ###
+import numpy as np
+
+from financial_development_and_income_inequality.analysis.design_diagnostics import (
+    coefficients_from_basis,
+    collinear_columns,
+    design_diagnostics,
+    factorize_design,
+    pseudo_inverse_gram,
+)
+from financial_development_and_income_inequality.analysis.least_squares import (
+    absorb_fixed_effects,
+    model_design,
+    model_variables,
+)
+
+
+# function that calculates the influence diagnostics for a linear regression model with an intercept
+# the factorization of the design (see factorize_design) handles rank deficient design matrices
+# (e.g. collinear explanatory variables) in the same way as the OLS model (minimum norm solution)
+def influence_diagnostics(design, Y, clusters=None, absorb=None, rcond=1e-10):
+    """Calculates leverage, DFBETA(S), Cook's distance and leave-one-cluster-out
+    coefficients for linear regression models with an intercept (or fixed effects),
+    which share the same design matrix and differ in the outcome variables.
+
+    Parameters:
+    design (numpy.ndarray): Design matrix (without intercept) with shape (observations, regressors).
+    Y (numpy.ndarray): Outcome variables with shape (observations, outcomes).
+    clusters (array-like or None): Cluster label of every observation (e.g. "Year"). If None, no
+        leave-one-cluster-out coefficients are calculated.
+    absorb (array-like or None): Group label of every observation for fixed effects which are
+        absorbed instead of the intercept (e.g. "Year" for time fixed effects).
+    rcond (float): Relative cutoff for small singular values of the design matrix.
+
+    Returns:
+    diagnostics (dict): Dictionary containing the following arrays:
+        "coefficients" (regressors, outcomes): Slope coefficients of the full sample.
+        "leverage" (observations,): Diagonal of the hat matrix.
+        "residuals" (observations, outcomes): Residuals of the full sample.
+        "dfbeta" (observations, regressors, outcomes): Change of the coefficients when leaving out
+            the respective observation (full sample minus leave-one-out coefficients).
+        "dfbetas" (observations, regressors, outcomes): Scaled version of "dfbeta", NaN for
+            coefficients which are not identified.
+        "cooks_distance" (observations, outcomes): Cook's distance of every observation.
+        The leave-one-out diagnostics ("dfbeta", "dfbetas", "cooks_distance") are NaN for
+        observations with a leverage of one, which are fitted exactly.
+        "clusters" (clusters,): Labels of the clusters (only if clusters are given).
+        "cluster_coefficients" (clusters, regressors, outcomes): Coefficients obtained when
+            leaving out the respective cluster (only if clusters are given). Coefficients which
+            are not identified without the cluster keep the value implied by the full sample.
+
+    """
+    n_obs = len(design)
+    Y = np.asarray(Y, dtype=float).reshape(n_obs, -1)
+    # the intercept (or the fixed effects) is absorbed by demeaning the variables
+    groups = np.zeros(n_obs) if absorb is None else absorb
+    X_within, codes, sizes = absorb_fixed_effects(design, groups)
+    Y_within, _, _ = absorb_fixed_effects(Y, groups)
+    # columns without variation within the groups are collinear with the fixed effects, the
+    # rounding errors of the demeaning are removed before the columns are scaled
+    X_within[:, np.abs(X_within).max(axis=0) <= rcond * np.abs(design).max(axis=0)] = 0
+    factorization = factorize_design(X_within, rcond)
+    rank = factorization["rank"]
+    U = factorization["U"][:, :rank]
+
+    # (X'X)^+ X', the matrix mapping outcomes into coefficients
+    projector = coefficients_from_basis(factorization, U.T)
+    coefficients = projector @ Y_within
+    residuals = Y_within - U @ (U.T @ Y_within)
+    leverage = 1 / sizes[codes] + (U**2).sum(axis=1)
+
+    # residual variances of the full sample and without the respective observation
+    # (observations with a leverage of one are fitted exactly and cannot be left out)
+    df_resid = n_obs - rank - len(sizes)
+    sigma2 = (residuals**2).sum(axis=0) / df_resid
+    exact = 1 - leverage <= np.sqrt(rcond)
+    scaled_residuals = residuals / np.where(exact, np.nan, 1 - leverage)[:, None]
+    sigma2_deleted = (df_resid * sigma2 - residuals * scaled_residuals) / (df_resid - 1)
+
+    dfbeta = projector.T[:, :, None] * scaled_residuals[:, None, :]
+    xtx_inv_diagonal = np.diagonal(pseudo_inverse_gram(factorization))
+    # coefficients of collinear variables or variables without variation after demeaning
+    # (e.g. edu_att, which only changes between years, with time fixed effects) are not identified
+    columns = list(range(design.shape[1]))
+    identified = ~collinear_columns(
+        design_diagnostics(factorization, columns),
+        columns,
+    )
+    scale = np.sqrt(sigma2_deleted[:, None, :] * xtx_inv_diagonal[None, :, None])
+    dfbetas = np.full_like(dfbeta, np.nan)
+    dfbetas[:, identified] = dfbeta[:, identified] / scale[:, identified]
+    cooks_distance = (
+        scaled_residuals**2 / ((rank + len(sizes)) * sigma2) * leverage[:, None]
+    )
+
+    diagnostics = {
+        "coefficients": coefficients,
+        "leverage": leverage,
+        "residuals": residuals,
+        "dfbeta": dfbeta,
+        "dfbetas": dfbetas,
+        "cooks_distance": cooks_distance,
+    }
+    if clusters is not None:
+        labels, cluster_coefficients = leave_cluster_out_coefficients(
+            clusters,
+            codes,
+            sizes,
+            U,
+            projector,
+            coefficients,
+            residuals,
+            rcond,
+        )
+        diagnostics["clusters"] = labels
+        diagnostics["cluster_coefficients"] = cluster_coefficients
+    return diagnostics
+
+
+# function that calculates the coefficients when leaving out each cluster
+# clusters of equal size are processed together as one stack of matrices
+def leave_cluster_out_coefficients(
+    clusters,
+    codes,
+    sizes,
+    U,
+    projector,
+    coefficients,
+    residuals,
+    rcond,
+):
+    """Calculates the coefficients obtained when leaving out every cluster, using the
+    factorization of the full sample design matrix.
+
+    Parameters:
+    clusters (array-like): Cluster label of every observation.
+    codes (numpy.ndarray): Code of the absorbed group of every observation.
+    sizes (numpy.ndarray): Number of observations in every absorbed group.
+    U (numpy.ndarray): Left singular vectors of the demeaned design matrix.
+    projector (numpy.ndarray): Matrix mapping the demeaned outcomes into coefficients.
+    coefficients (numpy.ndarray): Coefficients of the full sample.
+    residuals (numpy.ndarray): Residuals of the full sample.
+    rcond (float): Relative cutoff for small singular values.
+
+    Returns:
+    labels (numpy.ndarray): Labels of the clusters.
+    cluster_coefficients (numpy.ndarray): Coefficients with shape (clusters, regressors, outcomes).
+
+    """
+    labels, cluster_codes = np.unique(np.asarray(clusters), return_inverse=True)
+    members = [np.flatnonzero(cluster_codes == code) for code in range(len(labels))]
+    cluster_coefficients = np.empty((len(labels),) + coefficients.shape)
+
+    for size in {len(rows) for rows in members}:
+        ids = [code for code, rows in enumerate(members) if len(rows) == size]
+        rows = np.stack([members[code] for code in ids])
+        U_g = U[rows]
+        # block of the hat matrix belonging to the cluster (absorbed groups included)
+        same_group = codes[rows][:, :, None] == codes[rows][:, None, :]
+        hat_block = same_group / sizes[codes[rows]][:, :, None]
+        hat_block += U_g @ U_g.transpose(0, 2, 1)
+        # the block is singular if the cluster contains a whole absorbed group
+        inverse = np.linalg.pinv(np.eye(size) - hat_block, rcond=rcond, hermitian=True)
+        corrected = inverse @ residuals[rows]
+        change = np.einsum("kgi,gim->gkm", projector[:, rows], corrected)
+        cluster_coefficients[ids] = coefficients[None] - change
+    return labels, cluster_coefficients
+
+
+# function that runs the influence diagnostics for the OLS model
+def run_ols_influence(data, leads=True):
+    """Runs the influence diagnostics for the OLS models, where every year is treated as
+    a cluster.
+
+    Parameters:
+    data(pandas.DataFrame): Data frame containing the variables used for fitting the models.
+    leads(bool): If True, the outcome variables with leads are used (baseline regressions),
+        otherwise the outcome variables without leads (robustness checks).
+
+    Returns:
+    diagnostics (dict): Influence diagnostics (see influence_diagnostics), together with the
+        names of the regressors ("terms") and outcome variables ("outcomes").
+
+    """
+    X, ys, control_vars = model_variables(data, leads=leads)
+    design, Y, terms = model_design(X, ys, control_vars)
+    diagnostics = influence_diagnostics(design, Y, clusters=data["Year"])
+    diagnostics["terms"] = terms
+    diagnostics["outcomes"] = [y.name for y in ys]
+    return diagnostics
+
+
+# function that runs the influence diagnostics for the time fixed effects model
+def run_fixed_effects_influence(data, leads=True):
+    """Runs the influence diagnostics for the time fixed effects models, where every year
+    is treated as a cluster. The year fixed effects are absorbed, hence only the
+    diagnostics of the explanatory and control variables are reported.
+
+    Parameters:
+    data(pandas.DataFrame): Data frame containing the variables used for fitting the models.
+    leads(bool): If True, the outcome variables with leads are used (baseline regressions),
+        otherwise the outcome variables without leads (robustness checks).
+
+    Returns:
+    diagnostics (dict): Influence diagnostics (see influence_diagnostics), together with the
+        names of the regressors ("terms") and outcome variables ("outcomes").
+
+    """
+    X, ys, control_vars = model_variables(data, leads=leads)
+    design, Y, terms = model_design(X, ys, control_vars)
+    # the year fixed effects are absorbed instead of adding dummy variables
+    diagnostics = influence_diagnostics(
+        design,
+        Y,
+        clusters=data["Year"],
+        absorb=data["Year"],
+    )
+    diagnostics["terms"] = terms
+    diagnostics["outcomes"] = [y.name for y in ys]
+    return diagnostics
@@ -0,0 +1,282 @@
+####################################### Instrumental Variables #######################################
+### Financial development and the labor cost differences are plausibly determined       ###
+### jointly. Here, the effects of the main explanatory variables are estimated by 2SLS   ###
+### or two-step efficient GMM, using lagged financial development and the number of     ###
+### foreign banks (fb_num) as instruments, on the same design as the OLS and time fixed ###
+### effects models                                                                       ###
+
+### the control variables and the intercept (or the absorbed year effects) are partialled ###
+### out once, the first stages of all endogenous regressors and the second stages of all ###
+### outcome variables are solved with one multi-column least squares solve each          ###
+
+
+### packages ###
+import numpy as np
+import pandas as pd
+
+from financial_development_and_income_inequality.analysis.design_diagnostics import (
+    collinear_columns,
+    design_diagnostics,
+    factorize_design,
+)
+from financial_development_and_income_inequality.analysis.least_squares import (
+    absorb_fixed_effects,
+    identified_variables,
+    mean_impute,
+    model_design,
+    model_variables,
+)
+
+# instruments used in addition to the lagged endogenous regressors
+default_instruments = ["fb_num"]
+
+
+# function that creates lagged variables used as instruments
+def lagged_instruments(data, variables, lags=4):
+    """Lags the variables by a number of quarters within every country.
+
+    Parameters:
+    data(pandas.DataFrame): Data frame containing the variables, ordered by time within countries.
+    variables(list): Names of the variables which are lagged.
+    lags(int): Number of quarters.
+
+    Returns:
+    lagged(pandas.DataFrame): Lagged variables, named "<variable>_lag<lags>".
+
+    """
+    lagged = data.groupby("Country")[variables].shift(lags)
+    return lagged.rename(columns=lambda variable: f"{variable}_lag{lags}")
+
+
+# function that removes the exogenous regressors from the other variables
+def partial_out_exogenous(arrays, exogenous, groups, rcond=1e-10):
+    """Calculates the residuals of the arrays after regressing them on the exogenous
+    regressors and the absorbed fixed effects (or the intercept).
+
+    Parameters:
+    arrays (list of numpy.ndarray): Arrays with shape (observations, columns).
+    exogenous (numpy.ndarray): Exogenous regressors with shape (observations, regressors).
+    groups (numpy.ndarray): Group label of every observation for the absorbed fixed effects.
+    rcond (float): Relative cutoff for small singular values.
+
+    Returns:
+    residuals (list of numpy.ndarray): Partialled out arrays.
+    df_exogenous (int): Number of parameters of the exogenous part (fixed effects and rank
+        of the exogenous regressors).
+
+    """
+    exogenous, _, sizes = absorb_fixed_effects(exogenous, groups)
+    U, s, _ = np.linalg.svd(exogenous, full_matrices=False)
+    Q = U[:, s > rcond * s[0]] if len(s) else U
+    residuals = []
+    for values in arrays:
+        within, _, _ = absorb_fixed_effects(values, groups)
+        residuals.append(within - Q @ (Q.T @ within))
+    return residuals, len(sizes) + Q.shape[1]
+
+
+# function that runs the first stage regressions and weak instrument diagnostics
+def first_stage(X, Z, df_exogenous, rcond=1e-10):
+    """Regresses all (partialled out) endogenous regressors on the (partialled out)
+    excluded instruments at once and calculates the partial F-statistics of the
+    instruments and the Cragg-Donald statistic.
+
+    Parameters:
+    X (numpy.ndarray): Endogenous regressors with shape (observations, endogenous).
+    Z (numpy.ndarray): Excluded instruments with shape (observations, instruments).
+    df_exogenous (int): Number of parameters of the exogenous part.
+    rcond (float): Relative cutoff for small singular values.
+
+    Returns:
+    results (dict): Dictionary containing the first stage "coefficients" (instruments,
+        endogenous), the "fitted" values, the partial "f_statistics" and their degrees
+        of freedom ("df_num", "df_denom"), the "partial_rsquared" of every endogenous
+        regressor and the "cragg_donald" statistic.
+
+    """
+    n_obs = len(X)
+    U, s, Vt = np.linalg.svd(Z, full_matrices=False)
+    keep = s > rcond * s[0]
+    U, s, Vt = U[:, keep], s[keep], Vt[keep]
+    coefficients = Vt.T @ ((U.T @ X) / s[:, None])
+    fitted = U @ (U.T @ X)
+    residuals = X - fitted
+    df_num = keep.sum()
+    df_denom = n_obs - df_exogenous - df_num
+    explained = (fitted**2).sum(axis=0)
+    unexplained = (residuals**2).sum(axis=0)
+    f_statistics = (explained / df_num) / (unexplained / df_denom)
+
+    # Cragg-Donald statistic, on the combinations of endogenous regressors which are
+    # not collinear (e.g. fin_dev_all = fin_dev_db + fin_dev_fb)
+    eigenvalues, eigenvectors = np.linalg.eigh(residuals.T @ residuals / df_denom)
+    identified = eigenvalues > rcond * eigenvalues.max()
+    whitening = eigenvectors[:, identified] / np.sqrt(eigenvalues[identified])
+    concentration = whitening.T @ (fitted.T @ fitted) @ whitening
+    cragg_donald = np.linalg.eigvalsh(concentration).min() / df_num
+
+    return {
+        "coefficients": coefficients,
+        "fitted": fitted,
+        "f_statistics": f_statistics,
+        "df_num": df_num,
+        "df_denom": df_denom,
+        "partial_rsquared": explained / (explained + unexplained),
+        "cragg_donald": cragg_donald,
+    }
+
+
+# function that estimates the effects of the endogenous regressors by 2SLS or GMM
+def iv_regression(
+    design,
+    Y,
+    endogenous,
+    instruments,
+    absorb=None,
+    method="2sls",
+    rcond=1e-10,
+):
+    """Estimates the coefficients of the endogenous columns of the design matrix by 2SLS
+    or two-step efficient GMM (with a heteroskedasticity-robust weight matrix), where the
+    remaining columns are exogenous control variables. All outcome variables are
+    estimated at once.
+
+    Parameters:
+    design (numpy.ndarray): Design matrix (without intercept) with shape (observations, regressors).
+    Y (numpy.ndarray): Outcome variables with shape (observations, outcomes).
+    endogenous (list): Column indices of the endogenous regressors.
+    instruments (numpy.ndarray): Excluded instruments with shape (observations, instruments).
+    absorb (array-like or None): Group label of every observation for fixed effects which are
+        absorbed instead of the intercept (e.g. "Year" for time fixed effects).
+    method (str): Either "2sls" or "gmm".
+    rcond (float): Relative cutoff for small singular values.
+
+    Returns:
+    results (dict): Dictionary containing the "coefficients" and "std_errors" with shape
+        (endogenous, outcomes), the "covariance" (outcomes, endogenous, endogenous), the
+        residual degrees of freedom ("df_resid"), the "first_stage" results and, for GMM,
+        Hansen's J statistic ("j_statistic") and its degrees of freedom ("j_df"). The
+        coefficients and standard errors of endogenous regressors which are not identified
+        (collinear columns, see collinear_columns) are NaN.
+
+    """
+    n_obs = len(design)
+    groups = np.zeros(n_obs) if absorb is None else np.asarray(absorb)
+    Y = np.asarray(Y, dtype=float).reshape(n_obs, -1)
+    (X, Z, Y), df_exogenous = partial_out_exogenous(
+        [design[:, endogenous], np.asarray(instruments, dtype=float), Y],
+        np.delete(design, endogenous, axis=1),
+        groups,
+        rcond,
+    )
+    stage = first_stage(X, Z, df_exogenous, rcond)
+    X_hat = stage["fitted"]
+    gram_inv = np.linalg.pinv(X_hat.T @ X_hat, rcond=rcond, hermitian=True)
+    coefficients = gram_inv @ (X_hat.T @ Y)
+    # the residuals use the endogenous regressors, not the first stage fitted values
+    residuals = Y - X @ coefficients
+    df_resid = n_obs - df_exogenous - np.linalg.matrix_rank(X_hat)
+
+    results = {}
+    if method == "gmm":
+        # weight matrices of all outcome variables, from the 2SLS residuals
+        weighted = Z.T[None] * (residuals**2).T[:, None, :]
+        weights = np.linalg.pinv(weighted @ Z, rcond=rcond, hermitian=True)
+        ZX, ZY = Z.T @ X, Z.T @ Y
+        information = np.linalg.pinv(
+            ZX.T[None] @ weights @ ZX[None],
+            rcond=rcond,
+            hermitian=True,
+        )
+        moments = np.einsum("ml,mlj->mj", ZY.T, weights @ ZX[None])
+        coefficients = np.einsum("mkj,mj->km", information, moments)
+        residuals = Y - X @ coefficients
+        gradient = Z.T @ residuals
+        j_df = stage["df_num"] - np.linalg.matrix_rank(X_hat)
+        results["j_statistic"] = np.einsum(
+            "lm,mlj,jm->m",
+            gradient,
+            weights,
+            gradient,
+        )
+        results["j_df"] = j_df
+        covariance = information
+    else:
+        sigma2 = (residuals**2).sum(axis=0) / df_resid
+        covariance = sigma2[:, None, None] * gram_inv[None]
+
+    # coefficients of collinear endogenous regressors are not identified
+    columns = list(range(X.shape[1]))
+    factorization = factorize_design(X, rcond)
+    collinear = collinear_columns(design_diagnostics(factorization, columns), columns)
+    std_errors = np.sqrt(np.diagonal(covariance, axis1=1, axis2=2)).T
+    coefficients[collinear], std_errors[collinear] = np.nan, np.nan
+
+    results.update(
+        {
+            "coefficients": coefficients,
+            "std_errors": std_errors,
+            "covariance": covariance,
+            "df_resid": df_resid,
+            "first_stage": stage,
+        },
+    )
+    return results
+
+
+# function that runs the IV regressions for the OLS or time fixed effects model
+def run_iv_model(
+    data,
+    model="ols",
+    endogenous=None,
+    instruments=None,
+    lags=4,
+    leads=True,
+    method="2sls",
+):
+    """Runs IV versions of the OLS or time fixed effects models, where the main explanatory
+    variables (or a subset of them) are instrumented by their lags and further instruments.
+    The main explanatory variables which are not endogenous are left out of the models.
+    Missing values of the instruments (e.g. at the start of the lagged variables) are
+    replaced by the column means, as for the other variables.
+
+    Parameters:
+    data(pandas.DataFrame): Data frame containing the variables used for fitting the models.
+    model(str): Either "ols" or "fixed_effects".
+    endogenous(list or None): Names of the endogenous explanatory variables. If None,
+        fin_dev_db and fin_dev_fb are endogenous (fin_dev_all is their sum).
+    instruments(list or None): Names of the instruments used in addition to the lagged
+        endogenous variables. If None, the number of foreign banks (fb_num) is used.
+    lags(int): Lag (in quarters) of the endogenous variables used as instruments. If 0, no
+        lagged instruments are used.
+    leads(bool): If True, the outcome variables with leads are used (baseline regressions),
+        otherwise the outcome variables without leads (robustness checks).
+    method(str): Either "2sls" or "gmm".
+
+    Returns:
+    results (dict): Results of the IV regressions (see iv_regression), together with the names
+        of the endogenous regressors ("terms"), "instruments" and outcome variables ("outcomes").
+
+    """
+    endogenous = list(identified_variables if endogenous is None else endogenous)
+    instruments = list(default_instruments if instruments is None else instruments)
+    X, ys, control_vars = model_variables(data, leads=leads)
+    design, Y, terms = model_design(X[endogenous], ys, control_vars)
+    excluded = data[instruments]
+    if lags:
+        excluded = pd.concat(
+            [lagged_instruments(data, endogenous, lags), excluded],
+            axis=1,
+        )
+    results = iv_regression(
+        design,
+        Y,
+        [terms.index(variable) for variable in endogenous],
+        mean_impute(excluded.to_numpy(dtype=float)),
+        absorb=data["Year"] if model == "fixed_effects" else None,
+        method=method,
+    )
+    results["terms"] = endogenous
+    results["instruments"] = list(excluded.columns)
+    results["outcomes"] = [y.name for y in ys]
+    return results
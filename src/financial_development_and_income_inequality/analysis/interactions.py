@@ -0,0 +1,284 @@
+####################################### Interaction Terms #######################################
+### Whether the effects of financial development differ across regimes (the financial   ###
+### crisis 2007/08, financial stress or over time) is estimated here by interacting the  ###
+### main explanatory variables with moderators, in the OLS or time fixed effects model   ###
+
+### the interactions are declared by the names of their factors, the products are only   ###
+### built chunk by chunk while accumulating the cross products of the design, hence the  ###
+### interaction columns are never stored together. The marginal effects of the main      ###
+### explanatory variables are then evaluated at chosen values of the moderators          ###
+
+
+### packages ###
+import numpy as np
+import pandas as pd
+
+from financial_development_and_income_inequality.analysis.design_diagnostics import (
+    coefficients_from_basis,
+    design_diagnostics,
+    factorize_cross_products,
+    null_space_projection,
+    pseudo_inverse_gram,
+)
+from financial_development_and_income_inequality.analysis.least_squares import (
+    identified_variables,
+    model_design,
+    model_variables,
+)
+
+# moderators of the main explanatory variables ("trend" is a linear time trend in years)
+default_moderators = ["fincri_0708", "FSI", "trend"]
+# interactions declared by the names of the two factors
+default_interactions = [
+    (variable, moderator)
+    for variable in ["fin_dev_db", "fin_dev_fb"]
+    for moderator in default_moderators
+]
+
+
+# function that creates a linear time trend
+def time_trend(data):
+    """Creates a linear time trend, measured in years since the first quarter.
+
+    Parameters:
+    data(pandas.DataFrame): Data frame containing the variables "Year" and "Quarter".
+
+    Returns:
+    trend(pandas.Series): Time trend named "trend".
+
+    """
+    time = data["Year"] + (data["Quarter"] - 1) / 4
+    return (time - time.min()).rename("trend")
+
+
+# function that accumulates the cross products of the design including the interactions
+def interaction_cross_products(design, Y, pairs, chunk_size=10000):
+    """Accumulates the column sums and cross products of the design matrix extended by the
+    products of pairs of its columns, chunk by chunk of observations. The products are
+    only built for the observations of the current chunk.
+
+    Parameters:
+    design (numpy.ndarray): Design matrix (without intercept) with shape (observations, regressors).
+    Y (numpy.ndarray): Outcome variables with shape (observations, outcomes).
+    pairs (list of tuple): Column indices of the two factors of every interaction.
+    chunk_size (int): Number of observations per chunk.
+
+    Returns:
+    cross_products (dict): Dictionary containing the number of observations ("n_obs"), the
+        column sums ("x_sum", "y_sum") and the cross products ("xx", "xy", "yy") of the
+        extended design and the outcome variables.
+
+    """
+    n_obs = len(design)
+    Y = np.asarray(Y, dtype=float).reshape(n_obs, -1)
+    left, right = (np.array(factors, dtype=int) for factors in zip(*pairs))
+    n_columns = design.shape[1] + len(pairs)
+    cross_products = {
+        "n_obs": n_obs,
+        "x_sum": np.zeros(n_columns),
+        "y_sum": np.zeros(Y.shape[1]),
+        "xx": np.zeros((n_columns, n_columns)),
+        "xy": np.zeros((n_columns, Y.shape[1])),
+        "yy": np.zeros(Y.shape[1]),
+    }
+    for start in range(0, n_obs, chunk_size):
+        block = design[start : start + chunk_size]
+        block = np.hstack([block, block[:, left] * block[:, right]])
+        y = Y[start : start + chunk_size]
+        cross_products["x_sum"] += block.sum(axis=0)
+        cross_products["y_sum"] += y.sum(axis=0)
+        cross_products["xx"] += block.T @ block
+        cross_products["xy"] += block.T @ y
+        cross_products["yy"] += (y**2).sum(axis=0)
+    return cross_products
+
+
+# function that fits the model with interactions from the cross products
+def fit_interaction_model(cross_products, terms):
+    """Fits linear regression models with intercept for all outcome variables from the
+    accumulated cross products of the (extended) design matrix.
+
+    Parameters:
+    cross_products (dict): Cross products (see interaction_cross_products).
+    terms (list): Names of the columns of the extended design matrix.
+
+    Returns:
+    fit (dict): Dictionary containing the "coefficients" (regressors, outcomes), the
+        "intercept" and "rsquared" (outcomes), the "covariance" of the coefficients
+        (outcomes, regressors, regressors), the "projection" onto the identified
+        coefficients (see null_space_projection), the residual degrees of freedom
+        ("df_resid"), the column "means", the "terms" and the design "diagnostics".
+
+    """
+    n_obs = cross_products["n_obs"]
+    factorization = factorize_cross_products(
+        n_obs,
+        cross_products["x_sum"],
+        cross_products["xx"],
+    )
+    rank, mean = factorization["rank"], factorization["mean"]
+    y_mean = cross_products["y_sum"] / n_obs
+    xy = cross_products["xy"] - n_obs * np.outer(mean, y_mean)
+    # coefficients of the orthonormal basis of the centered design
+    basis_coefficients = (
+        factorization["Vt"][:rank] @ (xy / factorization["scale"][:, None])
+    ) / factorization["s"][:rank, None]
+    coefficients = coefficients_from_basis(factorization, basis_coefficients)
+    tss = cross_products["yy"] - n_obs * y_mean**2
+    ssr = tss - (basis_coefficients**2).sum(axis=0)
+    df_resid = n_obs - rank - 1
+    return {
+        "coefficients": coefficients,
+        "intercept": y_mean - mean @ coefficients,
+        "rsquared": 1 - ssr / tss,
+        "covariance": (ssr / df_resid)[:, None, None]
+        * pseudo_inverse_gram(factorization)[None],
+        "projection": null_space_projection(factorization),
+        "df_resid": df_resid,
+        "means": mean,
+        "terms": terms,
+        "diagnostics": design_diagnostics(factorization, terms),
+    }
+
+
+# function that calculates marginal effects at chosen values of the moderators
+# a marginal effect is only identified if its gradient has no part in the null space of the
+# design, i.e. if the gradient is not changed by the projection onto the identified coefficients
+def marginal_effects(fit, variable, points, tol=1e-6):
+    """Calculates the marginal effects of a variable and their standard errors at chosen
+    values of its moderators, for all outcome variables at once. Moderators which are not
+    given are evaluated at their sample means.
+
+    Parameters:
+    fit (dict): Fitted model with interactions (see fit_interaction_model).
+    variable (str): Name of the variable.
+    points (pandas.DataFrame): Values of the moderators, one row per evaluation point.
+    tol (float): Tolerance for the part of the gradient in the null space of the design.
+
+    Returns:
+    effects (numpy.ndarray): Marginal effects with shape (points, outcomes), NaN where they
+        are not identified (e.g. if a collinear variable is interacted).
+    std_errors (numpy.ndarray): Standard errors with shape (points, outcomes).
+
+    """
+    terms = fit["terms"]
+    gradient = np.zeros((len(points), len(terms)))
+    gradient[:, terms.index(variable)] = 1
+    for column, term in enumerate(terms):
+        factors = term.split(":")
+        if len(factors) == 2 and variable in factors:
+            moderator = factors[1 - factors.index(variable)]
+            if moderator in points:
+                gradient[:, column] = points[moderator].to_numpy(dtype=float)
+            else:
+                gradient[:, column] = fit["means"][terms.index(moderator)]
+    effects = gradient @ fit["coefficients"]
+    variances = np.einsum("pk,mkl,pl->pm", gradient, fit["covariance"], gradient)
+    std_errors = np.sqrt(np.clip(variances, 0, None))
+    null_part = np.abs(gradient - gradient @ fit["projection"]).max(axis=1)
+    identified = null_part <= tol * np.abs(gradient).max(axis=1)
+    effects[~identified], std_errors[~identified] = np.nan, np.nan
+    return effects, std_errors
+
+
+# function that runs the OLS or time fixed effects model with interactions
+def run_interaction_model(
+    data,
+    interactions=None,
+    model="ols",
+    leads=True,
+    at=None,
+    chunk_size=10000,
+):
+    """Runs the OLS or time fixed effects model with interactions between the main
+    explanatory variables and moderators, and calculates the marginal effects of the
+    interacted variables at chosen values of every moderator (the other moderators at
+    their sample means). Of the main explanatory variables, fin_dev_db and fin_dev_fb enter
+    the models (fin_dev_all is their sum). Moderators and interacted variables which are not
+    part of the model (e.g. "trend") are added as main effects.
+
+    Parameters:
+    data(pandas.DataFrame): Data frame containing the variables used for fitting the models.
+    interactions(list of tuple or None): Names of the two factors of every interaction. If
+        None, fin_dev_db and fin_dev_fb are interacted with fincri_0708, FSI and the trend.
+    model(str): Either "ols" or "fixed_effects".
+    leads(bool): If True, the outcome variables with leads are used (baseline regressions),
+        otherwise the outcome variables without leads (robustness checks).
+    at(dict or None): Values of the moderators at which the marginal effects are evaluated.
+        If None, the minimum and maximum of every moderator and the quartiles of moderators
+        with more than two values.
+    chunk_size(int): Number of observations per chunk of the cross products.
+
+    Returns:
+    results (dict): Fitted model (see fit_interaction_model, without the year dummies), the
+        names of the outcome variables ("outcomes") and the "marginal_effects" (data frame
+        with the effects and standard errors, indexed by variable, moderator, value and
+        outcome variable).
+
+    """
+    interactions = default_interactions if interactions is None else interactions
+    X, ys, control_vars = model_variables(data, leads=leads)
+    X = X[identified_variables]
+    candidates = pd.concat([data, time_trend(data)], axis=1)
+    present = set(X.columns) | set(control_vars.columns)
+    extra = [
+        factor
+        for factor in dict.fromkeys(f for pair in interactions for f in pair)
+        if factor not in present
+    ]
+    dummies = None
+    if model == "fixed_effects":
+        dummies = pd.get_dummies(data["Year"])
+        dummies.columns = dummies.columns.astype(str)
+    design, Y, terms = model_design(
+        X,
+        ys,
+        pd.concat([control_vars, candidates[extra]], axis=1),
+        dummies,
+    )
+    pairs = [(terms.index(left), terms.index(right)) for left, right in interactions]
+    fit = fit_interaction_model(
+        interaction_cross_products(design, Y, pairs, chunk_size),
+        terms + [":".join(pair) for pair in interactions],
+    )
+
+    # the coefficients of the year dummies are not reported
+    if dummies is not None:
+        keep = [i for i, term in enumerate(fit["terms"]) if term not in dummies.columns]
+        fit["coefficients"] = fit["coefficients"][keep]
+        fit["covariance"] = fit["covariance"][:, keep][:, :, keep]
+        fit["projection"] = fit["projection"][np.ix_(keep, keep)]
+        fit["means"] = fit["means"][keep]
+        fit["terms"] = [fit["terms"][i] for i in keep]
+
+    # evaluation points of every moderator
+    if at is None:
+        at = {}
+        for moderator in dict.fromkeys(right for _, right in interactions):
+            values = candidates[moderator].dropna()
+            if values.nunique() > 2:
+                at[moderator] = values.quantile([0, 0.25, 0.5, 0.75, 1]).to_numpy()
+            else:
+                at[moderator] = np.array([values.min(), values.max()])
+    outcomes = [y.name for y in ys]
+    frames = []
+    for variable, moderator in dict.fromkeys(interactions):
+        points = pd.DataFrame({moderator: at[moderator]})
+        effects, std_errors = marginal_effects(fit, variable, points)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "variable": variable,
+                    "moderator": moderator,
+                    "value": np.repeat(points[moderator].to_numpy(), len(outcomes)),
+                    "outcome": np.tile(outcomes, len(points)),
+                    "effect": effects.ravel(),
+                    "std_error": std_errors.ravel(),
+                },
+            ),
+        )
+    fit["outcomes"] = outcomes
+    fit["marginal_effects"] = pd.concat(frames).set_index(
+        ["variable", "moderator", "value", "outcome"],
+    )
+    return fit
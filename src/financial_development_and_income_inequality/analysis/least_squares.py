@@ -0,0 +1,127 @@
+####################################### Least Squares Helpers #######################################
+### helper functions shared by the OLS and time fixed effects models, used for ###
+### selecting the variables and building the design matrices ###
+
+
+### packages ###
+import numpy as np
+import pandas as pd
+
+### variables used in both models ###
+# main explanatory variables
+explanatory_variables = ["fin_dev_all", "fin_dev_db", "fin_dev_fb"]
+# main explanatory variables whose coefficients are identified together (fin_dev_all is
+# their sum, hence the coefficients of all three variables are not identified)
+identified_variables = ["fin_dev_db", "fin_dev_fb"]
+# outcome variables (without leads)
+outcome_variables = ["fin_diff_all", "fin_diff_pc", "fin_diff_peh"]
+# control variables
+control_variables = [
+    "GDP_nom",
+    "CPI",
+    "gvt_cs",
+    "FSI",
+    "GDP_per_cap",
+    "agri_gdp",
+    "edu_att",
+    "fincri_0708",
+]
+# all variables read by the models (outcome variables with and without leads, and the year
+# used for the time fixed effects)
+regression_columns = (
+    explanatory_variables
+    + [f"{variable}_lead" for variable in outcome_variables]
+    + outcome_variables
+    + control_variables
+    + ["Year"]
+)
+
+
+# function that selects the variables used for fitting the models
+def model_variables(data, leads=True):
+    """Selects the main explanatory, outcome and control variables used in the OLS and
+    time fixed effects models.
+
+    Parameters:
+    data(pandas.DataFrame): Data frame containing the variables.
+    leads(bool): If True, the outcome variables with a one year lead are selected (baseline
+        regressions), otherwise the outcome variables without leads (robustness checks).
+
+    Returns:
+    X (pandas.DataFrame): Main explanatory variables.
+    ys (list of pandas.Series): List of outcome variables.
+    control_vars (pandas.DataFrame): Control variables.
+
+    """
+    suffix = "_lead" if leads else ""
+    X = data[explanatory_variables]
+    ys = [data[f"{variable}{suffix}"] for variable in outcome_variables]
+    control_vars = data[control_variables]
+    return X, ys, control_vars
+
+
+# function that builds the imputed design and outcome matrices
+# mean values are imputed instead of NaN, as done with SimpleImputer in both models
+def model_design(X, ys, control_vars, dummies=None):
+    """Builds the design matrix (without intercept) and the matrix of outcome variables,
+    where the NaN values are replaced by the means of the respective columns.
+
+    Parameters:
+    X (pandas.DataFrame): Main explanatory variables.
+    ys (list of pandas.Series): List of outcome variables.
+    control_vars (pandas.DataFrame): Control variables.
+    dummies (pandas.DataFrame or None): Dummy variables (e.g. year fixed effects), which are
+        placed after the explanatory and control variables.
+
+    Returns:
+    design (numpy.ndarray): Imputed design matrix with shape (observations, regressors).
+    Y (numpy.ndarray): Imputed outcome variables with shape (observations, outcomes).
+    terms (list): Names of the columns of the design matrix.
+
+    """
+    X_ = pd.concat([X, control_vars] + ([] if dummies is None else [dummies]), axis=1)
+    design = mean_impute(X_.to_numpy(dtype=float))
+    Y = mean_impute(np.column_stack([np.asarray(y, dtype=float) for y in ys]))
+    return design, Y, [str(term) for term in X_.columns]
+
+
+# function that replaces NaN values with column means
+def mean_impute(values):
+    """Replaces the NaN values of every column with the mean of the column.
+
+    Parameters:
+    values (numpy.ndarray): Two-dimensional array.
+
+    Returns:
+    imputed (numpy.ndarray): Array without NaN values.
+
+    """
+    means = np.nanmean(values, axis=0)
+    return np.where(np.isnan(values), means, values)
+
+
+# function that absorbs fixed effects by demeaning within groups
+# by the Frisch-Waugh-Lovell theorem, this is equivalent to including one dummy variable per group
+def absorb_fixed_effects(values, groups):
+    """Subtracts the group means from every column (within transformation).
+
+    Parameters:
+    values (numpy.ndarray): Array with shape (observations, columns).
+    groups (array-like): Group label of every observation (e.g. "Year").
+
+    Returns:
+    demeaned (numpy.ndarray): Array where the group means are subtracted.
+    codes (numpy.ndarray): Integer code of the group of every observation.
+    sizes (numpy.ndarray): Number of observations in every group.
+
+    """
+    _, codes, sizes = np.unique(
+        np.asarray(groups),
+        return_inverse=True,
+        return_counts=True,
+    )
+    values = np.asarray(values, dtype=float)
+    means = np.zeros((len(sizes),) + values.shape[1:])
+    np.add.at(means, codes, values)
+    means /= sizes.reshape((-1,) + (1,) * (values.ndim - 1))
+    return values - means[codes], codes, sizes
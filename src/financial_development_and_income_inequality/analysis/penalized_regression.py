@@ -0,0 +1,385 @@
+####################################### Penalized Regression #######################################
+### With eleven regressors (and thirty year dummies) on 120 observations, the models are ###
+### close to saturated. As a robustness check, ridge, lasso and elastic net paths are    ###
+### computed for all outcome variables at once from one standardized Gram matrix        ###
+
+### the objective follows glmnet:                                                        ###
+### 1/(2n) * ||y - Xb||^2 + lambda * (alpha * ||b||_1 + (1 - alpha) / 2 * ||b||^2)      ###
+### alpha = 1 is the lasso, alpha = 0 is ridge regression and values in between give    ###
+### the elastic net                                                                      ###
+
+
+### packages ###
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from financial_development_and_income_inequality.analysis.least_squares import (
+    absorb_fixed_effects,
+    model_design,
+    model_variables,
+)
+
+# smallest alpha used for the largest penalty of the ridge path (as in glmnet)
+RIDGE_ALPHA_FLOOR = 1e-3
+
+
+# function that calculates the standardized Gram matrix from the cross products
+def standardize_cross_products(n_obs, x_sum, y_sum, xx, xy, yy):
+    """Calculates the Gram matrix and the cross products of the standardized regressors
+    and the centered outcome variables from the raw sums and cross products.
+
+    Parameters:
+    n_obs (int): Number of observations.
+    x_sum (numpy.ndarray): Column sums of the design matrix.
+    y_sum (numpy.ndarray): Column sums of the outcome variables.
+    xx (numpy.ndarray): Cross products of the design matrix X'X.
+    xy (numpy.ndarray): Cross products of the design matrix and the outcome variables X'Y.
+    yy (numpy.ndarray): Column sums of the squared outcome variables.
+
+    Returns:
+    standardized (dict): Dictionary containing the "gram" matrix, the "cross" products, the
+        means of the regressors ("x_mean") and outcomes ("y_mean"), the "scale" of the regressors
+        and the variances of the outcomes ("y_var").
+
+    """
+    x_mean, y_mean = x_sum / n_obs, y_sum / n_obs
+    covariance = xx / n_obs - np.outer(x_mean, x_mean)
+    scale = np.sqrt(np.clip(np.diag(covariance), 0, None))
+    # constant regressors are not scaled (their coefficients are zero)
+    scale[scale < 1e-12] = 1
+    return {
+        "gram": covariance / np.outer(scale, scale),
+        "cross": (xy / n_obs - np.outer(x_mean, y_mean)) / scale[:, None],
+        "x_mean": x_mean,
+        "y_mean": y_mean,
+        "scale": scale,
+        "y_var": yy / n_obs - y_mean**2,
+    }
+
+
+# function that creates the penalty grid
+def lambda_grid(cross, alpha, n_lambdas=100, eps=1e-3):
+    """Creates a decreasing, log-spaced grid of penalties for every outcome variable,
+    starting at the smallest penalty for which all coefficients are zero.
+
+    Parameters:
+    cross (numpy.ndarray): Cross products of the standardized regressors and outcomes.
+    alpha (float): Mixing parameter between the lasso and ridge penalties.
+    n_lambdas (int): Number of penalties.
+    eps (float): Ratio between the smallest and the largest penalty.
+
+    Returns:
+    lambdas (numpy.ndarray): Penalties with shape (penalties, outcomes).
+
+    """
+    lambda_max = np.abs(cross).max(axis=0) / max(alpha, RIDGE_ALPHA_FLOOR)
+    return lambda_max[None, :] * np.logspace(0, np.log10(eps), n_lambdas)[:, None]
+
+
+# function that solves the optimality conditions on the active set
+def active_set_solution(gram, cross, coef, penalty, alpha):
+    """Solves the optimality conditions of the elastic net for one outcome variable,
+    given the active set and signs of approximate coefficients. Coefficients which change
+    their signs are removed from the active set. The solution is only returned if it
+    satisfies the optimality conditions for all coefficients.
+
+    Parameters:
+    gram (numpy.ndarray): Gram matrix of the standardized regressors.
+    cross (numpy.ndarray): Cross products of the standardized regressors and the outcome.
+    coef (numpy.ndarray): Approximate coefficients from coordinate descent.
+    penalty (float): Penalty.
+    alpha (float): Mixing parameter between the lasso and ridge penalties.
+
+    Returns:
+    solution (numpy.ndarray or None): Coefficients or None if no solution is found from the
+        active set and the signs of the approximate coefficients.
+
+    """
+    active = coef != 0
+    while True:
+        signs = np.sign(coef[active])
+        system = gram[np.ix_(active, active)] + penalty * (1 - alpha) * np.eye(
+            active.sum(),
+        )
+        solution = np.zeros_like(coef)
+        solution[active] = np.linalg.lstsq(
+            system,
+            cross[active] - penalty * alpha * signs,
+            rcond=None,
+        )[0]
+        flipped = np.sign(solution[active]) != signs
+        if not flipped.any():
+            break
+        active[np.flatnonzero(active)[flipped]] = False
+
+    gradient = cross - gram[:, active] @ solution[active]
+    tolerance = 1e-9 * max(penalty, np.abs(cross).max())
+    optimal_active = np.allclose(
+        gradient[active],
+        penalty * (alpha * signs + (1 - alpha) * solution[active]),
+        rtol=0,
+        atol=tolerance,
+    )
+    optimal_inactive = (np.abs(gradient[~active]) <= penalty * alpha + tolerance).all()
+    return solution if optimal_active and optimal_inactive else None
+
+
+# function that calculates the lasso and elastic net paths
+# coordinate descent with covariance updates, warm started from the previous penalty
+def coordinate_descent_path(
+    gram, cross, lambdas, alpha, y_var, tol=1e-7, max_iter=10000, check_every=5
+):
+    """Calculates the elastic net coefficients of the standardized regressors for a
+    decreasing grid of penalties, for all outcome variables at once. Coordinate descent
+    stops when no coefficient reduces the residual variance by more than tol times the
+    variance of the outcome (as in glmnet) or when the optimality conditions, solved
+    exactly on the active set, are satisfied.
+
+    Parameters:
+    gram (numpy.ndarray): Gram matrix of the standardized regressors.
+    cross (numpy.ndarray): Cross products of the standardized regressors and the outcomes.
+    lambdas (numpy.ndarray): Penalties with shape (penalties, outcomes).
+    alpha (float): Mixing parameter between the lasso and ridge penalties.
+    y_var (numpy.ndarray): Variances of the outcome variables.
+    tol (float): Convergence tolerance relative to the variances of the outcome variables.
+    max_iter (int): Maximum number of passes over all coefficients per penalty.
+    check_every (int): Number of passes after which the active set solution is tried.
+
+    Returns:
+    path (numpy.ndarray): Coefficients with shape (penalties, regressors, outcomes).
+
+    """
+    n_coef = len(gram)
+    coef = np.zeros(cross.shape)
+    # gradient of the least squares part, updated whenever a coefficient changes
+    gradient = cross.copy()
+    path = np.empty((len(lambdas),) + cross.shape)
+
+    for i, penalty in enumerate(lambdas):
+        threshold = penalty * alpha
+        solved = np.zeros(cross.shape[1], dtype=bool)
+        for iteration in range(1, max_iter + 1):
+            max_change = 0.0
+            for j in range(n_coef):
+                z = gradient[j] + gram[j, j] * coef[j]
+                new = np.sign(z) * np.maximum(np.abs(z) - threshold, 0)
+                new /= gram[j, j] + penalty * (1 - alpha)
+                change = new - coef[j]
+                if np.any(change != 0):
+                    gradient -= np.outer(gram[:, j], change)
+                    coef[j] = new
+                    max_change = max(
+                        max_change,
+                        (gram[j, j] * change**2 / y_var).max(),
+                    )
+            converged = max_change < tol
+            # the active set is usually found long before coordinate descent converges
+            if converged or iteration % check_every == 0:
+                for m in np.flatnonzero(~solved):
+                    solution = active_set_solution(
+                        gram,
+                        cross[:, m],
+                        coef[:, m],
+                        penalty[m],
+                        alpha,
+                    )
+                    if solution is not None:
+                        coef[:, m], solved[m] = solution, True
+                gradient = cross - gram @ coef
+            if converged or solved.all():
+                break
+        path[i] = coef
+    return path
+
+
+# function that calculates the ridge path in closed form
+def ridge_path(gram, cross, lambdas):
+    """Calculates the ridge coefficients of the standardized regressors for a grid of
+    penalties from one eigendecomposition of the Gram matrix.
+
+    Parameters:
+    gram (numpy.ndarray): Gram matrix of the standardized regressors.
+    cross (numpy.ndarray): Cross products of the standardized regressors and the outcomes.
+    lambdas (numpy.ndarray): Penalties with shape (penalties, outcomes).
+
+    Returns:
+    path (numpy.ndarray): Coefficients with shape (penalties, regressors, outcomes).
+
+    """
+    eigenvalues, eigenvectors = np.linalg.eigh(gram)
+    rotated = eigenvectors.T @ cross
+    shrunk = rotated[None] / (eigenvalues[None, :, None] + lambdas[:, None, :])
+    return np.einsum("kj,ljm->lkm", eigenvectors, shrunk)
+
+
+# function that calculates the path for the standardized regressors
+def standardized_path(standardized, lambdas, alpha):
+    """Calculates the ridge (alpha = 0), lasso (alpha = 1) or elastic net path.
+
+    Parameters:
+    standardized (dict): Standardized cross products (see standardize_cross_products).
+    lambdas (numpy.ndarray): Penalties with shape (penalties, outcomes).
+    alpha (float): Mixing parameter between the lasso and ridge penalties.
+
+    Returns:
+    path (numpy.ndarray): Coefficients with shape (penalties, regressors, outcomes).
+
+    """
+    gram, cross = standardized["gram"], standardized["cross"]
+    if alpha == 0:
+        return ridge_path(gram, cross, lambdas)
+    return coordinate_descent_path(gram, cross, lambdas, alpha, standardized["y_var"])
+
+
+# function that evaluates the path on one held-out fold
+def fold_prediction_errors(fold, lambdas, alpha):
+    """Calculates the mean squared prediction errors of the path on a held-out fold.
+
+    Parameters:
+    fold (dict): Standardized cross products of the training observations (see
+        standardize_cross_products) and the held-out observations ("X_test", "Y_test").
+    lambdas (numpy.ndarray): Penalties with shape (penalties, outcomes).
+    alpha (float): Mixing parameter between the lasso and ridge penalties.
+
+    Returns:
+    mse (numpy.ndarray): Mean squared prediction errors with shape (penalties, outcomes).
+
+    """
+    path = standardized_path(fold, lambdas, alpha)
+    X_test = (fold["X_test"] - fold["x_mean"]) / fold["scale"]
+    predictions = fold["y_mean"] + np.einsum("ik,lkm->lim", X_test, path)
+    return ((fold["Y_test"][None] - predictions) ** 2).mean(axis=1)
+
+
+def _worker_fold(fold, lambdas, alpha):
+    return fold_prediction_errors(fold, lambdas, alpha)
+
+
+# function that calculates the penalized regression paths with cross-validation
+def penalized_regression(
+    design,
+    Y,
+    alpha=1.0,
+    n_lambdas=100,
+    eps=1e-3,
+    n_folds=5,
+    n_workers=1,
+):
+    """Calculates the penalized regression path for all outcome variables and selects
+    the penalty by K-fold cross-validation with contiguous folds. The cross products of
+    the training observations of every fold are obtained by subtracting the cross
+    products of the held-out observations from the cross products of all observations.
+
+    Parameters:
+    design (numpy.ndarray): Design matrix (without intercept) with shape (observations, regressors).
+    Y (numpy.ndarray): Outcome variables with shape (observations, outcomes).
+    alpha (float): Mixing parameter, 1 for the lasso, 0 for ridge regression.
+    n_lambdas (int): Number of penalties.
+    eps (float): Ratio between the smallest and the largest penalty.
+    n_folds (int): Number of cross-validation folds. If 0, no cross-validation is done.
+    n_workers (int): Number of worker processes for the cross-validation folds.
+
+    Returns:
+    results (dict): Dictionary containing the "lambdas" (penalties, outcomes), "coefficients"
+        (penalties, regressors, outcomes) and "intercepts" (penalties, outcomes) on the original
+        scale of the regressors and, with cross-validation, the "cv_mse" and its standard error
+        "cv_se" (penalties, outcomes) and the selected penalties "lambda_min" and "lambda_1se".
+
+    """
+    n_obs = len(design)
+    Y = np.asarray(Y, dtype=float).reshape(n_obs, -1)
+    # shifting the regressors by their means reduces the rounding errors of the cross products
+    X = design - design.mean(axis=0)
+    sums = (X.sum(axis=0), Y.sum(axis=0), X.T @ X, X.T @ Y, (Y**2).sum(axis=0))
+    full = standardize_cross_products(n_obs, *sums)
+    lambdas = lambda_grid(full["cross"], alpha, n_lambdas, eps)
+    path = standardized_path(full, lambdas, alpha)
+    coefficients = path / full["scale"][None, :, None]
+    results = {
+        "lambdas": lambdas,
+        "coefficients": coefficients,
+        "intercepts": full["y_mean"]
+        - np.einsum("k,lkm->lm", design.mean(axis=0), coefficients),
+        "alpha": alpha,
+    }
+    if not n_folds:
+        return results
+
+    # training cross products of all folds, obtained from the fold cross products
+    fold_ids = np.arange(n_obs) * n_folds // n_obs
+    folds = []
+    for fold in range(n_folds):
+        test = fold_ids == fold
+        X_test, Y_test = X[test], Y[test]
+        held_out = (
+            X_test.sum(axis=0),
+            Y_test.sum(axis=0),
+            X_test.T @ X_test,
+            X_test.T @ Y_test,
+            (Y_test**2).sum(axis=0),
+        )
+        train = standardize_cross_products(
+            n_obs - test.sum(),
+            *[total - part for total, part in zip(sums, held_out)],
+        )
+        folds.append({**train, "X_test": X_test, "Y_test": Y_test})
+
+    if n_workers == 1:
+        mse = [fold_prediction_errors(fold, lambdas, alpha) for fold in folds]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            mse = list(
+                executor.map(
+                    _worker_fold,
+                    folds,
+                    [lambdas] * n_folds,
+                    [alpha] * n_folds,
+                ),
+            )
+    mse = np.stack(mse)
+    cv_mse = mse.mean(axis=0)
+    cv_se = mse.std(axis=0, ddof=1) / np.sqrt(n_folds)
+    best = cv_mse.argmin(axis=0)
+    columns = np.arange(Y.shape[1])
+    # largest penalty within one standard error of the smallest cross-validation error
+    within = cv_mse <= (cv_mse[best, columns] + cv_se[best, columns])[None, :]
+    results.update(
+        {
+            "cv_mse": cv_mse,
+            "cv_se": cv_se,
+            "lambda_min": lambdas[best, columns],
+            "lambda_1se": lambdas[within.argmax(axis=0), columns],
+        },
+    )
+    return results
+
+
+# function that runs the penalized regressions for the OLS or time fixed effects model
+def run_penalized_regression(data, model="ols", alpha=1.0, leads=True, **kwargs):
+    """Runs penalized versions of the OLS or time fixed effects models. In the time fixed
+    effects model, the (unpenalized) year effects are absorbed before the penalized
+    regressions are calculated.
+
+    Parameters:
+    data(pandas.DataFrame): Data frame containing the variables used for fitting the models.
+    model(str): Either "ols" or "fixed_effects".
+    alpha(float): Mixing parameter, 1 for the lasso, 0 for ridge regression.
+    leads(bool): If True, the outcome variables with leads are used (baseline regressions),
+        otherwise the outcome variables without leads (robustness checks).
+    kwargs: Further arguments passed to penalized_regression (e.g. n_folds, n_workers).
+
+    Returns:
+    results (dict): Results of the penalized regressions (see penalized_regression), together
+        with the names of the regressors ("terms") and outcome variables ("outcomes").
+
+    """
+    X, ys, control_vars = model_variables(data, leads=leads)
+    design, Y, terms = model_design(X, ys, control_vars)
+    if model == "fixed_effects":
+        design, _, _ = absorb_fixed_effects(design, data["Year"])
+        Y, _, _ = absorb_fixed_effects(Y, data["Year"])
+    results = penalized_regression(design, Y, alpha=alpha, **kwargs)
+    results["terms"] = terms
+    results["outcomes"] = [y.name for y in ys]
+    return results
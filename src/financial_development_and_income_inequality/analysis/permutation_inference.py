@@ -0,0 +1,304 @@
+####################################### Permutation Inference #######################################
+### Given the strong trends in the financial development and labor cost variables, the ###
+### p-values of the OLS and time fixed effects models are also obtained by permutation ###
+### tests, which do not rely on asymptotics. Blocks of consecutive quarters of the main ###
+### explanatory variables are permuted, while the control variables are kept fixed.     ###
+
+### the control block is factorized only once, the outcome variables are partialled out ###
+### once and only the permuted explanatory variables are partialled out per permutation ###
+
+
+### packages ###
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from financial_development_and_income_inequality.analysis.design_diagnostics import (
+    collinear_columns,
+    design_diagnostics,
+    factorize_design,
+)
+from financial_development_and_income_inequality.analysis.least_squares import (
+    absorb_fixed_effects,
+    identified_variables,
+    model_design,
+    model_variables,
+)
+
+# arrays shared by all permutations, set once per worker process
+_WORKER_SHARED = {}
+
+
+# function that creates permuted indices for a number of permutations at once
+def block_permutation_indices(n_obs, n_permutations, block_length, rng):
+    """Creates indices which permute blocks of consecutive observations, keeping the order
+    of the observations within the blocks. The last block is shorter if the number of
+    observations is not a multiple of the block length.
+
+    Parameters:
+    n_obs (int): Number of observations.
+    n_permutations (int): Number of permutations.
+    block_length (int): Number of consecutive observations in a block (e.g. 4 quarters).
+    rng (numpy.random.Generator): Random number generator.
+
+    Returns:
+    indices (numpy.ndarray): Permuted indices with shape (permutations, observations).
+
+    """
+    n_blocks = -(-n_obs // block_length)
+    order = np.argsort(rng.random((n_permutations, n_blocks)), axis=1)
+    indices = order[:, :, None] * block_length + np.arange(block_length)
+    indices = indices.reshape(n_permutations, -1)
+    return indices[indices < n_obs].reshape(n_permutations, n_obs)
+
+
+# function that partials out the control block (and the absorbed fixed effects)
+def partial_out(values, Q, groups):
+    """Calculates the residuals of the columns after regressing them on the control
+    variables and the absorbed fixed effects (or the intercept).
+
+    Parameters:
+    values (numpy.ndarray): Array with shape (observations, columns).
+    Q (numpy.ndarray): Orthonormal basis of the demeaned control variables.
+    groups (numpy.ndarray): Group label of every observation for the absorbed fixed effects.
+
+    Returns:
+    residuals (numpy.ndarray): Array with the same shape as values.
+
+    """
+    within, _, _ = absorb_fixed_effects(values, groups)
+    return within - Q @ (Q.T @ within)
+
+
+# function that calculates the coefficients and t-statistics for a stack of designs
+def t_statistics(X_stack, Y, df_resid, rcond=1e-10):
+    """Calculates the coefficients and t-statistics of regressions of the (partialled out)
+    outcome variables on a stack of (partialled out) explanatory variables.
+
+    Parameters:
+    X_stack (numpy.ndarray): Explanatory variables with shape (permutations, observations, regressors).
+    Y (numpy.ndarray): Outcome variables with shape (observations, outcomes).
+    df_resid (int): Residual degrees of freedom.
+    rcond (float): Relative cutoff for small singular values.
+
+    Returns:
+    coefficients (numpy.ndarray): Coefficients with shape (permutations, regressors, outcomes).
+    t_values (numpy.ndarray): t-statistics with shape (permutations, regressors, outcomes).
+
+    """
+    X_t = X_stack.transpose(0, 2, 1)
+    gram_inv = np.linalg.pinv(X_t @ X_stack, rcond=rcond, hermitian=True)
+    coefficients = gram_inv @ (X_t @ Y)
+    residuals = Y - X_stack @ coefficients
+    sigma2 = (residuals**2).sum(axis=1) / df_resid
+    variances = np.diagonal(gram_inv, axis1=1, axis2=2)[:, :, None] * sigma2[:, None]
+    return coefficients, coefficients / np.sqrt(variances)
+
+
+# function that evaluates one chunk of permutations
+def permutation_chunk(shared, seed_sequence, n_permutations):
+    """Counts how often the absolute permuted t-statistics are at least as large as the
+    observed ones, for one chunk of permutations.
+
+    Parameters:
+    shared (dict): Arrays shared by all permutations (see permutation_test).
+    seed_sequence (numpy.random.SeedSequence): Seed of the chunk.
+    n_permutations (int): Number of permutations in the chunk.
+
+    Returns:
+    exceedances (numpy.ndarray): Counts with shape (regressors, outcomes).
+    n_permutations (int): Number of permutations in the chunk.
+
+    """
+    X, groups = shared["X"], shared["groups"]
+    rng = np.random.default_rng(seed_sequence)
+    indices = block_permutation_indices(
+        len(X),
+        n_permutations,
+        shared["block_length"],
+        rng,
+    )
+    # the observations are kept on the first axis while partialling out
+    X_permuted = X[indices].transpose(1, 0, 2).reshape(len(X), -1)
+    X_permuted = partial_out(X_permuted, shared["Q"], groups)
+    X_permuted = X_permuted.reshape(len(X), n_permutations, -1).transpose(1, 0, 2)
+    _, t_values = t_statistics(X_permuted, shared["Y"], shared["df_resid"])
+    exceedances = (np.abs(t_values) >= shared["threshold"]).sum(axis=0)
+    return exceedances, n_permutations
+
+
+def _initialize_worker(shared):
+    _WORKER_SHARED.update(shared)
+
+
+def _worker_chunk(seed_sequence, n_permutations):
+    return permutation_chunk(_WORKER_SHARED, seed_sequence, n_permutations)
+
+
+# function that runs the permutation test
+# chunks are seeded deterministically, hence the p-values do not depend on the number of workers
+def permutation_test(
+    design,
+    Y,
+    tested,
+    absorb=None,
+    n_permutations=999,
+    block_length=4,
+    seed=0,
+    chunk_size=250,
+    n_workers=1,
+    rcond=1e-10,
+):
+    """Runs a block permutation test for the coefficients of the tested columns of the
+    design matrix, where the remaining columns are control variables. The p-values are
+    based on the absolute t-statistics.
+
+    Parameters:
+    design (numpy.ndarray): Design matrix (without intercept) with shape (observations, regressors).
+    Y (numpy.ndarray): Outcome variables with shape (observations, outcomes).
+    tested (list): Column indices of the tested regressors, which are permuted.
+    absorb (array-like or None): Group label of every observation for fixed effects which are
+        absorbed instead of the intercept (e.g. "Year" for time fixed effects).
+    n_permutations (int): Number of permutations.
+    block_length (int): Number of consecutive observations which are permuted together.
+    seed (int): Seed of the random number generator.
+    chunk_size (int): Number of permutations evaluated at once.
+    n_workers (int): Number of worker processes. If 1, the chunks are evaluated in the
+        current process.
+    rcond (float): Relative cutoff for small singular values.
+
+    Returns:
+    results (dict): Dictionary containing the observed "coefficients" and "t_values" and the
+        permutation "p_values", each with shape (tested regressors, outcomes), as well as the
+        number of permutations ("n_permutations"). The results of tested regressors which
+        are not identified (collinear columns, see collinear_columns) are NaN.
+
+    """
+    n_obs = len(design)
+    groups = np.zeros(n_obs) if absorb is None else np.asarray(absorb)
+    Y = np.asarray(Y, dtype=float).reshape(n_obs, -1)
+    X = design[:, tested]
+
+    # factorizing the control block once
+    controls, _, sizes = absorb_fixed_effects(np.delete(design, tested, axis=1), groups)
+    U, s, _ = np.linalg.svd(controls, full_matrices=False)
+    Q = U[:, s > rcond * s[0]] if len(s) else U
+    X_observed = partial_out(X, Q, groups)
+    factorization = factorize_design(X_observed, rcond)
+    df_resid = n_obs - len(sizes) - Q.shape[1] - factorization["rank"]
+    # coefficients of collinear tested columns are not identified
+    columns = list(range(len(tested)))
+    collinear = collinear_columns(design_diagnostics(factorization, columns), columns)
+
+    Y_partialled = partial_out(Y, Q, groups)
+    coefficients, t_values = t_statistics(X_observed[None], Y_partialled, df_resid)
+
+    shared = {
+        "X": X,
+        "Y": Y_partialled,
+        "Q": Q,
+        "groups": groups,
+        "df_resid": df_resid,
+        "block_length": block_length,
+        # small tolerance, such that the identity permutation counts as an exceedance
+        "threshold": np.abs(t_values[0]) * (1 - 1e-10),
+    }
+    sizes = [
+        min(chunk_size, n_permutations - start)
+        for start in range(0, n_permutations, chunk_size)
+    ]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    # p-values are accumulated as soon as the chunks are evaluated
+    exceedances = np.zeros_like(t_values[0], dtype=np.int64)
+    if n_workers == 1:
+        for seed_sequence, size in zip(seeds, sizes):
+            counts, _ = permutation_chunk(shared, seed_sequence, size)
+            exceedances += counts
+    else:
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=_initialize_worker,
+            initargs=(shared,),
+        ) as executor:
+            futures = [
+                executor.submit(_worker_chunk, seed_sequence, size)
+                for seed_sequence, size in zip(seeds, sizes)
+            ]
+            for future in as_completed(futures):
+                counts, _ = future.result()
+                exceedances += counts
+
+    results = {
+        "coefficients": coefficients[0],
+        "t_values": t_values[0],
+        "p_values": (1 + exceedances) / (1 + n_permutations),
+        "n_permutations": n_permutations,
+    }
+    for name in ["coefficients", "t_values", "p_values"]:
+        results[name][collinear] = np.nan
+    return results
+
+
+# function that runs the permutation tests for the OLS model
+def run_ols_permutation(data, leads=True, terms=None, **kwargs):
+    """Runs block permutation tests for the main explanatory variables of the OLS models.
+
+    Parameters:
+    data(pandas.DataFrame): Data frame containing the variables used for fitting the models.
+    leads(bool): If True, the outcome variables with leads are used (baseline regressions),
+        otherwise the outcome variables without leads (robustness checks).
+    terms(list or None): Main explanatory variables which are tested, the remaining ones are
+        left out of the models. If None, fin_dev_db and fin_dev_fb are tested.
+    kwargs: Further arguments passed to permutation_test (e.g. n_permutations, n_workers).
+
+    Returns:
+    results (dict): Results of the permutation tests (see permutation_test), together with the
+        names of the tested regressors ("terms") and outcome variables ("outcomes").
+
+    """
+    terms = identified_variables if terms is None else list(terms)
+    X, ys, control_vars = model_variables(data, leads=leads)
+    design, Y, _ = model_design(X[terms], ys, control_vars)
+    results = permutation_test(
+        design,
+        Y,
+        tested=list(range(len(terms))),
+        **kwargs,
+    )
+    results["terms"] = terms
+    results["outcomes"] = [y.name for y in ys]
+    return results
+
+
+# function that runs the permutation tests for the time fixed effects model
+def run_fixed_effects_permutation(data, leads=True, terms=None, **kwargs):
+    """Runs block permutation tests for the main explanatory variables of the time fixed
+    effects models, where the year fixed effects are absorbed.
+
+    Parameters:
+    data(pandas.DataFrame): Data frame containing the variables used for fitting the models.
+    leads(bool): If True, the outcome variables with leads are used (baseline regressions),
+        otherwise the outcome variables without leads (robustness checks).
+    terms(list or None): Main explanatory variables which are tested, the remaining ones are
+        left out of the models. If None, fin_dev_db and fin_dev_fb are tested.
+    kwargs: Further arguments passed to permutation_test (e.g. n_permutations, n_workers).
+
+    Returns:
+    results (dict): Results of the permutation tests (see permutation_test), together with the
+        names of the tested regressors ("terms") and outcome variables ("outcomes").
+
+    """
+    terms = identified_variables if terms is None else list(terms)
+    X, ys, control_vars = model_variables(data, leads=leads)
+    design, Y, _ = model_design(X[terms], ys, control_vars)
+    results = permutation_test(
+        design,
+        Y,
+        tested=list(range(len(terms))),
+        absorb=data["Year"],
+        **kwargs,
+    )
+    results["terms"] = terms
+    results["outcomes"] = [y.name for y in ys]
+    return results
@@ -0,0 +1,279 @@
+####################################### Quantile Regression #######################################
+### The OLS and time fixed effects models estimate the effect of financial development on ###
+### the mean of the labor cost differences. Here, the effects on the quantiles of the      ###
+### labor cost differences are estimated with the same outcome and control variables, to  ###
+### see whether financial development widens the gap mainly in high divergence quarters  ###
+
+### the quantile regressions are solved by the Frisch-Newton interior point method        ###
+### (Portnoy and Koenker, 1997) on the orthonormal basis of the factorized design matrix. ###
+### The point estimates and all bootstrap replicates of one quantile are solved together, ###
+### the solutions of one quantile are the starting values of the next one, and the same   ###
+### bootstrap resamples are used for all quantiles and outcome variables                   ###
+
+
+### packages ###
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from financial_development_and_income_inequality.analysis.design_diagnostics import (
+    coefficients_from_basis,
+    collinear_columns,
+    design_diagnostics,
+    factorize_design,
+)
+from financial_development_and_income_inequality.analysis.least_squares import (
+    model_design,
+    model_variables,
+)
+
+# quantiles estimated by default
+default_quantiles = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+
+# function that returns the largest step keeping the variables nonnegative
+def _step_length(values, directions):
+    ratios = np.where(
+        directions < 0, -values / np.where(directions < 0, directions, -1), np.inf
+    )
+    return ratios.min(axis=1)
+
+
+# function that solves quantile regressions by the Frisch-Newton interior point method
+def frisch_newton(Z, y, tau, coefficients=None, tol=1e-6, max_iter=100, step=0.99995):
+    """Solves several quantile regressions of the same size at once by the Frisch-Newton
+    (primal-dual, predictor-corrector) interior point method, applied to the dual linear
+    program max y'a subject to Z'a = (1 - tau) Z'1 and 0 <= a <= 1, starting from the
+    feasible point a = 1 - tau.
+
+    Parameters:
+    Z (numpy.ndarray): Regressors (including the intercept) with shape (problems, observations, regressors).
+    y (numpy.ndarray): Outcome variables with shape (problems, observations).
+    tau (float): Quantile.
+    coefficients (numpy.ndarray or None): Starting values with shape (problems, regressors),
+        e.g. the solutions of a neighbouring quantile. If None, the least squares solutions.
+    tol (float): Relative tolerance for the duality gap.
+    max_iter (int): Maximum number of iterations.
+    step (float): Fraction of the step to the boundary of the feasible region.
+
+    Returns:
+    coefficients (numpy.ndarray): Quantile regression coefficients with shape (problems, regressors).
+    n_iter (int): Number of iterations.
+
+    """
+    n_problems, n_obs, n_regressors = Z.shape
+    x = np.full((n_problems, n_obs), 1 - tau)
+    s = np.full((n_problems, n_obs), tau)
+    gram = Z.transpose(0, 2, 1) @ Z
+    # a small ridge keeps the normal equations solvable for collinear resamples
+    ridge = (
+        1e-12 * np.trace(gram, axis1=1, axis2=2)[:, None, None] * np.eye(n_regressors)
+    )
+    if coefficients is None:
+        coefficients = np.linalg.solve(gram + ridge, np.einsum("inp,in->ip", Z, y))
+    beta = -coefficients
+    r = -y - np.einsum("inp,ip->in", Z, beta)
+    r = r + 0.001 * (r == 0)
+    z = np.maximum(r, 0)
+    w = z - r
+
+    active = np.ones(n_problems, dtype=bool)
+    for n_iter in range(max_iter):
+        # the duality gap of feasible points equals the complementarity x'z + s'w, which is
+        # used since the feasibility of collinear resamples only holds up to the ridge
+        gap = (x * z).sum(axis=1) + (s * w).sum(axis=1)
+        active &= gap > tol * (1 + np.abs((y * x).sum(axis=1)))
+        if not active.any():
+            break
+        # affine scaling (predictor) direction
+        q = 1 / (z / x + w / s)
+        r = z - w
+        Zq = Z * q[..., None]
+        normal = Zq.transpose(0, 2, 1) @ Z + ridge
+        dbeta = np.linalg.solve(normal, np.einsum("inp,in->ip", Zq, r))
+        dx = q * (np.einsum("inp,ip->in", Z, dbeta) - r)
+        dz = -z * (1 + dx / x)
+        dw = -w * (1 - dx / s)
+        fp = np.minimum(step * np.minimum(_step_length(x, dx), _step_length(s, -dx)), 1)
+        fd = np.minimum(step * np.minimum(_step_length(z, dz), _step_length(w, dw)), 1)
+
+        # centering and second order (corrector) direction, if the affine step is not full
+        correct = np.minimum(fp, fd) < 1
+        if correct.any():
+            mu = (z * x).sum(axis=1) + (w * s).sum(axis=1)
+            g = ((z + fd[:, None] * dz) * (x + fp[:, None] * dx)).sum(axis=1) + (
+                (w + fd[:, None] * dw) * (s - fp[:, None] * dx)
+            ).sum(axis=1)
+            mu = (mu * (g / mu) ** 3 / (2 * n_obs))[:, None]
+            dxdz, dsdw = dx * dz, -dx * dw
+            xi = (mu - dxdz) / x - (mu - dsdw) / s
+            dbeta_c = np.linalg.solve(normal, np.einsum("inp,in->ip", Zq, r - xi))
+            dx_c = q * (np.einsum("inp,ip->in", Z, dbeta_c) - r + xi)
+            dz_c = (mu - dxdz) / x - z - z * dx_c / x
+            dw_c = (mu - dsdw) / s - w + w * dx_c / s
+            fp_c = np.minimum(
+                step * np.minimum(_step_length(x, dx_c), _step_length(s, -dx_c)),
+                1,
+            )
+            fd_c = np.minimum(
+                step * np.minimum(_step_length(z, dz_c), _step_length(w, dw_c)),
+                1,
+            )
+            dbeta = np.where(correct[:, None], dbeta_c, dbeta)
+            dx = np.where(correct[:, None], dx_c, dx)
+            dz = np.where(correct[:, None], dz_c, dz)
+            dw = np.where(correct[:, None], dw_c, dw)
+            fp = np.where(correct, fp_c, fp)
+            fd = np.where(correct, fd_c, fd)
+
+        # converged problems (and problems without finite directions) are not updated anymore
+        active &= np.isfinite(dbeta).all(axis=1) & np.isfinite(dx).all(axis=1)
+        fp, fd = (fp * active)[:, None], (fd * active)[:, None]
+        dbeta, dx, dz, dw = (np.nan_to_num(values) for values in (dbeta, dx, dz, dw))
+        x, s = x + fp * dx, s - fp * dx
+        beta, z, w = beta + fd * dbeta, z + fd * dz, w + fd * dw
+    return -beta, n_iter
+
+
+# function that solves the quantile regressions of one outcome variable
+def quantile_path(basis, y, quantiles, indices, tol=1e-6, max_iter=100):
+    """Solves the quantile regressions of one outcome variable for all quantiles and all
+    resamples, where the solutions of every quantile are the starting values of the next.
+
+    Parameters:
+    basis (numpy.ndarray): Regressors (including the intercept) with shape (observations, regressors).
+    y (numpy.ndarray): Outcome variable with shape (observations,).
+    quantiles (list): Quantiles, in increasing order.
+    indices (numpy.ndarray): Observations of every resample with shape (resamples, observations).
+    tol (float): Relative tolerance for the duality gap.
+    max_iter (int): Maximum number of iterations.
+
+    Returns:
+    coefficients (numpy.ndarray): Coefficients with shape (quantiles, resamples, regressors).
+
+    """
+    Z, ys = basis[indices], y[indices]
+    path = []
+    coefficients = None
+    for tau in quantiles:
+        coefficients, _ = frisch_newton(Z, ys, tau, coefficients, tol, max_iter)
+        path.append(coefficients)
+    return np.stack(path)
+
+
+def _worker_outcome(basis, y, quantiles, indices, tol, max_iter):
+    return quantile_path(basis, y, quantiles, indices, tol, max_iter)
+
+
+# function that estimates quantile regressions with bootstrap standard errors
+def quantile_regression(
+    design,
+    Y,
+    quantiles=None,
+    n_boot=200,
+    seed=0,
+    n_workers=1,
+    tol=1e-6,
+    max_iter=100,
+):
+    """Estimates quantile regressions with intercept for all outcome variables and
+    quantiles. The standard errors are obtained by a pairs bootstrap, where the same
+    resamples are used for all quantiles and outcome variables. For collinear designs,
+    the minimum norm coefficients are returned and the standard errors of the coefficients
+    which are not identified (collinear columns, see collinear_columns) are NaN, as in the
+    OLS model.
+
+    Parameters:
+    design (numpy.ndarray): Design matrix (without intercept) with shape (observations, regressors).
+    Y (numpy.ndarray): Outcome variables with shape (observations, outcomes).
+    quantiles (list or None): Quantiles. If None, the deciles 0.1 and 0.9, the quartiles
+        and the median.
+    n_boot (int): Number of bootstrap resamples. If 0, no standard errors are calculated.
+    seed (int): Seed of the bootstrap resamples.
+    n_workers (int): Number of worker processes, each solving one outcome variable at a time.
+    tol (float): Relative tolerance for the duality gap.
+    max_iter (int): Maximum number of iterations of the interior point method.
+
+    Returns:
+    results (dict): Dictionary containing the "quantiles", the "coefficients" (quantiles,
+        regressors, outcomes), the "intercepts" (quantiles, outcomes) and, if n_boot > 0,
+        the bootstrap "std_errors" (quantiles, regressors, outcomes).
+
+    """
+    quantiles = np.sort(default_quantiles if quantiles is None else quantiles)
+    n_obs = len(design)
+    Y = np.asarray(Y, dtype=float).reshape(n_obs, -1)
+    factorization = factorize_design(design)
+    basis = np.column_stack(
+        [np.ones(n_obs), factorization["U"][:, : factorization["rank"]]],
+    )
+    # the first resample contains the original observations
+    rng = np.random.default_rng(seed)
+    indices = np.vstack(
+        [np.arange(n_obs), rng.integers(0, n_obs, size=(n_boot, n_obs))],
+    )
+
+    arguments = [
+        (basis, Y[:, i], quantiles, indices, tol, max_iter) for i in range(Y.shape[1])
+    ]
+    if n_workers == 1:
+        paths = [quantile_path(*args) for args in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            paths = list(executor.map(_worker_outcome, *zip(*arguments)))
+    # coefficients of the basis with shape (regressors, quantiles, resamples, outcomes)
+    paths = np.moveaxis(np.stack(paths, axis=-1), 2, 0)
+    coefficients = coefficients_from_basis(factorization, paths[1:])
+    intercepts = paths[0] - np.einsum(
+        "k,kqbm->qbm", factorization["mean"], coefficients
+    )
+
+    results = {
+        "quantiles": quantiles,
+        "coefficients": coefficients[:, :, 0].transpose(1, 0, 2),
+        "intercepts": intercepts[:, 0],
+    }
+    if n_boot:
+        std_errors = coefficients[:, :, 1:].std(axis=2, ddof=1).transpose(1, 0, 2)
+        # coefficients of collinear columns are not identified, their standard errors are NaN
+        columns = list(range(design.shape[1]))
+        diagnostics = design_diagnostics(factorization, columns)
+        std_errors[:, collinear_columns(diagnostics, columns)] = np.nan
+        results["std_errors"] = std_errors
+    return results
+
+
+# function that runs the quantile regressions for the OLS or time fixed effects model
+def run_quantile_regression(data, model="ols", leads=True, **kwargs):
+    """Runs quantile regression versions of the OLS or time fixed effects models. In the
+    time fixed effects model, the year dummies are included in the design matrix (the year
+    effects cannot be absorbed by demeaning in quantile regressions), and only the
+    coefficients of the explanatory and control variables are returned.
+
+    Parameters:
+    data(pandas.DataFrame): Data frame containing the variables used for fitting the models.
+    model(str): Either "ols" or "fixed_effects".
+    leads(bool): If True, the outcome variables with leads are used (baseline regressions),
+        otherwise the outcome variables without leads (robustness checks).
+    kwargs: Further arguments passed to quantile_regression (e.g. quantiles, n_boot, n_workers).
+
+    Returns:
+    results (dict): Results of the quantile regressions (see quantile_regression), together
+        with the names of the regressors ("terms") and outcome variables ("outcomes").
+
+    """
+    X, ys, control_vars = model_variables(data, leads=leads)
+    dummies = None
+    if model == "fixed_effects":
+        dummies = pd.get_dummies(data["Year"])
+        dummies.columns = dummies.columns.astype(str)
+    design, Y, terms = model_design(X, ys, control_vars, dummies)
+    results = quantile_regression(design, Y, **kwargs)
+    coeff = len(X.columns) + len(control_vars.columns)
+    for field in ["coefficients", "std_errors"]:
+        if field in results:
+            results[field] = results[field][:, :coeff]
+    results["terms"] = terms[:coeff]
+    results["outcomes"] = [y.name for y in ys]
+    return results
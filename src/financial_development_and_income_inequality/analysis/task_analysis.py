@@ -3,60 +3,77 @@ fixed effects models.
 """
 
 ### packages ###
-import pickle
-
-import pandas as pd
 import pytask
 
 ### functions and folders used for the task file ###
+from financial_development_and_income_inequality.analysis.estimates_store import (
+    combine_stores,
+    estimates_to_store,
+    save_estimates_store,
+)
 from financial_development_and_income_inequality.analysis.fixed_effects_model import (
     run_fixed_effects_model,
     run_fixed_effects_model_robust,
 )
+from financial_development_and_income_inequality.analysis.least_squares import (
+    regression_columns,
+)
 from financial_development_and_income_inequality.analysis.ols_model import (
     run_ols_model,
     run_ols_model_robust,
 )
-from financial_development_and_income_inequality.config import BLD
+from financial_development_and_income_inequality.config import BLD, STAGE_CACHE
+from financial_development_and_income_inequality.data_management.columnar_storage import (
+    load_data_set,
+)
+from financial_development_and_income_inequality.stage_cache import StageCache
+
+# memoized stage results (keyed by the regression variables and the model code)
+stage_cache = StageCache(STAGE_CACHE)
 
 
 # input directory
-@pytask.mark.depends_on(BLD / "python" / "data" / "final_data_set.pkl")
+@pytask.mark.depends_on(BLD / "python" / "data" / "final_data_set.arrow")
 
 # output directory
-@pytask.mark.produces(
-    [
-        BLD / "python" / "models" / "ols_model_estimates.pkl",
-        BLD / "python" / "models" / "fixed_effects_model_estimates.pkl",
-    ],
-)
+@pytask.mark.produces(BLD / "python" / "models" / "model_estimates.npz")
 def task_store_model_estimates(depends_on, produces):
-    """Stores the model estimates in a pickle format. The estimates for both the ols
-    model and fixed effects model are stored in two separate pickle files.
+    """Stores the model estimates in an estimates store (npz format). The estimates for
+    both the ols model and fixed effects model are stored as arrays in a single store,
+    with one row per specification.
 
     Parameters:
     depends_on (pathlib.Path): The path to the directory where the data set is stored.
-    produces (pathlib.Path): The paths to the estimates pickle files.
+    produces (pathlib.Path): The path to the estimates store.
 
     Returns:
     None
 
     """
-    # loading final_data_set
-    data = pd.read_pickle(depends_on)
+    # loading the variables of final_data_set used by the models
+    data = load_data_set(depends_on, columns=regression_columns)
     # OlS model statistics
     ols_model_estimates = {
-        "ols_model_estimates": run_ols_model(data),
-        "ols_model_estimates_robust_checks": run_ols_model_robust(data),
+        "ols_model_estimates": stage_cache.call(run_ols_model, data),
+        "ols_model_estimates_robust_checks": stage_cache.call(
+            run_ols_model_robust,
+            data,
+        ),
     }
     # Fixed effects model statistics
     fixed_effects_model_estimates = {
-        "fixed_effects_model_estimates": run_fixed_effects_model(data),
-        "fixed_effects_model_estimates_robust_checks": run_fixed_effects_model_robust(
+        "fixed_effects_model_estimates": stage_cache.call(
+            run_fixed_effects_model,
+            data,
+        ),
+        "fixed_effects_model_estimates_robust_checks": stage_cache.call(
+            run_fixed_effects_model_robust,
             data,
         ),
     }
-    with open(produces[0], "wb") as f:
-        pickle.dump(ols_model_estimates, f)
-    with open(produces[1], "wb") as f:
-        pickle.dump(fixed_effects_model_estimates, f)
+    # storing the estimates of both models as arrays
+    store = combine_stores(
+        estimates_to_store(ols_model_estimates, model="ols"),
+        estimates_to_store(fixed_effects_model_estimates, model="fixed_effects"),
+    )
+    save_estimates_store(store, produces)
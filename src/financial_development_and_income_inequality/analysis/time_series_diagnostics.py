@@ -0,0 +1,443 @@
+####################################### Time Series Diagnostics #######################################
+### The variables of the OLS and time fixed effects models are trending levels, hence  ###
+### the regressions may be spurious. Here, all numeric columns of final_data_set are   ###
+### tested for unit roots (ADF) and stationarity (KPSS), and the outcome variables are ###
+### tested for cointegration with the main explanatory variables (Engle-Granger)       ###
+
+### the tests follow adfuller, kpss and coint of statsmodels, but series with the same ###
+### sample are tested together: the lagged differences are strided views of the       ###
+### differenced series and one batched QR decomposition gives the residual sums of    ###
+### squares of all lag orders                                                          ###
+
+
+### packages ###
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from statsmodels.tsa.adfvalues import mackinnoncrit, mackinnonp
+
+from financial_development_and_income_inequality.analysis.least_squares import (
+    explanatory_variables,
+    outcome_variables,
+)
+
+# critical values of the KPSS test (Kwiatkowski et al., 1992, table 1)
+KPSS_CRITICAL_VALUES = {
+    "c": [0.347, 0.463, 0.574, 0.739],
+    "ct": [0.119, 0.146, 0.176, 0.216],
+}
+KPSS_P_VALUES = [0.10, 0.05, 0.025, 0.01]
+# columns which are not tested
+calendar_columns = ["Year", "Quarter"]
+
+
+# function that builds the ADF designs of all series with a common number of lags
+def adf_design(values, lags, regression="c"):
+    """Builds the ADF regressions of all series, where the lagged differences are strided
+    views of the differenced series (no copies are made before stacking the design).
+
+    Parameters:
+    values (numpy.ndarray): Series with shape (periods, series), without missing values.
+    lags (int): Number of lagged differences.
+    regression (str): Deterministic terms, "c" (constant), "ct" (constant and trend) or "n".
+
+    Returns:
+    design (numpy.ndarray): Designs with shape (series, observations, regressors), with the
+        columns ordered as deterministic terms, lagged level and lagged differences.
+    dy (numpy.ndarray): Differences with shape (series, observations).
+
+    """
+    diff = np.diff(values, axis=0)
+    # windows[t, s, i] = diff[t + i, s], the last element of a window is the current difference
+    windows = sliding_window_view(diff, lags + 1, axis=0)
+    n_obs, n_series = windows.shape[:2]
+    deterministic = {
+        "n": np.empty((n_obs, 0)),
+        "c": np.ones((n_obs, 1)),
+        "ct": np.column_stack([np.ones(n_obs), np.arange(1, n_obs + 1)]),
+    }[regression]
+    design = np.concatenate(
+        [
+            np.broadcast_to(deterministic, (n_series,) + deterministic.shape),
+            values[lags:-1].T[:, :, None],
+            windows[:, :, -2::-1].transpose(1, 0, 2),
+        ],
+        axis=2,
+    )
+    return design, windows[:, :, -1].T
+
+
+# function that runs the regressions of a batch of designs
+def batched_least_squares(design, y):
+    """Calculates the coefficients, standard errors and the residual sums of squares of all
+    nested models (using the first k columns) from one batched QR decomposition of the
+    design matrices augmented by the outcome.
+
+    Parameters:
+    design (numpy.ndarray): Designs with shape (series, observations, regressors).
+    y (numpy.ndarray): Outcomes with shape (series, observations).
+
+    Returns:
+    coefficients (numpy.ndarray): Coefficients with shape (series, regressors).
+    std_errors (numpy.ndarray): Standard errors with shape (series, regressors).
+    nested_ssr (numpy.ndarray): Residual sums of squares of the models with the first
+        k = 0, ..., regressors columns, with shape (series, regressors + 1).
+
+    """
+    n_obs, n_coef = design.shape[1:]
+    R = np.linalg.qr(np.concatenate([design, y[:, :, None]], axis=2), mode="r")
+    R_x, qty = R[:, :n_coef, :n_coef], R[:, :, n_coef]
+    nested_ssr = np.cumsum((qty**2)[:, ::-1], axis=1)[:, ::-1]
+    # the pseudo-inverse is used for series with collinear lags (e.g. dummy variables)
+    R_inv = np.linalg.pinv(R_x)
+    coefficients = np.einsum("skj,sj->sk", R_inv, qty[:, :n_coef])
+    sigma2 = nested_ssr[:, -1] / (n_obs - n_coef)
+    std_errors = np.sqrt((R_inv**2).sum(axis=2) * sigma2[:, None])
+    return coefficients, std_errors, nested_ssr
+
+
+# function that runs the ADF tests of series with a common sample
+def adf_tests(values, regression="c", maxlag=None, autolag=True, n_variables=1):
+    """Runs augmented Dickey-Fuller tests for all series, with the number of lags selected
+    by the AIC on a common sample (as adfuller of statsmodels).
+
+    Parameters:
+    values (numpy.ndarray): Series with shape (periods, series), without missing values.
+    regression (str): Deterministic terms, "c" (constant), "ct" (constant and trend) or "n".
+    maxlag (int or None): Maximum number of lags, by default 12 * (periods / 100) ** (1 / 4).
+    autolag (bool): If True, the number of lags is selected by the AIC, otherwise maxlag is used.
+    n_variables (int): Number of variables for the MacKinnon p-values (1 for unit root tests,
+        more for the residuals of cointegrating regressions).
+
+    Returns:
+    results (pandas.DataFrame): ADF statistics ("statistic"), "p_value", number of lags
+        ("lags"), observations ("nobs") and the 1%, 5% and 10% critical values.
+
+    """
+    n_periods = len(values)
+    n_trend = 0 if regression == "n" else len(regression)
+    if maxlag is None:
+        maxlag = int(np.ceil(12 * (n_periods / 100) ** (1 / 4)))
+        maxlag = min(n_periods // 2 - n_trend - 1, maxlag)
+
+    lags = np.full(values.shape[1], maxlag)
+    if autolag:
+        design, dy = adf_design(values, maxlag, regression)
+        _, _, nested_ssr = batched_least_squares(design, dy)
+        n_obs = dy.shape[1]
+        n_coef = np.arange(n_trend + 1, n_trend + maxlag + 2)
+        aic = n_obs * np.log(nested_ssr[:, n_coef] / n_obs) + 2 * n_coef
+        lags = aic.argmin(axis=1)
+
+    # the tests are run with the selected number of lags on the largest possible sample
+    statistics = np.empty(values.shape[1])
+    n_obs = np.empty(values.shape[1], dtype=int)
+    for lag in np.unique(lags):
+        selected = lags == lag
+        design, dy = adf_design(values[:, selected], lag, regression)
+        coefficients, std_errors, _ = batched_least_squares(design, dy)
+        statistics[selected] = coefficients[:, n_trend] / std_errors[:, n_trend]
+        n_obs[selected] = dy.shape[1]
+
+    results = pd.DataFrame(
+        {
+            "statistic": statistics,
+            "p_value": [
+                mackinnonp(statistic, regression=regression, N=n_variables)
+                for statistic in statistics
+            ],
+            "lags": lags,
+            "nobs": n_obs,
+        },
+    )
+    if regression != "n":
+        critical = np.array(
+            [
+                mackinnoncrit(N=n_variables, regression=regression, nobs=nobs)
+                for nobs in n_obs
+            ],
+        )
+        results[["crit_1%", "crit_5%", "crit_10%"]] = critical
+    return results
+
+
+# function that runs the KPSS tests of series with a common sample
+def kpss_tests(values, regression="c"):
+    """Runs KPSS tests for all series, with the number of lags of the long-run variance
+    selected by the method of Hobijn et al. (1998) (as kpss of statsmodels).
+
+    Parameters:
+    values (numpy.ndarray): Series with shape (periods, series), without missing values.
+    regression (str): Null hypothesis, "c" (level stationary) or "ct" (trend stationary).
+
+    Returns:
+    results (pandas.DataFrame): KPSS statistics ("statistic"), "p_value" (interpolated and
+        bounded by 0.01 and 0.1) and the number of lags ("lags").
+
+    """
+    n_obs = len(values)
+    if regression == "ct":
+        trend = np.column_stack([np.ones(n_obs), np.arange(1, n_obs + 1)])
+        resids = values - trend @ np.linalg.lstsq(trend, values, rcond=None)[0]
+    else:
+        resids = values - values.mean(axis=0)
+
+    def autocovariances(max_lag):
+        return np.array(
+            [
+                (resids[i:] * resids[: n_obs - i]).sum(axis=0)
+                for i in range(max_lag + 1)
+            ],
+        )
+
+    # automatic bandwidth of Hobijn et al. (1998)
+    cov_lags = int(n_obs ** (2 / 9))
+    gamma = autocovariances(cov_lags)
+    s0 = gamma[0] / n_obs + 2 * gamma[1:].sum(axis=0) / n_obs
+    s1 = 2 * (np.arange(1, cov_lags + 1)[:, None] * gamma[1:]).sum(axis=0) / n_obs
+    gamma_hat = 1.1447 * ((s1 / s0) ** 2) ** (1 / 3)
+    lags = np.minimum((gamma_hat * n_obs ** (1 / 3)).astype(int), n_obs - 1)
+
+    # long-run variances with Bartlett weights, for the lags of every series
+    gamma = autocovariances(lags.max())
+    weights = 1 - np.arange(lags.max() + 1)[:, None] / (lags + 1)
+    weights[np.arange(lags.max() + 1)[:, None] > lags] = 0
+    long_run_variance = (gamma[0] + 2 * (weights[1:] * gamma[1:]).sum(axis=0)) / n_obs
+
+    statistics = (np.cumsum(resids, axis=0) ** 2).sum(axis=0) / n_obs**2
+    statistics /= long_run_variance
+    return pd.DataFrame(
+        {
+            "statistic": statistics,
+            "p_value": np.interp(
+                statistics,
+                KPSS_CRITICAL_VALUES[regression],
+                KPSS_P_VALUES,
+            ),
+            "lags": lags,
+        },
+    )
+
+
+# function that finds the longest stretches of consecutive observations
+def longest_stretches(observed):
+    """Finds the longest stretch of consecutive observations of every column.
+
+    Parameters:
+    observed(numpy.ndarray): Boolean array with shape (periods, columns), True where the
+        column is observed.
+
+    Returns:
+    stretches(list): (first, last + 1) row positions of the longest stretches, (0, 0) for
+        columns without observations.
+
+    """
+    # starts and ends of the stretches of observed values, by column
+    changes = np.diff(
+        np.pad(observed.astype(int), ((1, 1), (0, 0))),
+        axis=0,
+    )
+    stretches = []
+    for j in range(observed.shape[1]):
+        starts = np.flatnonzero(changes[:, j] == 1)
+        ends = np.flatnonzero(changes[:, j] == -1)
+        if not len(starts):
+            stretches.append((0, 0))
+            continue
+        longest = np.argmax(ends - starts)
+        stretches.append((int(starts[longest]), int(ends[longest])))
+    return stretches
+
+
+# function that groups the columns by the sample without missing values
+def common_samples(data, columns):
+    """Groups the columns by their longest stretch of consecutive non-missing observations,
+    such that columns with missing values within their span (e.g. edu_att) are tested on
+    the longest sample without gaps. Columns without observations or without variation are
+    excluded.
+
+    Parameters:
+    data(pandas.DataFrame): Data frame containing the series.
+    columns(list): Names of the columns.
+
+    Returns:
+    samples(dict): Lists of column names, with (first, last + 1) row positions as keys.
+
+    """
+    values = data[columns].to_numpy(dtype=float)
+    stretches = longest_stretches(np.isfinite(values))
+    samples = {}
+    for j, (column, (first, last)) in enumerate(zip(columns, stretches)):
+        if last > first and np.ptp(values[first:last, j]) > 0:
+            samples.setdefault((first, last), []).append(column)
+    return samples
+
+
+# function that runs the unit root tests for one chunk of series
+def unit_root_chunk(values, regression="c"):
+    """Runs the ADF and KPSS tests for series with a common sample.
+
+    Parameters:
+    values (numpy.ndarray): Series with shape (periods, series), without missing values.
+    regression (str): Deterministic terms, "c" (constant) or "ct" (constant and trend).
+
+    Returns:
+    results (pandas.DataFrame): Results of the ADF tests and KPSS tests (prefixed by "adf_"
+        and "kpss_").
+
+    """
+    return pd.concat(
+        [
+            adf_tests(values, regression).add_prefix("adf_"),
+            kpss_tests(values, regression).add_prefix("kpss_"),
+        ],
+        axis=1,
+    )
+
+
+# function that runs the unit root tests for all series
+def unit_root_tests(data, columns=None, regression="c", chunk_size=500, n_workers=1):
+    """Runs ADF and KPSS tests for all (numeric) columns of the data set. The series are
+    grouped by their sample and tested in chunks, which may be evaluated in parallel.
+
+    Parameters:
+    data(pandas.DataFrame): Data frame containing the series, ordered by time.
+    columns(list or None): Names of the tested columns. If None, all numeric
+        columns except the calendar columns (Year, Quarter) are tested.
+    regression(str): Deterministic terms, "c" (constant) or "ct" (constant and trend).
+    chunk_size(int): Maximum number of series tested together.
+    n_workers(int): Number of worker processes.
+
+    Returns:
+    results(pandas.DataFrame): Results of the ADF and KPSS tests, indexed by the column names,
+        with the first and last row position of the sample ("start", "end", see
+        common_samples). Columns which are not tested (no observations or no variation) are
+        reported with missing results.
+
+    """
+    if columns is None:
+        columns = [
+            column
+            for column in data.select_dtypes("number").columns
+            if column not in calendar_columns
+        ]
+    chunks = []
+    for (start, end), names in common_samples(data, columns).items():
+        for i in range(0, len(names), chunk_size):
+            chunks.append((start, end, names[i : i + chunk_size]))
+    values = [
+        data[names].iloc[start:end].to_numpy(dtype=float)
+        for start, end, names in chunks
+    ]
+
+    if n_workers == 1:
+        results = [unit_root_chunk(chunk, regression) for chunk in values]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            results = list(
+                executor.map(unit_root_chunk, values, [regression] * len(values)),
+            )
+    for result, (start, end, names) in zip(results, chunks):
+        result.index = names
+        result.insert(0, "start", start)
+        result.insert(1, "end", end)
+    results = pd.concat(results)
+    return results.reindex(columns)
+
+
+# function that runs the Engle-Granger cointegration tests
+def engle_granger_tests(data, dependents, regressors, trend="c"):
+    """Runs Engle-Granger cointegration tests of every dependent variable with every
+    regressor (as coint of statsmodels). The cointegrating regressions of all pairs are
+    solved at once and the ADF tests of their residuals are batched.
+
+    Parameters:
+    data(pandas.DataFrame): Data frame containing the series, ordered by time.
+    dependents(list): Names of the dependent variables (e.g. the outcome variables).
+    regressors(list): Names of the regressors (e.g. the main explanatory variables).
+    trend(str): Deterministic terms of the cointegrating regressions, "c" or "ct".
+
+    Returns:
+    results(pandas.DataFrame): Results of the ADF tests of the residuals on the longest
+        stretch where both series are observed, indexed by the dependent variables and
+        regressors, with the number of observations of the cointegrating regressions
+        ("nobs_coint").
+
+    """
+    pairs = [
+        (dependent, regressor) for dependent in dependents for regressor in regressors
+    ]
+    frames = []
+    # pairs are tested on the longest stretch where both series are observed, such that
+    # the residuals keep their time ordering
+    stretches = longest_stretches(
+        np.column_stack([data[list(pair)].notna().all(axis=1) for pair in pairs])
+    )
+    for stretch in dict.fromkeys(stretches):
+        first, last = stretch
+        if last == first:
+            continue
+        selected = [pair for pair, s in zip(pairs, stretches) if s == stretch]
+        sample = data.iloc[first:last]
+        y = np.column_stack([sample[dependent] for dependent, _ in selected])
+        x = np.column_stack([sample[regressor] for _, regressor in selected])
+        n_obs = len(y)
+        deterministic = np.ones((n_obs, 1))
+        if trend == "ct":
+            deterministic = np.column_stack([deterministic, np.arange(1, n_obs + 1)])
+        design = np.concatenate(
+            [
+                x.T[:, :, None],
+                np.broadcast_to(deterministic, (len(selected),) + deterministic.shape),
+            ],
+            axis=2,
+        )
+        coefficients, _, _ = batched_least_squares(design, y.T)
+        residuals = y - np.einsum("snk,sk->ns", design, coefficients)
+        result = adf_tests(residuals, regression="n", n_variables=2)
+        # p-values and critical values of the cointegration tests use the trend of the
+        # cointegrating regressions
+        result["p_value"] = [
+            mackinnonp(statistic, regression=trend, N=2)
+            for statistic in result["statistic"]
+        ]
+        result[["crit_1%", "crit_5%", "crit_10%"]] = mackinnoncrit(
+            N=2,
+            regression=trend,
+            nobs=n_obs - 1,
+        )
+        result["nobs_coint"] = n_obs
+        result.index = pd.MultiIndex.from_tuples(
+            selected, names=["dependent", "regressor"]
+        )
+        frames.append(result)
+    return pd.concat(frames).reindex(pd.MultiIndex.from_tuples(pairs))
+
+
+# function that runs the time series diagnostics of the model variables
+def run_time_series_diagnostics(data, leads=True, n_workers=1):
+    """Runs unit root and stationarity tests for all numeric columns of the data set and
+    Engle-Granger cointegration tests of the outcome variables with the main explanatory
+    variables.
+
+    Parameters:
+    data(pandas.DataFrame): Data frame containing the variables used for fitting the models.
+    leads(bool): If True, the outcome variables with leads are used (baseline regressions),
+        otherwise the outcome variables without leads (robustness checks).
+    n_workers(int): Number of worker processes for the unit root tests.
+
+    Returns:
+    diagnostics(dict): Dictionary containing the "unit_root" and "cointegration" test results.
+
+    """
+    suffix = "_lead" if leads else ""
+    return {
+        "unit_root": unit_root_tests(data, n_workers=n_workers),
+        "cointegration": engle_granger_tests(
+            data,
+            [f"{variable}{suffix}" for variable in outcome_variables],
+            explanatory_variables,
+        ),
+    }
@@ -0,0 +1,445 @@
+####################################### VAR Model #######################################
+### Besides the single equation regressions, the dynamic interactions between financial ###
+### development and the labor cost differences are estimated by a vector autoregression ###
+### (VAR), with Granger causality tests and impulse responses with bootstrap bands      ###
+
+### all equations are fitted with one multi-column solve of the normal equations, whose ###
+### cross products are calculated from strided views of the lagged series (the lagged   ###
+### design is never materialized) and the information criteria of all lag orders are   ###
+### obtained from the cross products of the largest lag order                            ###
+
+
+### packages ###
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import stats
+
+from financial_development_and_income_inequality.analysis.least_squares import (
+    outcome_variables,
+)
+
+# variables of the VAR model (fin_dev_all is not included, since it is the sum of
+# fin_dev_db and fin_dev_fb)
+var_variables = ["fin_dev_db", "fin_dev_fb"] + outcome_variables
+
+
+# function that selects the sample of the VAR model
+def complete_sample(data, variables):
+    """Returns the values of the variables without the observations with missing values at
+    the start or end of the sample (e.g. due to the leads and growth rates). Missing values
+    within the sample would break the lag structure and are not dropped.
+
+    Parameters:
+    data(pandas.DataFrame): Data frame containing the variables, ordered by time.
+    variables(list): Names of the variables.
+
+    Returns:
+    values(numpy.ndarray): Values with shape (periods, variables), without missing values.
+
+    """
+    values = data[variables].to_numpy(dtype=float)
+    complete = np.isfinite(values).all(axis=1)
+    if not complete.any():
+        raise ValueError("There is no observation without missing values.")
+    first = complete.argmax()
+    last = len(values) - complete[::-1].argmax()
+    gaps = ~np.isfinite(values[first:last]).all(axis=0)
+    if gaps.any():
+        raise ValueError(
+            "Missing values within the sample of the variables "
+            f"{[v for v, gap in zip(variables, gaps) if gap]}.",
+        )
+    return values[first:last]
+
+
+# function that creates the lagged series as a view
+def lagged_view(values, lags):
+    """Creates the current and lagged values of the series as strided views.
+
+    Parameters:
+    values (numpy.ndarray): Series with shape (..., periods, variables).
+    lags (int): Number of lags.
+
+    Returns:
+    Y (numpy.ndarray): Current values with shape (..., observations, variables).
+    L (numpy.ndarray): Lagged values with shape (..., observations, lags, variables), where
+        L[..., t, i - 1, k] is the i-th lag of variable k at observation t.
+
+    """
+    windows = sliding_window_view(values, lags + 1, axis=-2)
+    # windows[..., t, k, w] = values[..., t + w, k], the last element is the current value
+    return values[..., lags:, :], np.swapaxes(windows[..., -2::-1], -1, -2)
+
+
+# function that calculates the cross products of the VAR design
+def var_cross_products(values, lags):
+    """Calculates the cross products of the design (intercept and lags) and the current
+    values of the series, without materializing the lagged design.
+
+    Parameters:
+    values (numpy.ndarray): Series with shape (..., periods, variables).
+    lags (int): Number of lags.
+
+    Returns:
+    gram (numpy.ndarray): Cross products of the design with shape (..., 1 + lags * variables,
+        1 + lags * variables), the columns are ordered as intercept, first lag, second lag...
+    cross (numpy.ndarray): Cross products of the design and the current values with shape
+        (..., 1 + lags * variables, variables).
+    yy (numpy.ndarray): Cross products of the current values.
+
+    """
+    Y, L = lagged_view(values, lags)
+    n_obs, n_vars = Y.shape[-2:]
+    batch = Y.shape[:-2]
+    n_coef = 1 + lags * n_vars
+    gram = np.empty(batch + (n_coef, n_coef))
+    cross = np.empty(batch + (n_coef, n_vars))
+    lag_sums = L.sum(axis=-3).reshape(batch + (-1,))
+    gram[..., 0, 0] = n_obs
+    gram[..., 0, 1:] = lag_sums
+    gram[..., 1:, 0] = lag_sums
+    gram[..., 1:, 1:] = np.einsum("...tik,...tjl->...ikjl", L, L).reshape(
+        batch + (n_coef - 1, n_coef - 1),
+    )
+    cross[..., 0, :] = Y.sum(axis=-2)
+    cross[..., 1:, :] = np.einsum("...tik,...tl->...ikl", L, Y).reshape(
+        batch + (n_coef - 1, n_vars),
+    )
+    return gram, cross, np.einsum("...tk,...tl->...kl", Y, Y)
+
+
+# function that solves the normal equations of all equations at once
+def solve_normal_equations(gram, cross, yy, n_obs, rcond=1e-12):
+    """Calculates the coefficients and the residual covariance matrix of all equations.
+
+    Parameters:
+    gram (numpy.ndarray): Cross products of the design.
+    cross (numpy.ndarray): Cross products of the design and the current values.
+    yy (numpy.ndarray): Cross products of the current values.
+    n_obs (int): Number of observations.
+    rcond (float): Relative cutoff for small eigenvalues.
+
+    Returns:
+    coefficients (numpy.ndarray): Coefficients with shape (..., 1 + lags * variables, variables).
+    gram_inv (numpy.ndarray): (Pseudo-)inverse of the cross products of the design.
+    ssr (numpy.ndarray): Residual cross products with shape (..., variables, variables).
+
+    """
+    # scaling the columns improves the conditioning of the cross products
+    scale = np.sqrt(np.diagonal(gram, axis1=-2, axis2=-1)) / np.sqrt(n_obs)
+    scale = np.where(scale > 0, scale, 1)
+    scaled_inv = np.linalg.pinv(
+        gram / (scale[..., :, None] * scale[..., None, :]),
+        rcond=rcond,
+        hermitian=True,
+    )
+    gram_inv = scaled_inv / (scale[..., :, None] * scale[..., None, :])
+    coefficients = gram_inv @ cross
+    ssr = yy - np.swapaxes(cross, -1, -2) @ coefficients
+    return coefficients, gram_inv, ssr
+
+
+# function that fits the VAR model
+def fit_var(values, lags):
+    """Fits a VAR model with intercept by least squares, equation by equation.
+
+    Parameters:
+    values (numpy.ndarray): Series with shape (periods, variables), without missing values.
+    lags (int): Number of lags.
+
+    Returns:
+    fit (dict): Dictionary containing the "intercept" (variables), the "lag_coefficients"
+        (lags, equations, variables), the residual covariance "sigma_u" (degrees of freedom
+        corrected), the "residuals", "nobs", "df_resid", "lags" and the inverse of the cross
+        products of the design ("gram_inv").
+
+    """
+    gram, cross, yy = var_cross_products(values, lags)
+    n_obs, n_vars = len(values) - lags, values.shape[1]
+    coefficients, gram_inv, ssr = solve_normal_equations(gram, cross, yy, n_obs)
+    intercept = coefficients[0]
+    lag_coefficients = coefficients[1:].reshape(lags, n_vars, n_vars).transpose(0, 2, 1)
+    Y, L = lagged_view(values, lags)
+    residuals = Y - intercept - np.einsum("tik,ilk->tl", L, lag_coefficients)
+    df_resid = n_obs - 1 - lags * n_vars
+    return {
+        "intercept": intercept,
+        "lag_coefficients": lag_coefficients,
+        "sigma_u": ssr / df_resid,
+        "residuals": residuals,
+        "nobs": n_obs,
+        "df_resid": df_resid,
+        "lags": lags,
+        "gram_inv": gram_inv,
+    }
+
+
+# function that calculates the information criteria of all lag orders
+def select_lag_order(values, maxlags=8):
+    """Calculates the information criteria (AIC, BIC, HQIC and FPE) of the VAR models with
+    0 to maxlags lags on the common sample of the model with maxlags lags. Since the
+    models are nested, all cross products are leading blocks of the cross products of
+    the largest model.
+
+    Parameters:
+    values (numpy.ndarray): Series with shape (periods, variables), without missing values.
+    maxlags (int): Largest number of lags.
+
+    Returns:
+    criteria (pandas.DataFrame): Information criteria, indexed by the number of lags.
+
+    """
+    gram, cross, yy = var_cross_products(values, maxlags)
+    n_obs, n_vars = len(values) - maxlags, values.shape[1]
+    criteria = []
+    for lags in range(maxlags + 1):
+        n_coef = 1 + lags * n_vars
+        _, _, ssr = solve_normal_equations(
+            gram[:n_coef, :n_coef],
+            cross[:n_coef],
+            yy,
+            n_obs,
+        )
+        _, logdet = np.linalg.slogdet(ssr / n_obs)
+        free_params = lags * n_vars**2 + n_vars
+        criteria.append(
+            {
+                "aic": logdet + 2 / n_obs * free_params,
+                "bic": logdet + np.log(n_obs) / n_obs * free_params,
+                "hqic": logdet + 2 * np.log(np.log(n_obs)) / n_obs * free_params,
+                "fpe": ((n_obs + n_coef) / (n_obs - n_coef)) ** n_vars * np.exp(logdet),
+            },
+        )
+    return pd.DataFrame(criteria, index=pd.Index(range(maxlags + 1), name="lags"))
+
+
+# function that runs the Granger causality tests of all pairs of variables
+def granger_causality(fit, names):
+    """Runs F-tests of the null hypothesis that a variable does not Granger-cause
+    another variable, for all pairs of variables at once.
+
+    Parameters:
+    fit (dict): Fitted VAR model (see fit_var).
+    names (list): Names of the variables.
+
+    Returns:
+    results (pandas.DataFrame): F-statistics ("statistic"), "p_value" and degrees of freedom
+        ("df_num", "df_denom"), indexed by the caused and causing variables.
+
+    """
+    lags, n_vars = fit["lags"], len(names)
+    # coefficients of variable j in equation i, with shape (equations, variables, lags)
+    restricted = fit["lag_coefficients"].transpose(1, 2, 0)
+    # covariance blocks of the lags of every variable, with shape (variables, lags, lags)
+    blocks = fit["gram_inv"][1:, 1:].reshape(lags, n_vars, lags, n_vars)
+    blocks = np.einsum("ijkj->jik", blocks)
+    block_inv = np.linalg.inv(blocks)
+    quadratic = np.einsum("eji,jik,ejk->ej", restricted, block_inv, restricted)
+    statistic = quadratic / np.diag(fit["sigma_u"])[:, None] / lags
+    p_value = stats.f.sf(statistic, lags, fit["df_resid"])
+    index = pd.MultiIndex.from_product([names, names], names=["caused", "causing"])
+    results = pd.DataFrame(
+        {
+            "statistic": statistic.ravel(),
+            "p_value": p_value.ravel(),
+            "df_num": lags,
+            "df_denom": fit["df_resid"],
+        },
+        index=index,
+    )
+    return results[
+        index.get_level_values("caused") != index.get_level_values("causing")
+    ]
+
+
+# function that calculates the impulse responses
+def impulse_responses(lag_coefficients, sigma_u, horizon, orthogonalized=True):
+    """Calculates the (orthogonalized) impulse responses of VAR models, for a batch of
+    coefficients at once.
+
+    Parameters:
+    lag_coefficients (numpy.ndarray): Coefficients with shape (..., lags, variables, variables).
+    sigma_u (numpy.ndarray): Residual covariance matrices with shape (..., variables, variables).
+    horizon (int): Number of periods after the impulse.
+    orthogonalized (bool): If True, the impulses are orthogonalized by the Cholesky
+        decomposition of the residual covariance matrix (in the order of the variables).
+
+    Returns:
+    responses (numpy.ndarray): Responses with shape (..., horizon + 1, responding variables,
+        impulse variables).
+
+    """
+    lags, n_vars = lag_coefficients.shape[-3], lag_coefficients.shape[-1]
+    batch = lag_coefficients.shape[:-3]
+    responses = np.zeros(batch + (horizon + 1, n_vars, n_vars))
+    responses[..., 0, :, :] = np.eye(n_vars)
+    for h in range(1, horizon + 1):
+        for i in range(1, min(h, lags) + 1):
+            responses[..., h, :, :] += (
+                lag_coefficients[..., i - 1, :, :] @ responses[..., h - i, :, :]
+            )
+    if orthogonalized:
+        responses = responses @ np.linalg.cholesky(sigma_u)[..., None, :, :]
+    return responses
+
+
+# function that simulates and refits a chunk of bootstrap replicates
+def bootstrap_chunk(shared, seed_sequence, n_replicates):
+    """Simulates series from the fitted VAR model with resampled residuals, refits the
+    model and calculates the impulse responses, for one chunk of replicates.
+
+    Parameters:
+    shared (dict): Arrays shared by all replicates (see bootstrap_irf_bands).
+    seed_sequence (numpy.random.SeedSequence): Seed of the chunk.
+    n_replicates (int): Number of replicates in the chunk.
+
+    Returns:
+    responses (numpy.ndarray): Impulse responses with shape (replicates, horizon + 1,
+        variables, variables).
+
+    """
+    values, residuals = shared["values"], shared["residuals"]
+    intercept, lag_coefficients = shared["intercept"], shared["lag_coefficients"]
+    lags, (n_periods, n_vars) = len(lag_coefficients), values.shape
+    rng = np.random.default_rng(seed_sequence)
+    draws = residuals[rng.integers(0, len(residuals), (n_replicates, n_periods - lags))]
+
+    # the simulated series start with the observed initial values
+    simulated = np.empty((n_replicates, n_periods, n_vars))
+    simulated[:, :lags] = values[:lags]
+    for t in range(lags, n_periods):
+        simulated[:, t] = intercept + draws[:, t - lags]
+        for i in range(1, lags + 1):
+            simulated[:, t] += simulated[:, t - i] @ lag_coefficients[i - 1].T
+
+    gram, cross, yy = var_cross_products(simulated, lags)
+    n_obs = n_periods - lags
+    coefficients, _, ssr = solve_normal_equations(gram, cross, yy, n_obs)
+    replicated = coefficients[:, 1:].reshape(n_replicates, lags, n_vars, n_vars)
+    return impulse_responses(
+        replicated.transpose(0, 1, 3, 2),
+        ssr / (n_obs - 1 - lags * n_vars),
+        shared["horizon"],
+        shared["orthogonalized"],
+    )
+
+
+def _worker_chunk(shared, seed_sequence, n_replicates):
+    return bootstrap_chunk(shared, seed_sequence, n_replicates)
+
+
+# function that calculates bootstrap bands of the impulse responses
+# chunks are seeded deterministically, hence the bands do not depend on the number of workers
+def bootstrap_irf_bands(
+    values,
+    fit,
+    horizon=12,
+    orthogonalized=True,
+    n_replicates=500,
+    alpha=0.05,
+    seed=0,
+    chunk_size=100,
+    n_workers=1,
+):
+    """Calculates percentile bands of the impulse responses by a residual bootstrap.
+
+    Parameters:
+    values (numpy.ndarray): Series with shape (periods, variables), without missing values.
+    fit (dict): Fitted VAR model (see fit_var).
+    horizon (int): Number of periods after the impulse.
+    orthogonalized (bool): If True, orthogonalized impulse responses are used.
+    n_replicates (int): Number of bootstrap replicates.
+    alpha (float): Significance level of the bands.
+    seed (int): Seed of the random number generator.
+    chunk_size (int): Number of replicates simulated at once.
+    n_workers (int): Number of worker processes. If 1, the chunks are evaluated in the
+        current process.
+
+    Returns:
+    lower (numpy.ndarray): Lower bands with shape (horizon + 1, variables, variables).
+    upper (numpy.ndarray): Upper bands with the same shape.
+
+    """
+    shared = {
+        "values": values,
+        "residuals": fit["residuals"] - fit["residuals"].mean(axis=0),
+        "intercept": fit["intercept"],
+        "lag_coefficients": fit["lag_coefficients"],
+        "horizon": horizon,
+        "orthogonalized": orthogonalized,
+    }
+    sizes = [
+        min(chunk_size, n_replicates - start)
+        for start in range(0, n_replicates, chunk_size)
+    ]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if n_workers == 1:
+        responses = [bootstrap_chunk(shared, s, size) for s, size in zip(seeds, sizes)]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            responses = list(
+                executor.map(_worker_chunk, [shared] * len(sizes), seeds, sizes),
+            )
+    responses = np.concatenate(responses)
+    lower, upper = np.quantile(responses, [alpha / 2, 1 - alpha / 2], axis=0)
+    return lower, upper
+
+
+# function that runs the VAR analysis
+def run_var_model(
+    data,
+    variables=None,
+    maxlags=8,
+    criterion="aic",
+    horizon=12,
+    n_replicates=500,
+    n_workers=1,
+):
+    """Fits a VAR model of financial development and the labor cost differences, with the
+    number of lags selected by an information criterion, and calculates Granger causality
+    tests and orthogonalized impulse responses with bootstrap bands. Observations with
+    missing values at the start or end of the sample are excluded (see complete_sample).
+
+    Parameters:
+    data(pandas.DataFrame): Data frame containing the variables, ordered by time.
+    variables(list or None): Names of the variables. If None, fin_dev_db, fin_dev_fb and the
+        outcome variables (without leads) are used.
+    maxlags(int): Largest number of lags considered.
+    criterion(str): Information criterion used for the selection, "aic", "bic", "hqic" or "fpe".
+    horizon(int): Number of periods of the impulse responses.
+    n_replicates(int): Number of bootstrap replicates.
+    n_workers(int): Number of worker processes for the bootstrap.
+
+    Returns:
+    results(dict): Dictionary containing the "criteria" of all lag orders, the selected "lags",
+        the fitted model ("fit"), the "granger_causality" tests, the impulse "responses" and
+        their bootstrap bands ("lower", "upper") and the names of the "variables".
+
+    """
+    variables = list(var_variables if variables is None else variables)
+    values = complete_sample(data, variables)
+    criteria = select_lag_order(values, maxlags)
+    lags = max(int(criteria[criterion].idxmin()), 1)
+    fit = fit_var(values, lags)
+    lower, upper = bootstrap_irf_bands(
+        values,
+        fit,
+        horizon=horizon,
+        n_replicates=n_replicates,
+        n_workers=n_workers,
+    )
+    return {
+        "criteria": criteria,
+        "lags": lags,
+        "fit": fit,
+        "granger_causality": granger_causality(fit, variables),
+        "responses": impulse_responses(
+            fit["lag_coefficients"], fit["sigma_u"], horizon
+        ),
+        "lower": lower,
+        "upper": upper,
+        "variables": variables,
+    }
@@ -4,6 +4,9 @@ from pathlib import Path
 SRC = Path(__file__).parent.resolve()
 BLD = SRC.joinpath("..", "..", "bld").resolve()
 
+# shared store of the memoized stage results (see stage_cache)
+STAGE_CACHE = BLD.joinpath("stage_cache")
+
 PAPER_DIR = SRC.joinpath("..", "..", "presentation_project_work").resolve()
 
-__all__ = ["BLD", "SRC"]
+__all__ = ["BLD", "SRC", "STAGE_CACHE"]
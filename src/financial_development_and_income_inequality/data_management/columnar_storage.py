@@ -0,0 +1,73 @@
+####################################### Columnar Storage #######################################
+### the data sets are passed between the stages as uncompressed Arrow IPC (Feather) files,    ###
+### which are memory-mapped when read: only the requested columns are loaded, such that a    ###
+### task using a few variables does not deserialize the whole data set (as with pickle files) ###
+
+### the copy of the initial data set in the source folder (used by the tests) is a hard link ###
+### to the file in the build folder instead of a second file with the same content            ###
+
+
+### packages ###
+import os
+import shutil
+from pathlib import Path
+
+from pyarrow import feather
+
+
+# function that stores a data set as a Feather file
+def save_data_set(data, path):
+    """Stores a data set as an uncompressed Feather (Arrow IPC) file, such that it can be
+    memory-mapped when it is read.
+
+    Parameters:
+    data (pandas.DataFrame): Data set.
+    path (pathlib.Path): Path of the Feather file.
+
+    Returns:
+    None
+
+    """
+    feather.write_feather(data, path, compression="uncompressed")
+
+
+# function that loads (some columns of) a data set stored as a Feather file
+def load_data_set(path, columns=None):
+    """Loads a data set stored as a Feather file, memory-mapping the file and reading only
+    the given columns.
+
+    Parameters:
+    path (pathlib.Path): Path of the Feather file.
+    columns (list or None): Names of the columns read, in this order. If None, all columns.
+
+    Returns:
+    data (pandas.DataFrame): Data set with the requested columns.
+
+    """
+    table = feather.read_table(
+        path,
+        columns=None if columns is None else list(columns),
+        memory_map=True,
+    )
+    return table.to_pandas()
+
+
+# function that links a file to a second path
+def link_data_set(source, target):
+    """Creates a hard link to a file (replacing an existing file at the target path). The
+    file is copied if no hard link can be created, e.g. across file systems.
+
+    Parameters:
+    source (pathlib.Path): Path of the existing file.
+    target (pathlib.Path): Path of the link.
+
+    Returns:
+    None
+
+    """
+    target = Path(target)
+    target.unlink(missing_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
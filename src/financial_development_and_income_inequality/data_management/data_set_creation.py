@@ -12,6 +12,43 @@ import os
 import numpy as np
 import pandas as pd
 
+### Initial Data Files ###
+### every variable is loaded from a single initial data file, the same specification is used ###
+### when the data set is created at once (data_creation) and file by file (load_source)      ###
+
+# names of the initial data files by variable (in the order of the data set)
+source_files = {
+    "lcph_fin": "BBNZ1.Q.DE.N.H.0939.A.csv",
+    "lcph_prod": "BBNZ1.Q.DE.N.H.0931.A.csv",
+    "lcph_const": "BBNZ1.Q.DE.N.H.0933.A.csv",
+    "lcph_wsrt": "BBNZ1.Q.DE.N.H.0934.A.csv",
+    "lcph_inco": "BBNZ1.Q.DE.N.H.0948.A.csv",
+    "lcph_reest": "BBNZ1.Q.DE.N.H.0940.A.csv",
+    "lcph_bsns": "BBNZ1.Q.DE.N.H.0938.A.csv",
+    "lcph_pseh": "BBNZ1.Q.DE.N.H.0941.A.csv",
+    "lcph_other": "BBNZ1.Q.DE.N.H.0947.A.csv",
+    "BDAC": "BBK01.OU0001.csv",
+    "BDFB": "BBK01.OU1664.csv",
+    "fb_num": "Number of Foreign Banks.csv",
+    "GDP_nom": "BBNZ1.Q.DE.N.G.0000.A.csv",
+    "gvt_cs": "BBNZ1.Q.DE.N.G.0106.A.csv",
+    "CPI": "BBDP1.M.DE.Y.VPI.C.A00000.I15.A.csv",
+    "GDP_per_cap": "namq_10_pc__custom_4327625_page_linear.csv.gz",
+    "agri_gdp": "namq_10_a10__custom_4327784_page_linear.csv.gz",
+    "edu_att": "edat_lfse_03__custom_4306995_page_spreadsheet.xlsx",
+    "FSI": "Financial Stress Index Germany.csv",
+}
+# labor costs per hour across sectors
+labor_cost_variables = [name for name in source_files if name.startswith("lcph_")]
+# rows (monthly values from 1991 until 2020) and column of the deposit files
+deposit_arguments = {
+    "BDAC": {"row_range": range(509, 869), "target_col": "BBK01.OU0001"},
+    "BDFB": {"row_range": range(5, 365), "target_col": 0},
+}
+# header row of the deposit files (the file of the foreign banks has none)
+deposit_headers = {source_files["BDAC"]: 0, source_files["BDFB"]: None}
+
+
 ### Creating the Data Frame ###
 
 # function that creates the initial data frame
@@ -95,24 +132,8 @@ def store_labor_costs(dataframe, data_dir):
     dataframe(pandas.DataFrame): Pandas data frame with newly created labor cost variables.
 
     """
-    codes = ["0939", "0931", "0933", "0934", "0948", "0940", "0938", "0941", "0947"]
-    varnames = [
-        "lcph_fin",
-        "lcph_prod",
-        "lcph_const",
-        "lcph_wsrt",
-        "lcph_inco",
-        "lcph_reest",
-        "lcph_bsns",
-        "lcph_pseh",
-        "lcph_other",
-    ]
-
-    for i in range(len(codes)):
-        code = codes[i]
-        varname = varnames[i]
-        filename = os.path.join(data_dir, "BBNZ1.Q.DE.N.H.") + code + ".A"
-        dataframe[varname] = load_csv_data_labor_costs(filename)
+    for varname in labor_cost_variables:
+        dataframe[varname] = _load_source_file(varname, data_dir)
     return dataframe
 
 
@@ -128,7 +149,6 @@ def load_csv_data_deposits(file_name, row_range, target_col):
     file_name (str): The path and name of the CSV file to be processed.
     row_range (iterable): The rows to be processed in the CSV file.
     target_col (int or str): The target column to be processed in the CSV file.
-    dataframe (pandas.DataFrame): The dataframe to which the processed data will be assigned.
 
     Returns:
     processed_data (list): The mean value of every 3 elements in the target column.
@@ -136,7 +156,7 @@ def load_csv_data_deposits(file_name, row_range, target_col):
     """
     df = pd.read_csv(
         file_name,
-        header=None if file_name.endswith("BBK01.OU1664.csv") else 0,
+        header=deposit_headers.get(os.path.basename(file_name), 0),
     )
     col = pd.to_numeric(df.loc[row_range, target_col])
     processed_data = list(col.groupby(np.arange(len(col)) // 3).mean())
@@ -155,19 +175,9 @@ def store_deposits(dataframe, data_dir):
     dataframe(pandas.DataFrame): Data frame where the newly created variables are stored.
 
     """
-    # bank deposits for all categories
-
-    dataframe["BDAC"] = load_csv_data_deposits(
-        os.path.join(data_dir, "BBK01.OU0001.csv"),
-        range(509, 869),
-        "BBK01.OU0001",
-    )
-    # bank deposits for foreign banks
-    dataframe["BDFB"] = load_csv_data_deposits(
-        os.path.join(data_dir, "BBK01.OU1664.csv"),
-        range(5, 365),
-        0,
-    )
+    # bank deposits for all categories and for foreign banks
+    for varname in deposit_arguments:
+        dataframe[varname] = _load_source_file(varname, data_dir)
     # bank deposits for domestic banks
     dataframe["BDDB"] = dataframe["BDAC"] - dataframe["BDFB"]
     return dataframe
@@ -190,35 +200,62 @@ def control_variables_deutsche_bundesbank(dataframe, data_dir):
 
     """
     # number of foreign banks in Germany (saving the values with integer type)
-    dataframe["fb_num"] = (
-        pd.read_csv(os.path.join(data_dir, "Number of Foreign Banks.csv"))[272:632]
-        .iloc[::3, 1]
-        .values.astype(int)
-    )
+    dataframe["fb_num"] = _load_source_file("fb_num", data_dir)
     # GDP nominal
-    dataframe["GDP_nom"] = list(
-        pd.read_csv(os.path.join(data_dir, "BBNZ1.Q.DE.N.G.0000.A.csv"))
-        .iloc[range(6, 126), 1]
-        .astype(float),
-    )
+    dataframe["GDP_nom"] = _load_source_file("GDP_nom", data_dir)
     # Government consumption
-    dataframe["gvt_cs"] = (
-        list(
-            pd.read_csv(os.path.join(data_dir, "BBNZ1.Q.DE.N.G.0106.A.csv"))
-            .iloc[range(6, 126), 1]
-            .astype(float),
-        )
-        / dataframe["GDP_nom"]
-    )
+    dataframe["gvt_cs"] = _load_source_file("gvt_cs", data_dir) / dataframe["GDP_nom"]
     # Consumer Price Index
-    dataframe["CPI"] = (
-        pd.read_csv(os.path.join(data_dir, "BBDP1.M.DE.Y.VPI.C.A00000.I15.A.csv"))
+    dataframe["CPI"] = _load_source_file("CPI", data_dir)
+    return dataframe
+
+
+# function that loads quarterly data from an csv file of Deutsche Bundesbank
+def load_csv_data_quarterly(file_name):
+    """Loads the quarterly values from 1991 until 2020 from an csv file of Deutsche Bundesbank.
+
+    Parameters:
+    file_name (str): The path and name of the csv file.
+
+    Returns:
+    data (list): The quarterly values (float).
+
+    """
+    return list(pd.read_csv(file_name).iloc[range(6, 126), 1].astype(float))
+
+
+# function that loads the number of foreign banks in Germany
+def load_foreign_banks_number(file_name):
+    """Loads the number of foreign banks in Germany at the beginning of every quarter.
+
+    Parameters:
+    file_name (str): The path and name of the csv file.
+
+    Returns:
+    data (numpy.ndarray): The number of foreign banks (integer).
+
+    """
+    return pd.read_csv(file_name)[272:632].iloc[::3, 1].values.astype(int)
+
+
+# function that loads the consumer price index
+def load_consumer_price_index(file_name):
+    """Loads the monthly consumer price index, indexed by the quarter (a third for every month).
+
+    Parameters:
+    file_name (str): The path and name of the csv file.
+
+    Returns:
+    data (pandas.Series): The consumer price index.
+
+    """
+    return (
+        pd.read_csv(file_name)
         .iloc[range(4, 364), 1]
         .astype(float)
         .groupby(np.arange(360) / 3)
         .mean()
     )
-    return dataframe
 
 
 ### Data Gathered from Eurostat ###
@@ -236,38 +273,43 @@ def control_variables_eurostat(dataframe, data_dir):
     dataframe(pandas.DataFrame): Data frame with newly created control variables.
 
     """
-    # GDP per capita (converting the value measurement from millions to billions)
-    dataframe["GDP_per_cap"] = (
-        pd.read_csv(
-            os.path.join(data_dir, "namq_10_pc__custom_4327625_page_linear.csv.gz"),
-        )
-        .loc[:, "OBS_VALUE"]
-        .astype(float)
-    ) / 1000
-    # Share of agricultural sector in nominal GDP
-    dataframe["agri_gdp"] = (
-        pd.read_csv(
-            os.path.join(data_dir, "namq_10_a10__custom_4327784_page_linear.csv.gz"),
-        )
-        .loc[:, "OBS_VALUE"]
-        .astype(float)
-    )
-    # Population by education attainment level
-    edu_att = (
-        pd.read_excel(
-            os.path.join(
-                data_dir,
-                "edat_lfse_03__custom_4306995_page_spreadsheet.xlsx",
-            ),
-        )
-        .loc[11, :]
-        .dropna()
-    )
+    # GDP per capita (in billions), share of agricultural sector in nominal GDP and
+    # population by education attainment level
+    for varname in ["GDP_per_cap", "agri_gdp", "edu_att"]:
+        dataframe[varname] = _load_source_file(varname, data_dir)
+    return dataframe
+
+
+# function that loads the observed values from an csv file of Eurostat
+def load_csv_data_eurostat(file_name):
+    """Loads the observed values from an (compressed) csv file of Eurostat.
+
+    Parameters:
+    file_name (str): The path and name of the csv file.
+
+    Returns:
+    data (pandas.Series): The observed values (float).
+
+    """
+    return pd.read_csv(file_name).loc[:, "OBS_VALUE"].astype(float)
+
+
+# function that loads the population by education attainment level
+def load_education_attainment(file_name):
+    """Loads the yearly population by education attainment level from an excel file of
+    Eurostat, repeated for every quarter (the missing years are NaN).
+
+    Parameters:
+    file_name (str): The path and name of the excel file.
+
+    Returns:
+    data (numpy.ndarray): The quarterly values.
+
+    """
+    edu_att = pd.read_excel(file_name).loc[11, :].dropna()
     # filtering the list to include only numeric values
     edu_att = [value for value in edu_att if isinstance(value, (int, float))]
-    # creating the variable
-    dataframe["edu_att"] = np.repeat(np.insert(edu_att, [0, 6], np.nan, axis=0), 4)
-    return dataframe
+    return np.repeat(np.insert(edu_att, [0, 6], np.nan, axis=0), 4)
 
 
 ### Data Gathered from European Central Bank ###
@@ -284,6 +326,22 @@ def control_variable_ecb(dataframe, data_dir):
     Returns:
     dataframe(pandas.DataFrame): Data frame with a newly created control variable "FSI".
 
+    """
+    # creating the control variable (financial stress index Germany)
+    dataframe["FSI"] = _load_source_file("FSI", data_dir)
+    return dataframe
+
+
+# function that loads the financial stress index of Germany
+def load_financial_stress_index(file_name):
+    """Loads the monthly financial stress index of Germany and calculates the quarterly means.
+
+    Parameters:
+    file_name (str): The path and name of the csv file.
+
+    Returns:
+    data (pandas.Series): The quarterly financial stress index.
+
     """
     # defining the column names
     col_names = [
@@ -293,17 +351,12 @@ def control_variable_ecb(dataframe, data_dir):
         "Quarterly Values",
     ]
     # loading the csv file and re-indexing
-    financial_stress_data = pd.read_csv(
-        os.path.join(data_dir, "Financial Stress Index Germany.csv"),
-        names=col_names,
-    ).loc[::-1]
-    # creating the control variable (financial stress index Germany)
-    dataframe["FSI"] = (
+    financial_stress_data = pd.read_csv(file_name, names=col_names).loc[::-1]
+    return (
         pd.to_numeric(financial_stress_data.loc[365:6, "Monthly Values"])
         .groupby(np.arange(360) // 3)
         .mean()
     )
-    return dataframe
 
 
 ### Control Variable indicating the period for Global Financial Crisis ###
@@ -330,3 +383,78 @@ def control_fin_crisis(dataframe):
         0,
     )
     return dataframe
+
+
+# function that loads the variable of a single initial data file
+def load_source(variable, file_name):
+    """Loads the variable contained in a single initial data file (see source_files). The
+    government consumption is loaded in levels, it is divided by the nominal GDP in
+    assemble_data_set.
+
+    Parameters:
+    variable (str): The name of the variable.
+    file_name (str or pathlib.Path): The path and name of the initial data file.
+
+    Returns:
+    dataframe (pandas.DataFrame): Data frame with the variable as its only column (120 quarters).
+
+    """
+    file_name = str(file_name)
+    if variable in labor_cost_variables:
+        values = load_csv_data_labor_costs(file_name.removesuffix(".csv"))
+    elif variable in deposit_arguments:
+        values = load_csv_data_deposits(file_name, **deposit_arguments[variable])
+    elif variable == "fb_num":
+        values = load_foreign_banks_number(file_name)
+    elif variable in ["GDP_nom", "gvt_cs"]:
+        values = load_csv_data_quarterly(file_name)
+    elif variable == "CPI":
+        values = load_consumer_price_index(file_name)
+    elif variable == "GDP_per_cap":
+        # converting the value measurement from millions to billions
+        values = load_csv_data_eurostat(file_name) / 1000
+    elif variable == "agri_gdp":
+        values = load_csv_data_eurostat(file_name)
+    elif variable == "edu_att":
+        values = load_education_attainment(file_name)
+    elif variable == "FSI":
+        values = load_financial_stress_index(file_name)
+    else:
+        raise ValueError(f"There is no initial data file for the variable {variable}.")
+    dataframe = pd.DataFrame(index=range(120))
+    dataframe[variable] = values
+    return dataframe
+
+
+# function that loads the variable of a single initial data file in data_dir
+def _load_source_file(variable, data_dir):
+    return load_source(variable, os.path.join(data_dir, source_files[variable]))[
+        variable
+    ]
+
+
+# function that assembles the initial data set from the variables of the single files
+def assemble_data_set(sources):
+    """Assembles the initial data set from the variables of the single initial data files,
+    adding the indicator variables and the variables calculated from several files. The result
+    is identical to the one of data_creation.
+
+    Parameters:
+    sources (dict): Data frames returned by load_source, by variable.
+
+    Returns:
+    dataframe(pandas.DataFrame): Finalized data frame containing all of the variables.
+
+    """
+    dataframe = indicator_variables(pd.DataFrame())
+    for variable in source_files:
+        dataframe[variable] = sources[variable][variable]
+    # bank deposits for domestic banks
+    dataframe.insert(
+        dataframe.columns.get_loc("BDFB") + 1,
+        "BDDB",
+        dataframe["BDAC"] - dataframe["BDFB"],
+    )
+    # government consumption relative to the nominal GDP
+    dataframe["gvt_cs"] = dataframe["gvt_cs"] / dataframe["GDP_nom"]
+    return control_fin_crisis(dataframe)
@@ -3,12 +3,20 @@
 ### after creating the data set with the python file "data_set_creation" ###
 ### here the outcome and explanatory variables are generated ###
 
+### packages ###
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
 # function for generating the outcome and explanatory variables
 def generate_variables(
     df,
     sectors_percentage_increase_calculation,
     sectors_percentage_increase_diff,
     target_col,
+    deflation=None,
+    seasonal_adjustment=None,
 ):
     """Generates variables by calling the functions and stores the variables in the
     "initial_data_set" pandas data frame.
@@ -20,11 +28,23 @@ def generate_variables(
                    2) The column name in the data frame used for percentage increase calculation.
     sectors_percentage_increase_diff(list): List of sector columns.
     target_col(str): Target sector name (financial sector).
+    deflation(dict or None): If None, the variables are generated in nominal terms. Otherwise,
+                   the arguments of "deflate_columns" (e.g. the nominal "columns" and the
+                   "base_period"), and all variables are generated in real terms.
+    seasonal_adjustment(dict or None): If None, the variables are generated from the raw series.
+                   Otherwise, the arguments of "adjust_seasonality" (e.g. the "columns" which are
+                   not seasonally adjusted), and all variables are generated from the adjusted series.
 
     Returns:
     df(pandas.DataFrame): Pandas data frame where the newly generated variables are stored.
 
     """
+    # seasonally adjusted series
+    if seasonal_adjustment is not None:
+        df = adjust_seasonality(df, **seasonal_adjustment)
+    # real terms (deflated nominal variables)
+    if deflation is not None:
+        df = deflate_columns(df, **deflation)
     # mean calculation
     df = mean_calculation(df)
     # percentage increase calculation
@@ -42,6 +62,209 @@ def generate_variables(
     return df
 
 
+###                      seasonal adjustment                             ###
+### labor costs and GDP from the Deutsche Bundesbank are not seasonally    ###
+### adjusted, their seasonal factors are estimated by a moving average     ###
+### decomposition, for all series of a country at once                     ###
+
+# function for estimating the seasonal factors
+def seasonal_factors(values, quarters, model="multiplicative"):
+    """Estimates the seasonal factors of quarterly series by a moving average
+    decomposition: the trend is the centered 2x4 moving average and the seasonal factor of
+    a quarter is the mean deviation from the trend in that quarter (normalized over the
+    four quarters).
+
+    Parameters:
+    values(numpy.ndarray): Series with shape (periods, series), ordered by time.
+    quarters(numpy.ndarray): Quarter (1 to 4) of every period.
+    model(str): Either "multiplicative" (deviations are ratios) or "additive" (differences).
+
+    Returns:
+    factors(numpy.ndarray): Seasonal factors with shape (periods, series).
+
+    """
+    trend = np.full(values.shape, np.nan)
+    if len(values) >= 5:
+        weights = np.array([1, 2, 2, 2, 1]) / 8
+        trend[2:-2] = sliding_window_view(values, 5, axis=0) @ weights
+    deviations = values / trend if model == "multiplicative" else values - trend
+    factors = np.stack(
+        [
+            np.nanmean(deviations[quarters == quarter], axis=0)
+            for quarter in range(1, 5)
+        ],
+    )
+    if model == "multiplicative":
+        factors = factors / factors.mean(axis=0)
+    else:
+        factors = factors - factors.mean(axis=0)
+    return factors[np.asarray(quarters) - 1]
+
+
+# function for seasonally adjusting the series of one country
+def seasonally_adjust(values, quarters, model="multiplicative"):
+    """Removes the seasonal factors from quarterly series.
+
+    Parameters:
+    values(numpy.ndarray): Series with shape (periods, series), ordered by time.
+    quarters(numpy.ndarray): Quarter (1 to 4) of every period.
+    model(str): Either "multiplicative" or "additive".
+
+    Returns:
+    adjusted(numpy.ndarray): Seasonally adjusted series with shape (periods, series).
+
+    """
+    factors = seasonal_factors(values, quarters, model)
+    return values / factors if model == "multiplicative" else values - factors
+
+
+# function for seasonally adjusting the series of all countries
+def adjust_seasonality(df, columns, model="multiplicative", n_workers=1):
+    """Seasonally adjusts the series of every country and stores the adjusted series
+    instead of the raw ones. The countries are adjusted in parallel if several workers
+    are used.
+
+    Parameters:
+    df(pandas.DataFrame): Data frame containing the series and the variables "Country" and "Quarter".
+    columns(list): Names of the series which are not seasonally adjusted.
+    model(str): Either "multiplicative" or "additive".
+    n_workers(int): Number of worker processes, each adjusting one country at a time.
+
+    Returns:
+    df(pandas.DataFrame): Data frame where the raw series are replaced by the adjusted series.
+
+    """
+    values = df[columns].to_numpy(dtype=float)
+    quarters = df["Quarter"].to_numpy()
+    rows = list(df.groupby("Country", sort=False).indices.values())
+    blocks = [values[positions] for positions in rows]
+    periods = [quarters[positions] for positions in rows]
+    if n_workers == 1:
+        adjusted = [seasonally_adjust(*args, model) for args in zip(blocks, periods)]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            adjusted = list(
+                executor.map(seasonally_adjust, blocks, periods, [model] * len(rows)),
+            )
+    for positions, block in zip(rows, adjusted):
+        values[positions] = block
+    df[columns] = values
+    return df
+
+
+###                          real terms                                  ###
+### labor costs, deposits and GDP are nominal, they can be deflated by the ###
+### price index (CPI) before the outcome and explanatory variables are     ###
+### generated, such that all variables are obtained in real terms          ###
+
+# function for rebasing the price index
+def rebased_price_index(df, price_index="CPI", base_period=None):
+    """Rebases the price index, such that its mean in the base period is one.
+
+    Parameters:
+    df(pandas.DataFrame): Data frame containing the price index and the variables "Year" and "Quarter".
+    price_index(str): Name of the price index.
+    base_period(int, tuple or None): Base period, either a year (e.g. 2015), a tuple of year and
+                   quarter (e.g. (1991, 1)) or None for the first quarter of the data set.
+
+    Returns:
+    deflator(numpy.ndarray): Rebased price index.
+
+    """
+    index = df[price_index].to_numpy(dtype=float)
+    if base_period is None:
+        base = index[:1]
+    elif isinstance(base_period, tuple):
+        year, quarter = base_period
+        base = index[
+            (df["Year"] == year).to_numpy() & (df["Quarter"] == quarter).to_numpy()
+        ]
+    else:
+        base = index[(df["Year"] == base_period).to_numpy()]
+    if not len(base):
+        raise ValueError(f"The base period {base_period} is not part of the data set.")
+    return index / base.mean()
+
+
+# class giving the nominal and real variants of the nominal variables
+class PriceTerms:
+    """Nominal and real variants of a data set, which share the block of nominal values:
+    the block is read once, the rebased price index and the real variant are only calculated
+    when they are first used, and the data set itself is never modified.
+
+    Only the nominal variables themselves have both variants. The variables derived from them
+    (e.g. fin_diff_* and fin_dev_*) are not updated in the real variant and are generated by
+    generate_variables for every variant (with deflation for the real terms).
+
+    Parameters:
+    df(pandas.DataFrame): Data frame containing the nominal variables and the price index.
+    columns(list): Names of the nominal variables.
+    price_index(str): Name of the price index.
+    base_period(int, tuple or None): Base period of the price index (see rebased_price_index).
+
+    """
+
+    def __init__(self, df, columns, price_index="CPI", base_period=None):
+        self.df = df
+        self.columns = list(columns)
+        self.price_index = price_index
+        self.base_period = base_period
+        self.values = df[self.columns].to_numpy(dtype=float)
+        self._deflator = None
+        self._real = None
+
+    @property
+    def deflator(self):
+        """Rebased price index (see rebased_price_index)."""
+        if self._deflator is None:
+            self._deflator = rebased_price_index(
+                self.df,
+                self.price_index,
+                self.base_period,
+            )
+        return self._deflator
+
+    @property
+    def nominal(self):
+        """Data frame with the variables in nominal terms (the data set itself)."""
+        return self.df
+
+    @property
+    def real(self):
+        """Data frame with the nominal variables replaced by the real variables, in prices of
+        the base period. All variables are deflated at once, by dividing the block of nominal
+        values by the price index. The other columns are shared with the data set.
+        """
+        if self._real is None:
+            real = self.df.copy(deep=False)
+            real[self.columns] = self.values / self.deflator[:, None]
+            self._real = real
+        return self._real
+
+    def variant(self, real):
+        """Returns the real variant if real is True, otherwise the nominal variant."""
+        return self.real if real else self.nominal
+
+
+# function for deflating the nominal variables
+def deflate_columns(df, columns, price_index="CPI", base_period=None):
+    """Deflates the nominal variables by the rebased price index (see PriceTerms). The
+    data frame passed is not modified.
+
+    Parameters:
+    df(pandas.DataFrame): Data frame containing the nominal variables and the price index.
+    columns(list): Names of the nominal variables.
+    price_index(str): Name of the price index.
+    base_period(int, tuple or None): Base period of the price index (see rebased_price_index).
+
+    Returns:
+    df(pandas.DataFrame): Data frame where the nominal variables are replaced by the real variables,
+    in prices of the base period.
+
+    """
+    return PriceTerms(df, columns, price_index, base_period).real
+
+
 ###                      outcome variables                               ###
 ### labor cost percentage increase differences between financial sector  ###
 ### and other sectors in the economy                                     ###
@@ -2,45 +2,83 @@
 
 ### packages ###
 
-import pandas as pd
 import pytask
 
 ## folders and function used for creating data set ##
-from financial_development_and_income_inequality.config import BLD, SRC
+from financial_development_and_income_inequality.config import BLD, SRC, STAGE_CACHE
+from financial_development_and_income_inequality.data_management.columnar_storage import (
+    link_data_set,
+    load_data_set,
+    save_data_set,
+)
 from financial_development_and_income_inequality.data_management.data_set_creation import (
-    data_creation,
+    assemble_data_set,
+    load_source,
+    source_files,
 )
+from financial_development_and_income_inequality.stage_cache import StageCache
+
+# directory of the variables loaded from the single initial data files
+sources_dir = BLD / "python" / "data" / "sources"
+# memoized stage results (files with a known content are not loaded again)
+stage_cache = StageCache(STAGE_CACHE)
+
+
+# one task for every initial data file, such that only changed files are loaded again
+for variable, file_name in source_files.items():
+
+    @pytask.mark.task(id=variable)
+    def task_load_source(
+        depends_on=SRC / "data" / "data_initial_files" / file_name,
+        produces=sources_dir / f"{variable}.arrow",
+        variable=variable,
+    ):
+        """Loads and stores the variable contained in a single initial data file.
 
+        Parameters:
+        depends_on (pathlib.Path): The path to the initial data file.
+        produces (pathlib.Path): The path to the Feather file of the variable.
+        variable (str): The name of the variable.
 
-# input directory
-@pytask.mark.depends_on(SRC / "data" / "data_initial_files/")
+        Returns:
+        None
+
+        """
+        save_data_set(stage_cache.call(load_source, variable, depends_on), produces)
+
+
+# input files
+@pytask.mark.depends_on(
+    {variable: sources_dir / f"{variable}.arrow" for variable in source_files},
+)
 
 # output directory
 @pytask.mark.produces(
     [
-        BLD / "python" / "data" / "initial_data_set.pkl",
-        SRC / "data" / "initial_data_set.pkl",
+        BLD / "python" / "data" / "initial_data_set.arrow",
+        SRC / "data" / "initial_data_set.arrow",
     ],
 )
 
 # function
 def task_create_initial_data_set(depends_on, produces):
-    """Creates and stores the initial data set, using the function data_creation.
+    """Creates and stores the initial data set, assembling the variables of the single
+    initial data files with the function assemble_data_set.
 
     Parameters:
-    depends_on (pathlib.Path): The path to the directory where the initial data files are located.
-    produces (pathlib.Path): The paths to the initial data set pickle files.
+    depends_on (dict): The paths to the Feather files of the variables, by variable.
+    produces (pathlib.Path): The paths to the initial data set Feather files (the second one is a
+        hard link to the first one).
 
     Returns:
     None
 
     """
-    # empty DataFrame
-    dataframe = pd.DataFrame()
-
-    # creating the initial data set with the function data_creation
-    initial_data_set = data_creation(dataframe, data_dir=depends_on)
+    # creating the initial data set from the variables of the single files
+    initial_data_set = assemble_data_set(
+        {variable: load_data_set(path) for variable, path in depends_on.items()},
+    )
 
-    # exporting the data in the specified folders
-    initial_data_set.to_pickle(produces[0])
-    initial_data_set.to_pickle(produces[1])
+    # exporting the data in the build folder and linking it into the source folder
+    save_data_set(initial_data_set, produces[0])
+    link_data_set(produces[0], produces[1])
@@ -4,14 +4,18 @@ set.
 
 ### packages ###
 
-import pandas as pd
 import pytask
 
 ### folders and function used for creating data set ###
-from financial_development_and_income_inequality.config import BLD, SRC
+from financial_development_and_income_inequality.config import BLD, STAGE_CACHE
+from financial_development_and_income_inequality.data_management.columnar_storage import (
+    load_data_set,
+    save_data_set,
+)
 from financial_development_and_income_inequality.data_management.data_set_management import (
     generate_variables,
 )
+from financial_development_and_income_inequality.stage_cache import StageCache
 
 ### defining parameter values used in the functions ###
 
@@ -27,37 +31,66 @@ sectors_percentage_increase_calculation = [
 sectors_percentage_increase_diff = ["all", "pc", "peh"]
 target_col = "fin"
 
+# used for deflating the nominal variables (labor costs, deposits and GDP)
+nominal_columns = [
+    "lcph_fin",
+    "lcph_prod",
+    "lcph_const",
+    "lcph_wsrt",
+    "lcph_inco",
+    "lcph_reest",
+    "lcph_bsns",
+    "lcph_pseh",
+    "lcph_other",
+    "BDAC",
+    "BDFB",
+    "BDDB",
+    "GDP_nom",
+]
+# used for seasonally adjusting the series of the Deutsche Bundesbank (labor costs and GDP)
+seasonal_columns = nominal_columns[:9] + ["GDP_nom"]
+# None for the raw series, e.g. {"columns": seasonal_columns} for seasonally adjusted series
+seasonal_adjustment = None
+# None for nominal terms, e.g. {"columns": nominal_columns, "base_period": 2015} for real
+# terms in prices of 2015
+deflation = None
+# memoized stage results (keyed by the initial data set and the parameters above)
+stage_cache = StageCache(STAGE_CACHE)
+
 ### pytask usage ###
 
 # input directory
-@pytask.mark.depends_on(SRC / "data" / "initial_data_set.pkl")
+@pytask.mark.depends_on(BLD / "python" / "data" / "initial_data_set.arrow")
 
 # output directory
 @pytask.mark.produces(
-    BLD / "python" / "data" / "final_data_set.pkl",
+    BLD / "python" / "data" / "final_data_set.arrow",
 )
 
 # function
 def task_create_finaL_data(depends_on, produces):
-    """Generates the final version of the data set and stores it in a pickle format,
+    """Generates the final version of the data set and stores it in the Feather format,
     using the "generate_variables" function.
 
     Parameters:
-    depends_on (pathlib.Path): The path to the initial data set pickle file.
-    produces (pathlib.Path): The path to the final data set pickle file.
+    depends_on (pathlib.Path): The path to the initial data set Feather file.
+    produces (pathlib.Path): The path to the final data set Feather file.
 
     Returns:
     None
 
     """
     # reading the initial data set
-    df = pd.read_pickle(depends_on)
+    df = load_data_set(depends_on)
     # function that generates the new variables and final version of the data set
-    final_data_set = generate_variables(
+    final_data_set = stage_cache.call(
+        generate_variables,
         df,
         sectors_percentage_increase_calculation,
         sectors_percentage_increase_diff,
         target_col,
+        deflation,
+        seasonal_adjustment,
     )
     # exporting the data in the specified folders
-    final_data_set.to_pickle(produces)
+    save_data_set(final_data_set, produces)
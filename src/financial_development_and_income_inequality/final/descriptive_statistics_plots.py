@@ -1,7 +1,26 @@
 ####################################### Descriptive Statistics Plots #######################################
 
+### the figures are created with the object-oriented interface of matplotlib, such that they ###
+### are not registered by pyplot and are released as soon as they are not referenced anymore   ###
+### (see figure_rendering, where the figures are rendered by the Agg backend)                  ###
+
 ### packages ###
-import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.figure import Figure
+
+# explanatory and outcome variables shown in the scatter plots
+x_variables = ["fin_dev_all", "fin_dev_db", "fin_dev_fb"]
+y_variables = ["fin_diff_all", "fin_diff_pc", "fin_diff_peh"]
+# pairs of explanatory and outcome variables shown in the scatter plots
+scatter_variables = [(x_var, y_var) for x_var in x_variables for y_var in y_variables]
+# sectors shown in the labor cost plot, by variable name
+labor_cost_sectors = {
+    "fin": "Finance",
+    "pc": "Production and Construction",
+    "peh": "Education and Health",
+    "all": "All Sectors",
+}
+
 
 ### Plots depicting rising income inequality in Germany ###
 
@@ -14,15 +33,11 @@ def labor_cost_increase_plot(data):
     data(pandas.DataFrame): Data frame used to obtain the variables used for plotting.
 
     Returns:
-    fig_labor_costs(matplotlib.figure): The figure object containing the generated plot.
+    fig_labor_costs(matplotlib.figure.Figure): The figure object containing the generated plot.
     """
-    fig_labor_costs, ax = plt.subplots()
-    for column, label in [
-        ("fin", "Finance"),
-        ("pc", "Production and Construction"),
-        ("peh", "Education and Health"),
-        ("all", "All Sectors"),
-    ]:
+    fig_labor_costs = Figure()
+    ax = fig_labor_costs.subplots()
+    for column, label in labor_cost_sectors.items():
         ax.plot(data["Year"], data[column], label=label)
     ax.set(
         xlabel="Year",
@@ -41,24 +56,51 @@ def foreign_banks_increase_plot(data):
     data(pandas.DataFrame): Data frame containing the variable used to generate the plot.
 
     Returns:
-    fig_foreign_banks(matplotlib.pyplot figure): Figure containing the generated plot.
+    fig_foreign_banks(matplotlib.figure.Figure): Figure containing the generated plot.
 
     """
     # choosing every third year for both variables
     years = data.loc[range(1, 120, 12), "Year"]
     banks = data.loc[range(1, 120, 12), "fb_num"]
     # empty figure object
-    fig_foreign_banks = plt.figure()
+    fig_foreign_banks = Figure()
+    ax = fig_foreign_banks.subplots()
     # number of foreign branches in Germany plot
-    plt.bar(years, banks)
-    plt.xlabel("Year")
-    plt.ylabel("Number of Foreign Branches")
-    plt.title("Number of Foreign Branches in Germany")
+    ax.bar(years, banks)
+    ax.set(
+        xlabel="Year",
+        ylabel="Number of Foreign Branches",
+        title="Number of Foreign Branches in Germany",
+    )
     return fig_foreign_banks
 
 
 ### Plots depicting bi-variate relationships between outcome and explanatory variables ###
 
+# function showing the bi-variate relationship between one indicator of financial development and one labor cost percentage increase difference
+def scatter_plot(data, x_var, y_var):
+    """Generates a scatter plot depicting the bi-variate relationship between an indicator of
+    financial development and an indicator of income inequality.
+
+    Parameters:
+    data(pandas.DataFrame): Data frame which contains the variables used for generating the plot.
+    x_var(str): Name of the indicator of financial development.
+    y_var(str): Name of the indicator of income inequality.
+
+    Returns:
+    fig(matplotlib.figure.Figure): Figure containing the scatter plot.
+    """
+    fig = Figure()
+    ax = fig.subplots()
+    # defining which variables to be plotted
+    ax.scatter(data[x_var], data[y_var], color="blue")
+    # labeling
+    ax.set_xlabel(f"Indicator of Financial Development ({x_var})", color="darkred")
+    ax.set_ylabel(f"Indicator of Income Inequality ({y_var})", color="darkred")
+    ax.set_title(f"Bivariate Relationship between {x_var} and {y_var}")
+    return fig
+
+
 # function showing the bi-variate relationship between financial development and labor cost percentage increase differences
 def gen_scatter_plots(data):
     """Generates multiple scatter plots depicting the bi-variate relationship between financial development
@@ -70,26 +112,75 @@ def gen_scatter_plots(data):
     Returns:
     fig_scatter_plots (list): List of figures containing the scatter plots amongst selected variables.
     """
-    # defining the variables used for the scatter plots
-    x_variables = ["fin_dev_all", "fin_dev_db", "fin_dev_fb"]
-    y_variables = ["fin_diff_all", "fin_diff_pc", "fin_diff_peh"]
-
-    # empty list to store figures
-    fig_scatter_plots = []
-
-    # scatter plots
-    # creating a nested loop to create all possible combinations
-    for _i, x_var in enumerate(x_variables):
-        for _j, y_var in enumerate(y_variables):
-            # creating a new figure for each plot
-            fig = plt.figure()
-            # defining which variables to be plotted
-            plt.scatter(data[x_var], data[y_var], color="blue")
-            # labeling
-            plt.xlabel(f"Indicator of Financial Development ({x_var})", color="darkred")
-            plt.ylabel(f"Indicator of Income Inequality ({y_var})", color="darkred")
-            plt.title(f"Bivariate Relationship between {x_var} and {y_var}")
-            # adding the figure to the list
-            fig_scatter_plots.append(fig)
-
-    return fig_scatter_plots
+    # one figure for every combination of the variables
+    return [scatter_plot(data, x_var, y_var) for x_var, y_var in scatter_variables]
+
+
+# function showing the bi-variate relationships between all explanatory and outcome variables in one figure
+def scatter_matrix_plot(
+    data,
+    x_variables=x_variables,
+    y_variables=y_variables,
+    max_points=10000,
+    density_points=1000000,
+    gridsize=40,
+    seed=0,
+):
+    """Generates a scatter matrix depicting the bi-variate relationships between all indicators of
+    financial development (columns) and of income inequality (rows) in one figure with shared axes.
+    The point layers are rasterized. With more than max_points observations, a random subsample of
+    max_points observations (the same in every panel) is drawn, and with more than density_points
+    observations, the density of the observations is shown by hexagonal bins instead.
+
+    Parameters:
+    data(pandas.DataFrame): Data frame which contains the variables used for generating the plot.
+    x_variables(list): Names of the indicators of financial development.
+    y_variables(list): Names of the indicators of income inequality.
+    max_points(int): Maximum number of points drawn in every panel.
+    density_points(int): Number of observations above which hexagonal bins are drawn.
+    gridsize(int): Number of hexagons in the horizontal direction.
+    seed(int): Seed of the subsample.
+
+    Returns:
+    fig_scatter_matrix(matplotlib.figure.Figure): Figure containing the scatter matrix.
+    """
+    data = data[x_variables + y_variables]
+    density = len(data) > density_points
+    if not density and len(data) > max_points:
+        rows = np.random.default_rng(seed).choice(len(data), max_points, replace=False)
+        data = data.iloc[np.sort(rows)]
+    fig_scatter_matrix = Figure(
+        figsize=(3 * len(x_variables), 2.5 * len(y_variables)),
+        layout="constrained",
+    )
+    axes = fig_scatter_matrix.subplots(
+        len(y_variables),
+        len(x_variables),
+        sharex="col",
+        sharey="row",
+        squeeze=False,
+    )
+    for j, x_var in enumerate(x_variables):
+        for i, y_var in enumerate(y_variables):
+            ax = axes[i, j]
+            if density:
+                ax.hexbin(
+                    data[x_var],
+                    data[y_var],
+                    gridsize=gridsize,
+                    bins="log",
+                    mincnt=1,
+                    cmap="Blues",
+                    rasterized=True,
+                )
+            else:
+                ax.scatter(data[x_var], data[y_var], s=8, color="blue", rasterized=True)
+            # labeling the outer panels only
+            if i == len(y_variables) - 1:
+                ax.set_xlabel(x_var, color="darkred")
+            if j == 0:
+                ax.set_ylabel(y_var, color="darkred")
+    fig_scatter_matrix.suptitle(
+        "Bivariate Relationships between Financial Development and Income Inequality",
+    )
+    return fig_scatter_matrix
@@ -0,0 +1,262 @@
+####################################### Document Build #######################################
+### the presentation is only compiled again if the content of the document or of one of the ###
+### files it includes (tables, figures and the bibliography) has changed: the content hashes ###
+### of all inputs are compared with the ones of the last build, which are kept in a manifest ###
+
+### the preamble is precompiled into a format file (with the mylatexformat package), which   ###
+### is reused as long as the preamble is unchanged. The duration of every stage of the build ###
+### (hashing, format, compilation) is reported and stored next to the document               ###
+
+
+### packages ###
+import hashlib
+import json
+import re
+import shutil
+import subprocess
+import time
+from pathlib import Path
+
+# commands including files into the document (the file name is the last argument)
+input_commands = ["input", "include", "includegraphics", "addbibresource"]
+# options of latexmk used for compiling the document
+latexmk_options = [
+    "--pdf",
+    "--interaction=nonstopmode",
+    "--synctex=1",
+    "--cd",
+    "--quiet",
+    "--shell-escape",
+]
+
+
+# function that finds the files included into a latex document
+def document_inputs(tex_path):
+    """Finds the files included into a latex document by \\input, \\include, \\includegraphics and
+    \\addbibresource (commented lines are ignored). Relative paths are resolved from the folder
+    of the document.
+
+    Parameters:
+    tex_path (pathlib.Path): Path of the latex document.
+
+    Returns:
+    inputs (list): Paths of the included files, in the order of their first appearance.
+
+    """
+    text = re.sub(r"(?<!\\)%.*", "", Path(tex_path).read_text())
+    pattern = r"\\(?:%s)\s*(?:\[[^\]]*\])?\s*\{([^}]+)\}" % "|".join(input_commands)
+    inputs = []
+    for name in re.findall(pattern, text):
+        path = (Path(tex_path).parent / name.strip()).resolve()
+        if not path.suffix and not path.exists():
+            path = path.with_suffix(".tex")
+        if path not in inputs:
+            inputs.append(path)
+    return inputs
+
+
+# function that finds the inputs of a latex document which are not declared as dependencies
+def undeclared_inputs(tex_path, declared):
+    """Finds the files included into a latex document (see document_inputs) which are not among
+    the declared dependencies, e.g. inputs added to the document after the dependencies of the
+    task were collected.
+
+    Parameters:
+    tex_path (pathlib.Path): Path of the latex document.
+    declared (iterable): Paths of the declared dependencies.
+
+    Returns:
+    inputs (list): Paths of the undeclared inputs, in the order of their first appearance.
+
+    """
+    declared = {Path(path).resolve() for path in declared}
+    return [path for path in document_inputs(tex_path) if path not in declared]
+
+
+# function that hashes the content of several files
+def content_hash(paths):
+    """Calculates a hash of the names and contents of several files (missing files included).
+
+    Parameters:
+    paths (list): Paths of the files.
+
+    Returns:
+    key (str): Hexadecimal hash of the files.
+
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(str(path).encode())
+        digest.update(Path(path).read_bytes() if Path(path).exists() else b"missing")
+    return digest.hexdigest()
+
+
+# function that returns the preamble of a latex document
+def document_preamble(tex_path):
+    """Returns the preamble of a latex document (everything before \\begin{document}).
+
+    Parameters:
+    tex_path (pathlib.Path): Path of the latex document.
+
+    Returns:
+    preamble (str): Preamble of the document.
+
+    """
+    return Path(tex_path).read_text().split(r"\begin{document}")[0]
+
+
+# function that precompiles the preamble of a latex document
+def build_format(tex_path, build_dir):
+    """Precompiles the preamble of a latex document into a format file with mylatexformat.
+
+    Parameters:
+    tex_path (pathlib.Path): Path of the latex document.
+    build_dir (pathlib.Path): Directory of the format file.
+
+    Returns:
+    format_path (pathlib.Path or None): Path of the format file (without the extension ".fmt"),
+        None if the preamble could not be precompiled.
+
+    """
+    tex_path = Path(tex_path)
+    jobname = f"{tex_path.stem}_preamble"
+    if shutil.which("pdflatex") is None:
+        return None
+    result = subprocess.run(
+        [
+            "pdflatex",
+            "-ini",
+            "-shell-escape",
+            "-interaction=nonstopmode",
+            f"-jobname={jobname}",
+            f"-output-directory={build_dir}",
+            "&pdflatex",
+            "mylatexformat.ltx",
+            tex_path.name,
+        ],
+        cwd=tex_path.parent,
+        capture_output=True,
+        check=False,
+    )
+    format_path = Path(build_dir) / jobname
+    if result.returncode != 0 or not format_path.with_suffix(".fmt").exists():
+        return None
+    return format_path
+
+
+# function that compiles a latex document
+def compile_document(tex_path, build_dir, format_path=None):
+    """Compiles a latex document with latexmk, using a precompiled preamble if given. If the
+    compilation with the precompiled preamble fails, the document is compiled without it.
+
+    Parameters:
+    tex_path (pathlib.Path): Path of the latex document.
+    build_dir (pathlib.Path): Output directory of latexmk.
+    format_path (pathlib.Path or None): Path of the format file (see build_format).
+
+    Returns:
+    pdf_path (pathlib.Path): Path of the compiled document.
+
+    """
+    if shutil.which("latexmk") is None:
+        raise RuntimeError(
+            "latexmk is needed to compile LaTeX documents, but it is not found.",
+        )
+    command = ["latexmk", *latexmk_options, f"--output-directory={build_dir}"]
+    if format_path is not None:
+        result = subprocess.run(
+            [*command, f"--pdflatex=pdflatex -fmt={format_path} %O %S", str(tex_path)],
+            check=False,
+        )
+        if result.returncode == 0:
+            return Path(build_dir) / f"{Path(tex_path).stem}.pdf"
+    subprocess.run([*command, str(tex_path)], check=True)
+    return Path(build_dir) / f"{Path(tex_path).stem}.pdf"
+
+
+# function that loads the manifest of the last build
+def load_manifest(path):
+    """Loads the manifest of the last build of a document.
+
+    Parameters:
+    path (pathlib.Path): Path of the manifest ("json" file).
+
+    Returns:
+    manifest (dict): Content hashes of the last build. Empty if there is no (valid) manifest.
+
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+# function that builds a latex document incrementally
+def build_document(
+    tex_path,
+    build_dir,
+    use_format=True,
+    format_builder=build_format,
+    compiler=compile_document,
+):
+    """Builds a latex document if its content, the content of one of its inputs or its preamble
+    has changed since the last build, reusing the precompiled preamble if possible. The content
+    hashes are stored in "<document>_manifest.json" and the duration of every stage in
+    "<document>_build_report.json" in the build directory.
+
+    Parameters:
+    tex_path (pathlib.Path): Path of the latex document.
+    build_dir (pathlib.Path): Output directory of the document.
+    use_format (bool): Whether the preamble is precompiled into a format file.
+    format_builder (function): Function precompiling the preamble (see build_format).
+    compiler (function): Function compiling the document (see compile_document).
+
+    Returns:
+    report (dict): Duration of every stage in seconds and whether the preamble was
+        precompiled ("format_built") and the document compiled ("compiled").
+
+    """
+    tex_path, build_dir = Path(tex_path), Path(build_dir)
+    build_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = build_dir / f"{tex_path.stem}_manifest.json"
+    pdf_path = build_dir / f"{tex_path.stem}.pdf"
+    manifest = load_manifest(manifest_path)
+    report = {"format_built": False, "compiled": False}
+
+    # hashing the document and all its inputs
+    start = time.perf_counter()
+    hashes = {
+        "document": content_hash([tex_path, *document_inputs(tex_path)]),
+        "preamble": hashlib.sha256(document_preamble(tex_path).encode()).hexdigest(),
+    }
+    report["hash_seconds"] = time.perf_counter() - start
+
+    if manifest.get("document") != hashes["document"] or not pdf_path.exists():
+        # precompiling the preamble only if it has changed
+        start = time.perf_counter()
+        format_path = None
+        if use_format:
+            if manifest.get("format") is not None:
+                format_path = Path(manifest["format"])
+            if (
+                manifest.get("preamble") != hashes["preamble"]
+                or format_path is None
+                or not format_path.with_suffix(".fmt").exists()
+            ):
+                format_path = format_builder(tex_path, build_dir)
+                report["format_built"] = format_path is not None
+        report["format_seconds"] = time.perf_counter() - start
+
+        # compiling the document
+        start = time.perf_counter()
+        compiler(tex_path, build_dir, format_path)
+        report["compile_seconds"] = time.perf_counter() - start
+        report["compiled"] = True
+        hashes["format"] = None if format_path is None else str(format_path)
+        with open(manifest_path, "w") as f:
+            json.dump(hashes, f, indent=2)
+
+    with open(build_dir / f"{tex_path.stem}_build_report.json", "w") as f:
+        json.dump(report, f, indent=2)
+    return report
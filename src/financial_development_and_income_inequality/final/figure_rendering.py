@@ -0,0 +1,170 @@
+####################################### Figure Rendering #######################################
+### the figures are rendered without pyplot and without a display: every figure is created ###
+### by its plot function, drawn on an Agg canvas, saved and released right away, such that ###
+### at most one figure per worker process is alive at any time                              ###
+
+### the figures are declared as (plot function, keyword arguments, output path, plotted   ###
+### variables) and can be rendered in a process pool, where the plotted variables are sent ###
+### once to every worker process. A figure is only rendered again if the variables it      ###
+### plots, its keyword arguments, the source code of its plot function (and of the project ###
+### modules the function uses) or the matplotlib settings have changed since it was last   ###
+### saved (render cache). Checking the cache does not create any figure                    ###
+
+
+### packages ###
+import hashlib
+import inspect
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from financial_development_and_income_inequality.stage_cache import stage_modules
+
+# data used by the plot functions in the worker processes
+_worker_data = None
+
+
+# function that renders one figure and releases it
+def render_figure(plot, data, path, kwargs=None):
+    """Creates a figure with a plot function, renders it with the Agg backend, saves it and
+    releases it.
+
+    Parameters:
+    plot (function): Plot function taking the data (and keyword arguments) and returning a
+        matplotlib.figure.Figure.
+    data (pandas.DataFrame): Data frame used for plotting.
+    path (pathlib.Path): Path of the saved figure.
+    kwargs (dict or None): Further keyword arguments of the plot function.
+
+    Returns:
+    path (pathlib.Path): Path of the saved figure.
+
+    """
+    fig = plot(data, **(kwargs or {}))
+    FigureCanvasAgg(fig)
+    fig.savefig(path)
+    # the figure is cleared explicitly, its artists are released with the last reference
+    fig.clear()
+    return path
+
+
+# function that hashes everything a figure depends on
+def figure_key(plot, data, kwargs=None, columns=None):
+    """Calculates the key of a figure in the render cache, a hash of the plotted variables
+    (names, types, index and values), the keyword arguments, the source code of the plot
+    function and of all project modules it uses (see stage_cache.stage_modules, e.g. helper
+    functions and the lists of plotted variables), the matplotlib settings and version.
+
+    Parameters:
+    plot (function): Plot function.
+    data (pandas.DataFrame): Data frame used for plotting.
+    kwargs (dict or None): Further keyword arguments of the plot function.
+    columns (list or None): Names of the variables read by the plot function. If None, all variables.
+
+    Returns:
+    key (str): Hexadecimal hash of the figure.
+
+    """
+    plotted = data if columns is None else data[columns]
+    digest = hashlib.sha256()
+    for part in [
+        f"{plot.__module__}.{plot.__qualname__}",
+        inspect.getsource(plot),
+        *[inspect.getsource(module) for module in stage_modules(plot)],
+        repr(sorted((kwargs or {}).items())),
+        matplotlib.__version__,
+        # the backend is resolved when it is read and is not part of the key
+        repr(
+            sorted(
+                (name, value)
+                for name, value in dict.items(matplotlib.rcParams)
+                if name != "backend"
+            ),
+        ),
+        repr(list(plotted.columns)),
+        repr(list(plotted.dtypes.astype(str))),
+    ]:
+        digest.update(part.encode())
+    digest.update(pd.util.hash_pandas_object(plotted, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+# function that loads the render cache
+def load_render_cache(path):
+    """Loads the keys of the saved figures from the render cache.
+
+    Parameters:
+    path (pathlib.Path): Path of the render cache ("json" file).
+
+    Returns:
+    keys (dict): Key of every saved figure, by path of the figure. Empty if there is no (valid) cache.
+
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _initialize_worker(data):
+    global _worker_data
+    _worker_data = data
+
+
+def _worker_figure(plot, path, kwargs):
+    return render_figure(plot, _worker_data, path, kwargs)
+
+
+# function that renders several figures, possibly in parallel
+def render_figures(figures, data, n_workers=1, cache=None):
+    """Renders and saves several figures one by one, or in a process pool. With a render cache,
+    figures whose key (see figure_key) is unchanged and which still exist are skipped. Only the
+    plotted variables are sent to the worker processes.
+
+    Parameters:
+    figures (list of tuple): Plot function, keyword arguments (dict), output path and names of
+        the plotted variables (list, or None for all variables) of every figure.
+    data (pandas.DataFrame): Data frame used for plotting, sent once to every worker process.
+    n_workers (int): Number of worker processes, each rendering one figure at a time.
+    cache (pathlib.Path or None): Path of the render cache ("json" file). If None, all figures
+        are rendered.
+
+    Returns:
+    paths (list): Paths of the rendered figures.
+
+    """
+    keys = load_render_cache(cache) if cache is not None else {}
+    stale, columns = [], []
+    for plot, kwargs, path, plotted in figures:
+        columns = None if plotted is None or columns is None else columns + plotted
+        key = None if cache is None else figure_key(plot, data, kwargs, plotted)
+        if key is None or keys.get(str(path)) != key or not path.exists():
+            stale.append((plot, kwargs, path, key))
+
+    if not stale:
+        paths = []
+    elif n_workers == 1:
+        paths = [
+            render_figure(plot, data, path, kwargs) for plot, kwargs, path, _ in stale
+        ]
+    else:
+        if columns is not None:
+            data = data[list(dict.fromkeys(columns))]
+        plots, kwargs, paths, _ = zip(*stale)
+        with ProcessPoolExecutor(
+            max_workers=min(n_workers, len(stale)),
+            initializer=_initialize_worker,
+            initargs=(data,),
+        ) as executor:
+            paths = list(executor.map(_worker_figure, plots, paths, kwargs))
+
+    # the keys are stored after all figures are saved
+    if cache is not None:
+        keys.update({str(path): key for _, _, path, key in stale})
+        with open(cache, "w") as f:
+            json.dump(keys, f, indent=2, sort_keys=True)
+    return paths
@@ -0,0 +1,47 @@
+####################################### Tables with Descriptive Statistics #######################################
+
+### packages ###
+from tabulate import tabulate
+
+### Functions that generate tables with the descriptive statistics of the final data set ###
+### The statistics are calculated in one pass over the data (see analysis.descriptive_statistics) ###
+
+# function for generating the table with the summary statistics
+def summary_statistics_table(summary):
+    """Creates a table with the summary statistics of all variables of the final data set.
+
+    Parameters:
+    summary(pandas.DataFrame): Summary statistics, one row per variable (see descriptive_statistics).
+
+    Returns:
+    table_summary(str): String containing the table with the count, mean, standard deviation,
+       minimum, quartiles and maximum of every variable, formatted using the 'grid' table format
+       of the 'tabulate' function.
+    """
+    table_summary = tabulate(
+        summary.round(3),
+        headers="keys",
+        tablefmt="grid",
+        numalign="center",
+    )
+    return table_summary
+
+
+# function for generating the table with the correlation matrix
+def correlation_table(correlation):
+    """Creates a table with the correlation matrix of all variables of the final data set.
+
+    Parameters:
+    correlation(pandas.DataFrame): Correlation matrix (see descriptive_statistics).
+
+    Returns:
+    table_correlation(str): String containing the correlation matrix, formatted using the 'grid'
+       table format of the 'tabulate' function.
+    """
+    table_correlation = tabulate(
+        correlation.round(2),
+        headers="keys",
+        tablefmt="grid",
+        numalign="center",
+    )
+    return table_correlation
@@ -1,188 +1,343 @@
 ####################################### Tables from Estimates for both models #######################################
 
+### One table engine is used for the OLS and time fixed effects models: a table is built     ###
+### from the arrays of the estimates store for any number of specifications (one column per  ###
+### specification), and written as CSV, LaTeX or Markdown from the same data frame           ###
+
+### the LaTeX tables of the presentation are written directly from the estimates store, with  ###
+### standard errors and significance stars, and files are only rewritten if their content     ###
+### changes (such that the presentation is not compiled again for identical tables)           ###
+
 ### packages ###
 import numpy as np
 import pandas as pd
+from scipy import stats
 from tabulate import tabulate
 
-### Functions that generates tables for the OLS model ###
-### For these tables, the results from the models, saved in ols_model_estimates.pkl are used ###
+from financial_development_and_income_inequality.analysis.estimates_store import (
+    META_FIELDS,
+    select_specifications,
+)
+
+# names of the statistics reported below the coefficients
+statistics_rows = {"rsquared": "R^2", "nobs": "N"}
+# significance levels and their stars (two-sided t-tests)
+significance_levels = {0.01: "***", 0.05: "**", 0.1: "*"}
+
 
-# function for generating table with baseline regressions results
-def ols_model_table(ols_estimates, row_names):
-    """Creates a table with the baseline regression estimates from the OLS model. Tables are created using
-    the package 'tabulate'.
+### Function that builds tables from the estimates store ###
+
+# function for generating a table with the estimates of several specifications
+def estimates_table(estimates, terms=None, field="coefficients", **criteria):
+    """Creates a table with the coefficients, R-squared values and numbers of observations of all
+    specifications of the estimates store matching the given metadata, one column per specification.
 
     Parameters:
-    ols_estimates(dict): Dictionary containing the baseline regression estimates from the OLS model.
-    row_names(list): List containing the names of the variables used in the table.
+    estimates(dict or EstimatesStore): Estimates store containing the estimates from both models.
+    terms(list or None): Names of the variables shown in the table, in this order. If None, all terms.
+    field(str): Field of the store shown for every variable, "coefficients" or "std_errors".
+    criteria: Metadata fields (model, group, outcome) and the values of the selected specifications.
 
     Returns:
-    table_baseline(str): String containing the table with the OLS model coefficients, R-squared value,
-       and number of observations, formatted using the 'grid' table format of the 'tabulate' function.
+    table(pandas.DataFrame): Data frame with one row per variable (followed by "R^2" and "N") and one
+       column per specification, named by its outcome variable (or by all metadata fields if the
+       outcome variables are not unique). Variables not contained in the store and coefficients
+       which are not identified (see not_identified_table) are NaN.
     """
-    # extracting the coefficients and r-squared values
-    coefficients_baseline = [
-        ols_estimates["ols_model_estimates"][i]["coefficients"] for i in range(3)
-    ]
-    r_squared_baseline = [
-        ols_estimates["ols_model_estimates"][i]["rsquared"] for i in range(3)
+    rows = select_specifications(estimates, **criteria)
+    # coefficients of the selected specifications and terms, taken from the arrays at once
+    store_terms = list(np.asarray(estimates["terms"]))
+    terms = store_terms if terms is None else list(terms)
+    positions = np.array(
+        [store_terms.index(t) if t in store_terms else -1 for t in terms]
+    )
+    coefficients = np.asarray(estimates[field], dtype=float)[rows][
+        :, np.maximum(positions, 0)
     ]
-    # creating a data frame for the baseline coefficients
-    df_baseline = (
-        (pd.DataFrame(np.squeeze(coefficients_baseline)))
-        .T.rename(
-            columns={
-                0: "fin_dif_all_lead",
-                1: "fin_diff_pc_lead",
-                2: "fin_diff_peh_lead",
-            },
-        )
-        .round(3)
+    coefficients[:, positions < 0] = np.nan
+    # only the minimum norm solution is stored for coefficients which are not identified
+    if field in ["coefficients", "std_errors"]:
+        coefficients[_collinear_terms(estimates, terms, rows).T] = np.nan
+    values = np.vstack(
+        [coefficients.T]
+        + [
+            np.asarray(estimates[statistic], dtype=float)[rows]
+            for statistic in statistics_rows
+        ],
     )
-    # adding r-squared value and number of observations
-    df_baseline.loc["R^2"] = np.round(r_squared_baseline, 3)
-    df_baseline.loc["N"] = np.repeat(120, 3)
-    table_baseline = tabulate(
-        df_baseline,
-        headers="keys",
-        tablefmt="grid",
-        showindex=row_names,
-        numalign="center",
+    # naming the columns
+    columns = np.asarray(estimates["outcome"])[rows].astype(str)
+    if len(set(columns)) < len(columns):
+        columns = [
+            "/".join(str(np.asarray(estimates[meta])[row]) for meta in META_FIELDS)
+            for row in rows
+        ]
+    return pd.DataFrame(
+        values,
+        index=terms + list(statistics_rows.values()),
+        columns=list(columns),
     )
-    return table_baseline
 
 
-# function for generating table with robustness checks results (outcome variables without leads)
-def ols_modeL_robust_table(ols_estimates, row_names):
-    """Creates a table with the robustness checks estimates from the OLS model.
+# function that marks the terms of the selected specifications which belong to a collinear set
+def _collinear_terms(estimates, terms, rows):
+    collinear_sets = np.asarray(estimates["collinear_sets"])[rows]
+    return np.array(
+        [
+            [term in str(sets).replace(";", "+").split("+") for sets in collinear_sets]
+            for term in terms
+        ],
+        dtype=bool,
+    ).reshape(len(terms), len(collinear_sets))
+
+
+### Functions that write the tables ###
+
+# function for formatting the values of a table
+def format_table(table, digits=3):
+    """Formats the values of a table as strings: the numbers of observations as integers, all
+    other values rounded to the given number of digits and missing values as "-".
 
     Parameters:
-    ols_estimates(dict): Dictionary containing the robustness checks estimates from the OLS model.
-    row_names(list): List containing the names of the variables used in the table.
+    table(pandas.DataFrame): Table (see estimates_table).
+    digits(int): Number of digits of the coefficients and R-squared values.
 
     Returns:
-    table_baseline(str): String containing the table with the OLS model's robustness checks coefficients, R-squared value,
-       and number of observations, formatted using the 'grid' table format of the 'tabulate' function.
+    formatted(pandas.DataFrame): Table with formatted values.
     """
-    # extracting the coefficients and r-squared values (robustness checks)
-    coefficients_robust = [
-        ols_estimates["ols_model_estimates_robust_checks"][i]["coefficients"]
-        for i in range(3)
-    ]
-    r_squared_robust = [
-        ols_estimates["ols_model_estimates_robust_checks"][i]["rsquared"]
-        for i in range(3)
-    ]
-    # creating a data frame for the robustness checks coefficients
-    df_robust = (
-        (pd.DataFrame(np.squeeze(coefficients_robust)))
-        .T.rename(columns={0: "fin_dif_all", 1: "fin_diff_pc", 2: "fin_diff_peh"})
-        .round(3)
-    )
-    # adding r-squared value and number of observations
-    df_robust.loc["R^2"] = np.round(r_squared_robust, 3)
-    df_robust.loc["N"] = np.repeat(120, 3)
-    table_robust = tabulate(
-        df_robust,
+    formatted = table.map(lambda value: f"{value:.{digits}f}")
+    if "N" in table.index:
+        formatted.loc["N"] = table.loc["N"].map(lambda value: f"{value:.0f}")
+    return formatted.mask(table.isna(), "-")
+
+
+# function for writing a table as csv
+# the values are not rounded, such that the csv files can be used for further calculations
+def table_to_csv(table):
+    """Writes a table in the csv format, with the variable names in the first column and
+    missing values as empty cells.
+
+    Parameters:
+    table(pandas.DataFrame): Table (see estimates_table).
+
+    Returns:
+    table_csv(str): String containing the table in the csv format.
+    """
+    return table.to_csv(index_label="variable")
+
+
+# function for writing a table as markdown
+def table_to_markdown(table, digits=3):
+    """Writes a table in the markdown format, using the 'pipe' table format of the 'tabulate' function.
+
+    Parameters:
+    table(pandas.DataFrame): Table (see estimates_table).
+    digits(int): Number of digits of the coefficients and R-squared values.
+
+    Returns:
+    table_markdown(str): String containing the table in the markdown format.
+    """
+    return tabulate(
+        format_table(table, digits),
         headers="keys",
-        tablefmt="grid",
-        showindex=row_names,
-        numalign="center",
+        tablefmt="pipe",
+        stralign="center",
     )
-    return table_robust
 
 
-### Functions that generate tables for the time fixed effects model ###
-### For these tables, the results from the models, saved in fixed_effects_model_estimates are used ###
+# function for calculating the significance stars of the coefficients
+def significance_stars(coefficients, std_errors, df_resid):
+    """Calculates the significance stars of the coefficients, from two-sided t-tests.
+
+    Parameters:
+    coefficients(pandas.DataFrame): Table of coefficients (see estimates_table).
+    std_errors(pandas.DataFrame): Table of standard errors with the same rows and columns.
+    df_resid(numpy.ndarray): Residual degrees of freedom of every specification (column).
+
+    Returns:
+    stars(pandas.DataFrame): Stars of every coefficient (empty strings if not significant or
+       if the standard error is missing or zero).
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t_values = np.abs(coefficients.to_numpy() / std_errors.to_numpy())
+    p_values = 2 * stats.t.sf(t_values, np.asarray(df_resid, dtype=float)[None])
+    stars = np.full(p_values.shape, "", dtype=object)
+    for level, symbol in sorted(significance_levels.items(), reverse=True):
+        stars[p_values < level] = symbol
+    return pd.DataFrame(stars, index=coefficients.index, columns=coefficients.columns)
+
 
-# function for generating table with baseline regressions results
-def fixed_effects_model_table(fixed_effects_estimates, row_names):
-    """Creates a table with the baseline regression estimates from the time fixed effects model.
+# function for escaping special characters of latex
+def _escape_latex(text):
+    text = str(text).replace("_", r"\_")
+    return text.replace("R^2", r"R$^2$")
+
+
+# function for marking the coefficients which are not identified
+def not_identified_table(estimates, terms=None, **criteria):
+    """Marks the coefficients which are not identified, i.e. which belong to a set of collinear
+    columns of the design (stored in the field "collinear_sets" of the estimates store).
 
     Parameters:
-    ols_estimates(dict): Dictionary containing the baseline regression estimates from the time fixed effects model.
-    row_names(list): List containing the names of the variables used in the table.
+    estimates(dict or EstimatesStore): Estimates store containing the estimates from both models.
+    terms(list or None): Names of the variables shown in the table, in this order. If None, all terms.
+    criteria: Metadata fields (model, group, outcome) and the values of the selected specifications.
 
     Returns:
-    table_baseline(str): String containing the table with the time fixed effects model coefficients, R-squared value,
-       and number of observations, formatted using the 'grid' table format of the 'tabulate' function.
+    not_identified(pandas.DataFrame): Boolean table with one row per variable and one column per
+       specification (see estimates_table), True for coefficients which are not identified.
     """
-    # extracting the coefficients and r-squared values
-    coeff_fixed_baseline = [
-        fixed_effects_estimates["fixed_effects_model_estimates"][i]["coefficients"]
-        for i in range(3)
-    ]
-    r_squared_fixed_baseline = [
-        fixed_effects_estimates["fixed_effects_model_estimates"][i]["rsquared"]
-        for i in range(3)
-    ]
-    # creating a data frame for the baseline coefficients
-    df_fixed_baseline = (
-        (pd.DataFrame(np.squeeze(coeff_fixed_baseline)))
-        .T.rename(
-            columns={
-                0: "fin_dif_all_lead",
-                1: "fin_diff_pc_lead",
-                2: "fin_diff_peh_lead",
-            },
-        )
-        .round(3)
-    )
-    # adding r-squared value and number of observations
-    df_fixed_baseline.loc["R^2"] = np.round(r_squared_fixed_baseline, 3)
-    df_fixed_baseline.loc["N"] = np.repeat(120, 3)
-    table_fixed_effects_baseline = tabulate(
-        df_fixed_baseline,
-        headers="keys",
-        tablefmt="grid",
-        showindex=row_names,
-        numalign="center",
+    table = estimates_table(estimates, terms, **criteria)
+    terms = table.index[: -len(statistics_rows)]
+    values = _collinear_terms(
+        estimates,
+        terms,
+        select_specifications(estimates, **criteria),
     )
-    return table_fixed_effects_baseline
+    return pd.DataFrame(values, index=terms, columns=table.columns)
 
 
-# function for generating table with robustness checks results (outcome variables without leads)
-def fixed_effect_modeL_robust_table(fixed_effects_estimates, row_names):
-    """Creates a table with the robustness checks regression estimates from the time fixed effects model.
+# function for writing a table as latex
+def table_to_latex(
+    table,
+    digits=3,
+    std_errors=None,
+    stars=None,
+    not_identified=None,
+    labels=None,
+    highlight=None,
+):
+    """Writes a table as a latex tabular (booktabs style), to be included in the presentation.
+    If standard errors are given, they are shown in parentheses below the coefficients.
+    Coefficients which are not identified are shown as "--" and explained in a footnote.
 
     Parameters:
-    ols_estimates(dict): Dictionary containing the robustness checks regression estimates from the time fixed effects model.
-    row_names(list): List containing the names of the variables used in the table.
+    table(pandas.DataFrame): Table (see estimates_table).
+    digits(int): Number of digits of the coefficients and R-squared values.
+    std_errors(pandas.DataFrame or None): Standard errors of the coefficients (see estimates_table).
+    stars(pandas.DataFrame or None): Significance stars of the coefficients (see significance_stars).
+    not_identified(pandas.DataFrame or None): Coefficients which are not identified (see
+       not_identified_table).
+    labels(dict or None): Labels of the variables shown instead of their names, by name.
+    highlight(list or None): Names of the variables highlighted with \alert (beamer).
 
     Returns:
-    table_baseline(str): String containing the table with the time fixed effects model's robustness checks coefficients, R-squared value,
-       and number of observations, formatted using the 'grid' table format of the 'tabulate' function.
+    table_latex(str): String containing the latex tabular.
     """
-    # extracting the coefficients and r-squared values (robustness)
-    coeff_fixed_robust = [
-        fixed_effects_estimates["fixed_effects_model_estimates_robust_checks"][i][
-            "coefficients"
-        ]
-        for i in range(3)
+    formatted = format_table(table, digits)
+    labels, highlight = labels or {}, set(highlight or [])
+    n_columns = len(formatted.columns)
+    lines = [
+        r"\begin{tabular}{l" + "c" * n_columns + "}",
+        r"\toprule",
+        " & ".join([""] + [_escape_latex(c) for c in formatted.columns]) + r" \\",
+        r"\midrule",
     ]
-    r_squared_fixed_robust = [
-        fixed_effects_estimates["fixed_effects_model_estimates_robust_checks"][i][
-            "rsquared"
-        ]
-        for i in range(3)
-    ]
-    # creating a data frame for the robustness checks coefficients
-    df_fixed_robust = (
-        (pd.DataFrame(np.squeeze(coeff_fixed_robust)))
-        .T.rename(
-            columns={0: "fin_dif_all", 1: "fin_diff_pc", 2: "fin_diff_peh"},
+    any_not_identified = False
+    for name, row in formatted.iterrows():
+        if name == statistics_rows["rsquared"]:
+            lines.append(r"\midrule")
+        values = list(row)
+        if stars is not None and name in stars.index:
+            values = [
+                f"{value}$^{{{star}}}$" if star else value
+                for value, star in zip(values, stars.loc[name])
+            ]
+        missing = np.zeros(n_columns, dtype=bool)
+        if not_identified is not None and name in not_identified.index:
+            missing = not_identified.loc[name].to_numpy()
+            any_not_identified |= missing.any()
+            values = ["--" if m else value for value, m in zip(values, missing)]
+        label = _escape_latex(labels.get(name, name))
+        if name in highlight:
+            label = rf"\alert{{{label}}}"
+        lines.append(" & ".join([label] + values) + r" \\")
+        if std_errors is not None and name in std_errors.index and not missing.all():
+            errors = format_table(std_errors.loc[[name]], digits).loc[name]
+            errors = [
+                "" if m else (e if e == "-" else f"({e})")
+                for e, m in zip(errors, missing)
+            ]
+            lines.append(" & ".join([""] + errors) + r" \\")
+    lines.append(r"\bottomrule")
+    if std_errors is not None:
+        note = "; ".join(
+            f"{symbol} p$<${level}"
+            for level, symbol in sorted(significance_levels.items(), reverse=True)
         )
-        .round(3)
+        if any_not_identified:
+            note += "; -- not identified (collinear regressors)"
+        lines.append(
+            rf"\multicolumn{{{n_columns + 1}}}{{l}}{{\footnotesize Standard errors in parentheses; {note}}} \\",
+        )
+    lines.append(r"\end{tabular}")
+    return "\n".join(lines) + "\n"
+
+
+# function for writing the latex table of specifications directly from the estimates store
+def latex_estimates_table(
+    estimates,
+    terms=None,
+    digits=3,
+    labels=None,
+    highlight=None,
+    **criteria,
+):
+    """Creates the latex tabular of the specifications of the estimates store matching the given
+    metadata, with standard errors in parentheses and significance stars. Coefficients which are
+    not identified (collinear columns) are shown as "--", without standard errors and stars.
+
+    Parameters:
+    estimates(dict or EstimatesStore): Estimates store containing the estimates from both models.
+    terms(list or None): Names of the variables shown in the table, in this order. If None, all terms.
+    digits(int): Number of digits of the coefficients, standard errors and R-squared values.
+    labels(dict or None): Labels of the variables shown instead of their names, by name.
+    highlight(list or None): Names of the variables highlighted with \alert (beamer).
+    criteria: Metadata fields (model, group, outcome) and the values of the selected specifications.
+
+    Returns:
+    table_latex(str): String containing the latex tabular.
+    """
+    table = estimates_table(estimates, terms, **criteria)
+    std_errors = estimates_table(estimates, terms, field="std_errors", **criteria)
+    std_errors = std_errors.drop(index=list(statistics_rows.values()))
+    not_identified = not_identified_table(estimates, terms, **criteria)
+    stars = significance_stars(
+        table.loc[std_errors.index],
+        std_errors,
+        np.asarray(estimates["df_resid"])[select_specifications(estimates, **criteria)],
     )
-    # adding r-squared value and number of observations
-    df_fixed_robust.loc["R^2"] = np.round(r_squared_fixed_robust, 3)
-    df_fixed_robust.loc["N"] = np.repeat(120, 3)
-    table_fixed_effects_robust = tabulate(
-        df_fixed_robust,
-        headers="keys",
-        tablefmt="grid",
-        showindex=row_names,
-        numalign="center",
+    return table_to_latex(
+        table,
+        digits,
+        std_errors,
+        stars.mask(not_identified, ""),
+        not_identified,
+        labels,
+        highlight,
     )
-    return table_fixed_effects_robust
+
+
+# function for writing a file only if its content changes
+def write_if_changed(path, content):
+    """Writes a text file only if it does not exist or if its content differs, such that the
+    modification time of files with identical content is kept.
+
+    Parameters:
+    path(pathlib.Path): Path of the file.
+    content(str): Content of the file.
+
+    Returns:
+    changed(bool): True if the file was written.
+    """
+    if path.exists() and path.read_text() == content:
+        return False
+    path.write_text(content)
+    return True
+
+
+# writers of the tables by file format
+table_writers = {
+    "csv": table_to_csv,
+    "md": table_to_markdown,
+}
@@ -1,59 +1,99 @@
 """Task file related with generating plots for the ols and time fixed effects models."""
 
 ### packages ###
-import pandas as pd
+import os
+
 import pytask
 
 ### folders and functions used for the task file ###
 from financial_development_and_income_inequality.config import BLD
+from financial_development_and_income_inequality.data_management.columnar_storage import (
+    load_data_set,
+)
 from financial_development_and_income_inequality.final.descriptive_statistics_plots import (
     foreign_banks_increase_plot,
-    gen_scatter_plots,
     labor_cost_increase_plot,
+    labor_cost_sectors,
+    scatter_matrix_plot,
+    scatter_plot,
+    scatter_variables,
+    x_variables,
+    y_variables,
+)
+from financial_development_and_income_inequality.final.figure_rendering import (
+    render_figures,
 )
 
+### defining parameter values used in the functions ###
+# name, plot function, keyword arguments and plotted variables of every figure
+# (the render cache only hashes the plotted variables)
+figures = (
+    [
+        (
+            "labor_cost_increase",
+            labor_cost_increase_plot,
+            {},
+            ["Year", *labor_cost_sectors],
+        ),
+        ("foreign_banks_presence", foreign_banks_increase_plot, {}, ["Year", "fb_num"]),
+    ]
+    + [
+        (
+            f"scatter_plot{i + 1}",
+            scatter_plot,
+            {"x_var": x_var, "y_var": y_var},
+            [x_var, y_var],
+        )
+        for i, (x_var, y_var) in enumerate(scatter_variables)
+    ]
+    + [
+        (
+            "scatter_matrix",
+            scatter_matrix_plot,
+            {"x_variables": x_variables, "y_variables": y_variables},
+            x_variables + y_variables,
+        ),
+    ]
+)
+# number of worker processes rendering the figures
+n_workers = min(4, os.cpu_count() or 1)
+# render cache storing the keys of the saved figures (figures with unchanged keys are skipped)
+render_cache = BLD / "python" / "figures" / "render_cache.json"
+
 
 # input file
-@pytask.mark.depends_on(BLD / "python" / "data" / "final_data_set.pkl")
+@pytask.mark.depends_on(BLD / "python" / "data" / "final_data_set.arrow")
 
-# output files
+# output files (the figures and the render cache)
 @pytask.mark.produces(
-    [
-        BLD / "python" / "figures" / "labor_cost_increase.png",
-        BLD / "python" / "figures" / "foreign_banks_presence.png",
-        BLD / "python" / "figures" / "scatter_plot1.png",
-        BLD / "python" / "figures" / "scatter_plot2.png",
-        BLD / "python" / "figures" / "scatter_plot3.png",
-        BLD / "python" / "figures" / "scatter_plot4.png",
-        BLD / "python" / "figures" / "scatter_plot5.png",
-        BLD / "python" / "figures" / "scatter_plot6.png",
-        BLD / "python" / "figures" / "scatter_plot7.png",
-        BLD / "python" / "figures" / "scatter_plot8.png",
-        BLD / "python" / "figures" / "scatter_plot9.png",
-    ],
+    {
+        **{name: BLD / "python" / "figures" / f"{name}.png" for name, *_ in figures},
+        "render_cache": render_cache,
+    },
 )
 def task_generate_plots(depends_on, produces):
     """Creates and stores several plots depicting the descriptive statistics of the data.
 
     Parameters:
     depends_on (pathlib.Path): The path to the directory where the finalized version of the data set is stored.
-    produces (pathlib.Path): The paths to the directory where plots are stored in a "png" format.
+    produces (dict): The paths to the directory where plots are stored in a "png" format, by figure
+        name, and the path to the render cache ("render_cache").
 
     Returns:
     None
 
     """
-    # loading final_data_set
-    data = pd.read_pickle(depends_on)
-    # generating plots using the functions
-    # labor cost increase
-    labor_cost_increase = labor_cost_increase_plot(data)
-    # foreign banks presence
-    foreign_banks_presence = foreign_banks_increase_plot(data)
-    # scatter plots showing the relationship between outcome and explanatory variables
-    scatter_plots = gen_scatter_plots(data)
-    # saving the plots in the specified output directory
-    labor_cost_increase.savefig(produces[0])
-    foreign_banks_presence.savefig(produces[1])
-    for i, fig in enumerate(scatter_plots):
-        fig.savefig(produces[i + 2])
+    # loading final_data_set (only the plotted variables are sent to the worker processes)
+    data = load_data_set(depends_on)
+    # rendering the plots (labor cost increase, foreign banks presence and the scatter plots
+    # showing the relationship between outcome and explanatory variables) and saving them in
+    # the specified output directory, only if the variables they plot have changed
+    render_figures(
+        [
+            (plot, kwargs, produces[name], columns)
+            for name, plot, kwargs, columns in figures
+        ],
+        data,
+        n_workers,
+        cache=produces["render_cache"],
+    )
@@ -1,20 +1,32 @@
-"""Task file for generating tables with the estimates from the ols and time fixed effects models."""
+"""Task file for generating tables with the estimates from the ols and time fixed effects models
+and with the descriptive statistics of the final data set."""
 
 ### packages ###
-import pandas as pd
 import pytask
 
 ### folders and functions used for the task file ###
-from financial_development_and_income_inequality.config import BLD
+from financial_development_and_income_inequality.analysis.descriptive_statistics import (
+    data_chunks,
+    descriptive_statistics,
+)
+from financial_development_and_income_inequality.analysis.estimates_store import (
+    load_estimates_store,
+)
+from financial_development_and_income_inequality.config import BLD, STAGE_CACHE
+from financial_development_and_income_inequality.data_management.columnar_storage import (
+    load_data_set,
+)
 from financial_development_and_income_inequality.final.tables_estimates_models import (
-    fixed_effect_modeL_robust_table,
-    fixed_effects_model_table,
-    ols_modeL_robust_table,
-    ols_model_table,
+    estimates_table,
+    latex_estimates_table,
+    table_to_csv,
+    table_writers,
+    write_if_changed,
 )
+from financial_development_and_income_inequality.stage_cache import StageCache
 
 ### defining parameter values used in the functions ###
-# names of the independent variables (including coefficient of determination and number of observations)
+# names of the independent variables (the coefficient of determination and number of observations are added)
 row_names = [
     "fin_dev_all",
     "fin_dev_db",
@@ -27,61 +39,114 @@ row_names = [
     "agri_gdp",
     "edu_att",
     "fincri_0708",
-    "R^2",
-    "N",
 ]
+# labels of the variables in the latex tables of the presentation and highlighted variables
+row_labels = {
+    "gvt_cs": "gov_cs",
+    "agri_gdp": "agri._gdp",
+    "edu_att": "educ_att",
+    "fincri_0708": "fin.crisis_0708",
+}
+highlighted_rows = ["fin_dev_all", "fin_dev_db", "fin_dev_fb"]
+# specifications shown in every table (metadata of the estimates store)
+table_specifications = {
+    "ols_baseline": {"model": "ols", "group": "ols_model_estimates"},
+    "ols_robustness_checks": {
+        "model": "ols",
+        "group": "ols_model_estimates_robust_checks",
+    },
+    "fixed_effects_baseline": {
+        "model": "fixed_effects",
+        "group": "fixed_effects_model_estimates",
+    },
+    "fixed_effects_robustness_checks": {
+        "model": "fixed_effects",
+        "group": "fixed_effects_model_estimates_robust_checks",
+    },
+}
+# number of observations per chunk and number of worker processes for the descriptive statistics
+chunk_size = 10000
+n_workers = 1
+# memoized stage results (keyed by the estimates and the table specifications)
+stage_cache = StageCache(STAGE_CACHE)
 
-# input files
-@pytask.mark.depends_on(
-    [
-        (BLD / "python" / "models" / "ols_model_estimates.pkl"),
-        (BLD / "python" / "models" / "fixed_effects_model_estimates.pkl"),
-    ],
+# input file
+@pytask.mark.depends_on(BLD / "python" / "models" / "model_estimates.npz")
+
+# output files (the latex tables are included in the presentation)
+@pytask.mark.produces(
+    {
+        **{
+            f"{name}.{extension}": BLD / "python" / "tables" / f"{name}.{extension}"
+            for name in table_specifications
+            for extension in table_writers
+        },
+        **{
+            f"{name}.tex": BLD / "latex" / "tables" / f"{name}.tex"
+            for name in table_specifications
+        },
+    },
 )
+def task_generate_tables(depends_on, produces):
+    """Creates and stores tables from the OLS and time fixed effects models, in the csv and
+    markdown formats, and as latex tables with standard errors and significance stars. Files
+    whose content is unchanged are not rewritten.
+
+    Parameters:
+    depends_on (pathlib.Path): The path to the estimates store containing the estimates from both models.
+    produces (dict): The paths to the directory where tables are stored, by file name.
+
+    Returns:
+    None
+
+    """
+    # loading the estimates results from both models (lazily, without unpickling)
+    estimates = load_estimates_store(depends_on)
+    # creating the tables of both models with the table engine and saving them in all formats
+    for name, criteria in table_specifications.items():
+        table = stage_cache.call(estimates_table, estimates, row_names, **criteria)
+        for extension, writer in table_writers.items():
+            write_if_changed(produces[f"{name}.{extension}"], writer(table))
+        write_if_changed(
+            produces[f"{name}.tex"],
+            stage_cache.call(
+                latex_estimates_table,
+                estimates,
+                row_names,
+                labels=row_labels,
+                highlight=highlighted_rows,
+                **criteria,
+            ),
+        )
+
+
+# input file
+@pytask.mark.depends_on(BLD / "python" / "data" / "final_data_set.arrow")
 
 # output files
 @pytask.mark.produces(
     [
-        BLD / "python" / "tables" / "ols_baseline.csv",
-        BLD / "python" / "tables" / "ols_robustness_checks.csv",
-        BLD / "python" / "tables" / "fixed_effects_baseline.csv",
-        BLD / "python" / "tables" / "fixed_effects_robustness_checks.csv",
+        BLD / "python" / "tables" / "descriptive_statistics.csv",
+        BLD / "python" / "tables" / "correlation_matrix.csv",
     ],
 )
-def task_generate_tables(depends_on, produces):
-    """Creates and stores tables from the OLS and time fixed effects models.
+def task_generate_descriptive_statistics_tables(depends_on, produces):
+    """Creates and stores tables with the summary statistics and the correlation matrix of all
+    numeric variables of the final data set, calculated in a single pass over the data.
 
     Parameters:
-    depends_on (pathlib.Path): The paths to the directory where the estimates from both models are located.
+    depends_on (pathlib.Path): The path to the final data set.
     produces (pathlib.Path): The paths to the directory where tables are stored in an "csv" format.
 
     Returns:
     None
 
     """
-    # loading the estimates results from both models
-    ols_estimates = pd.read_pickle(depends_on[0])
-    fixed_effects_estimates = pd.read_pickle(depends_on[1])
-    # creating the tables using the functions
-    # OLS model
-    ols_baseline = ols_model_table(ols_estimates, row_names)
-    ols_robustness_checks = ols_modeL_robust_table(ols_estimates, row_names)
-    # Fixed effects model
-    fixed_effects_baseline = fixed_effects_model_table(
-        fixed_effects_estimates,
-        row_names,
-    )
-    fixed_effects_robustness_checks = fixed_effect_modeL_robust_table(
-        fixed_effects_estimates,
-        row_names,
+    final_data = load_data_set(depends_on).select_dtypes("number")
+    summary, correlation = descriptive_statistics(
+        data_chunks(final_data, chunk_size),
+        n_workers=n_workers,
     )
-    # saving the files in an "csv" format
-    outputs = [
-        ols_baseline,
-        ols_robustness_checks,
-        fixed_effects_baseline,
-        fixed_effects_robustness_checks,
-    ]
-    for i, output in enumerate(outputs):
-        with open(produces[i], "w") as f:
-            f.write(str(output))
+    # saving the files in an "csv" format (only if their content has changed)
+    write_if_changed(produces[0], table_to_csv(summary))
+    write_if_changed(produces[1], table_to_csv(correlation))
@@ -0,0 +1,179 @@
+####################################### Pipeline #######################################
+### the whole project (data creation, variable generation, estimation and tables) can be ###
+### run in memory, without pytask and without writing the intermediate files: the data  ###
+### frames and the arrays of the estimates store are passed directly between the stages ###
+
+### the stages can optionally be memoized in a stage cache (see stage_cache), such that ###
+### repeated runs with the same data and parameters only load the stored results        ###
+
+
+### packages ###
+import time
+from pathlib import Path
+
+from financial_development_and_income_inequality.analysis.estimates_store import (
+    combine_stores,
+    estimates_to_store,
+)
+from financial_development_and_income_inequality.analysis.fixed_effects_model import (
+    run_fixed_effects_model,
+    run_fixed_effects_model_robust,
+)
+from financial_development_and_income_inequality.analysis.ols_model import (
+    run_ols_model,
+    run_ols_model_robust,
+)
+from financial_development_and_income_inequality.config import SRC
+from financial_development_and_income_inequality.data_management.data_set_creation import (
+    assemble_data_set,
+    load_source,
+    source_files,
+)
+from financial_development_and_income_inequality.data_management.data_set_management import (
+    generate_variables,
+)
+from financial_development_and_income_inequality.data_management.task_data_set_management import (
+    deflation,
+    seasonal_adjustment,
+    sectors_percentage_increase_calculation,
+    sectors_percentage_increase_diff,
+    target_col,
+)
+from financial_development_and_income_inequality.final.tables_estimates_models import (
+    estimates_table,
+    latex_estimates_table,
+)
+from financial_development_and_income_inequality.final.task_tables import (
+    highlighted_rows,
+    row_labels,
+    row_names,
+    table_specifications,
+)
+from financial_development_and_income_inequality.stage_cache import StageCache
+
+### defining parameter values used in the pipeline ###
+# default configuration (the same parameters as the ones used by the tasks)
+default_config = {
+    "data_dir": SRC / "data" / "data_initial_files",
+    "sectors_percentage_increase_calculation": sectors_percentage_increase_calculation,
+    "sectors_percentage_increase_diff": sectors_percentage_increase_diff,
+    "target_col": target_col,
+    "deflation": deflation,
+    "seasonal_adjustment": seasonal_adjustment,
+    "row_names": row_names,
+    "row_labels": row_labels,
+    "highlighted_rows": highlighted_rows,
+    "table_specifications": table_specifications,
+    "cache": None,
+}
+# model functions of every group of regressions, by model
+model_functions = {
+    "ols": {
+        "ols_model_estimates": run_ols_model,
+        "ols_model_estimates_robust_checks": run_ols_model_robust,
+    },
+    "fixed_effects": {
+        "fixed_effects_model_estimates": run_fixed_effects_model,
+        "fixed_effects_model_estimates_robust_checks": run_fixed_effects_model_robust,
+    },
+}
+
+
+# function that runs the whole project in memory
+def run_pipeline(config=None):
+    """Runs the data creation, variable generation, estimation of both models and creation of
+    the tables in memory, without pytask and without intermediate files.
+
+    Parameters:
+    config (dict or None): Parameters overriding the ones of default_config:
+        data_dir (pathlib.Path): Directory of the initial data files.
+        sectors_percentage_increase_calculation, sectors_percentage_increase_diff, target_col,
+        deflation, seasonal_adjustment: Arguments of generate_variables.
+        row_names (list): Names of the variables shown in the tables.
+        row_labels (dict), highlighted_rows (list): Labels and highlighted variables of the latex tables.
+        table_specifications (dict): Metadata of the specifications shown in every table, by table name.
+        cache (StageCache, pathlib.Path or None): Stage cache (or its directory) memoizing the
+            stages, None for computing all stages.
+
+    Returns:
+    results (dict): Dictionary containing the initial and final data sets ("initial_data_set",
+        "final_data_set"), the estimates store ("estimates"), the tables by name ("tables",
+        see estimates_table), the latex tables by name ("latex_tables") and the duration of
+        every stage in seconds ("timings").
+
+    """
+    config = {**default_config, **(config or {})}
+    cache = config["cache"]
+    if isinstance(cache, (str, Path)):
+        cache = StageCache(cache)
+    call = cache.call if cache is not None else _call
+    timings = {}
+
+    # creating the initial data set from the single initial data files
+    start = time.perf_counter()
+    data_dir = Path(config["data_dir"])
+    initial_data_set = assemble_data_set(
+        {
+            variable: call(load_source, variable, data_dir / file_name)
+            for variable, file_name in source_files.items()
+        },
+    )
+    timings["data_creation"] = time.perf_counter() - start
+
+    # generating the variables (on a copy, since generate_variables adds them to its input)
+    start = time.perf_counter()
+    final_data_set = call(
+        generate_variables,
+        initial_data_set.copy(),
+        config["sectors_percentage_increase_calculation"],
+        config["sectors_percentage_increase_diff"],
+        config["target_col"],
+        config["deflation"],
+        config["seasonal_adjustment"],
+    )
+    timings["generate_variables"] = time.perf_counter() - start
+
+    # estimating both models and storing the estimates as arrays
+    start = time.perf_counter()
+    estimates = combine_stores(
+        *[
+            estimates_to_store(
+                {
+                    group: call(function, final_data_set)
+                    for group, function in groups.items()
+                },
+                model=model,
+            )
+            for model, groups in model_functions.items()
+        ],
+    )
+    timings["estimation"] = time.perf_counter() - start
+
+    # creating the tables from the estimates store
+    start = time.perf_counter()
+    tables, latex_tables = {}, {}
+    for name, criteria in config["table_specifications"].items():
+        tables[name] = call(estimates_table, estimates, config["row_names"], **criteria)
+        latex_tables[name] = call(
+            latex_estimates_table,
+            estimates,
+            config["row_names"],
+            labels=config["row_labels"],
+            highlight=config["highlighted_rows"],
+            **criteria,
+        )
+    timings["tables"] = time.perf_counter() - start
+
+    return {
+        "initial_data_set": initial_data_set,
+        "final_data_set": final_data_set,
+        "estimates": estimates,
+        "tables": tables,
+        "latex_tables": latex_tables,
+        "timings": timings,
+    }
+
+
+# function that calls a stage without memoization
+def _call(function, *args, **kwargs):
+    return function(*args, **kwargs)
@@ -0,0 +1,262 @@
+####################################### Stage Cache #######################################
+### the results of the stages (data creation, variable generation, estimation, tables) are ###
+### memoized by the content of their inputs: the key of a result is a hash of the source   ###
+### code of the stage function and of all project modules it uses (transitively, with     ###
+### their module level parameters, e.g. the lists of control variables), of all arguments ###
+### (data frames, arrays and parameters) and of the files and directories passed as paths ###
+
+### switching branches or reverting a parameter hence reuses the results computed before, ###
+### even if pytask runs the task again. The results are pickled into a shared directory  ###
+### whose size is capped: the least recently used results are evicted first               ###
+
+
+### packages ###
+import ast
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+import tempfile
+from collections.abc import Mapping
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# name of the package, only modules of the project are part of the keys
+PACKAGE = __name__.split(".")[0]
+# types of the module level parameters which are part of the keys
+PARAMETER_TYPES = (list, tuple, dict, set, frozenset, str, int, float, bool, type(None))
+
+
+### Keys of the Stage Results ###
+
+# function that adds a value to a hash
+def _update_hash(digest, value):
+    digest.update(type(value).__name__.encode())
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr(list(value.columns)).encode())
+        digest.update(repr(list(value.dtypes.astype(str))).encode())
+        digest.update(
+            pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes()
+        )
+    elif isinstance(value, pd.Series):
+        digest.update(repr((value.name, str(value.dtype))).encode())
+        digest.update(
+            pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes()
+        )
+    elif isinstance(value, np.ndarray):
+        digest.update(repr((value.dtype.str, value.shape)).encode())
+        if value.dtype == object:
+            digest.update(repr(value.tolist()).encode())
+        else:
+            digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, Path):
+        # files and directories are hashed by their content
+        paths = sorted(value.rglob("*")) if value.is_dir() else [value]
+        for path in paths:
+            digest.update(str(path.relative_to(value.parent)).encode())
+            if path.is_file():
+                digest.update(path.read_bytes())
+    elif isinstance(value, Mapping):
+        for key, item in value.items():
+            _update_hash(digest, key)
+            _update_hash(digest, item)
+    elif isinstance(value, (list, tuple)):
+        digest.update(str(len(value)).encode())
+        for item in value:
+            _update_hash(digest, item)
+    elif callable(value):
+        digest.update(f"{value.__module__}.{value.__qualname__}".encode())
+        for module in stage_modules(value):
+            digest.update(module.__name__.encode())
+            digest.update(inspect.getsource(module).encode())
+            for name, parameter in sorted(vars(module).items()):
+                if isinstance(parameter, PARAMETER_TYPES) and not name.startswith("__"):
+                    digest.update(f"{name}={_parameter_repr(parameter)}".encode())
+    elif value is None or isinstance(value, (bool, int, float, str, bytes)):
+        digest.update(repr(value).encode())
+    else:
+        digest.update(pickle.dumps(value))
+
+
+# function that writes a module level parameter deterministically (functions by their name,
+# sets sorted), such that the keys are identical across processes
+def _parameter_repr(parameter):
+    if isinstance(parameter, dict):
+        items = [
+            f"{_parameter_repr(k)}: {_parameter_repr(v)}" for k, v in parameter.items()
+        ]
+        return "{" + ", ".join(items) + "}"
+    if isinstance(parameter, (list, tuple)):
+        return repr(type(parameter)(map(_parameter_repr, parameter)))
+    if isinstance(parameter, (set, frozenset)):
+        return repr(sorted(map(_parameter_repr, parameter)))
+    if callable(parameter):
+        return f"{parameter.__module__}.{parameter.__qualname__}"
+    return repr(parameter)
+
+
+# function that finds the modules used by a stage function
+def stage_modules(function):
+    """Finds the module defining a stage function and all modules of the project it imports,
+    directly or through other modules of the project.
+
+    Parameters:
+    function (function): Stage function.
+
+    Returns:
+    modules (list): Modules used by the function, sorted by name.
+
+    """
+    modules = {}
+    pending = [inspect.getmodule(function)]
+    while pending:
+        module = pending.pop()
+        # namespace packages (folders without "__init__.py") have no source code
+        if (
+            module is None
+            or module.__name__ in modules
+            or getattr(module, "__file__", None) is None
+        ):
+            continue
+        modules[module.__name__] = module
+        for node in ast.walk(ast.parse(inspect.getsource(module))):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                # imported names can be modules themselves
+                names = [node.module] + [
+                    f"{node.module}.{alias.name}" for alias in node.names
+                ]
+            else:
+                continue
+            for name in names:
+                if name.split(".")[0] == PACKAGE and name in sys.modules:
+                    pending.append(sys.modules[name])
+    return [modules[name] for name in sorted(modules)]
+
+
+# function that calculates the key of the result of a stage
+def stage_key(function, args=(), kwargs=None):
+    """Calculates the key of the result of a stage function called with the given arguments.
+    The arguments are bound to the signature of the function (such that positional and keyword
+    arguments, as well as omitted default values, give the same key) and hashed by their
+    content. The source code and the module level parameters of the modules used by the function
+    (see stage_modules) are part of the key, such that changing e.g. the control variables of
+    the models gives a new key.
+
+    Parameters:
+    function (function): Stage function.
+    args (tuple): Positional arguments of the function.
+    kwargs (dict or None): Keyword arguments of the function.
+
+    Returns:
+    key (str): Hexadecimal hash of the stage and its inputs.
+
+    """
+    arguments = inspect.signature(function).bind(*args, **(kwargs or {}))
+    arguments.apply_defaults()
+    digest = hashlib.sha256()
+    _update_hash(digest, function)
+    _update_hash(digest, dict(arguments.arguments))
+    return digest.hexdigest()
+
+
+### Store of the Stage Results ###
+
+
+class StageCache:
+    """On-disk store of stage results, keyed by stage_key, with a size cap and least
+    recently used eviction. Several processes can share the same directory.
+
+    Parameters:
+    directory (pathlib.Path): Directory of the store.
+    max_bytes (int): Maximum total size of the stored results in bytes.
+
+    """
+
+    def __init__(self, directory, max_bytes=2**30):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return self.directory / f"{key}.pkl"
+
+    def call(self, function, *args, **kwargs):
+        """Returns the stored result of a stage function called with the given arguments,
+        or calls the function and stores its result. Stored results which cannot be loaded
+        (e.g. incomplete files, or pickles referring to classes which were renamed or removed)
+        are deleted and computed again.
+
+        Parameters:
+        function (function): Stage function.
+        args, kwargs: Arguments of the function.
+
+        Returns:
+        result: Result of the function.
+
+        """
+        path = self._path(stage_key(function, args, kwargs))
+        try:
+            with open(path, "rb") as f:
+                result = pickle.load(f)
+            # marking the result as recently used
+            os.utime(path)
+            self.hits += 1
+            return result
+        except FileNotFoundError:
+            pass
+        # any error while loading (e.g. AttributeError or ModuleNotFoundError) marks a stale result
+        except Exception:
+            path.unlink(missing_ok=True)
+        self.misses += 1
+        result = function(*args, **kwargs)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # writing to a temporary file first, such that no process reads an incomplete result
+        with tempfile.NamedTemporaryFile(
+            dir=self.directory,
+            suffix=".tmp",
+            delete=False,
+        ) as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f.name, path)
+        self.evict()
+        return result
+
+    def entries(self):
+        """Returns the stored results, from the least to the most recently used.
+
+        Returns:
+        entries (list): Tuples of the path, last use (modification time) and size of every result.
+
+        """
+        entries = []
+        for path in self.directory.glob("*.pkl"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_mtime, stat.st_size))
+        return sorted(entries, key=lambda entry: entry[1])
+
+    def evict(self):
+        """Deletes the least recently used results until the total size is within the cap.
+
+        Returns:
+        evicted (list): Paths of the deleted results.
+
+        """
+        entries = self.entries()
+        size = sum(entry[2] for entry in entries)
+        evicted = []
+        for path, _, entry_size in entries:
+            if size <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            size -= entry_size
+            evicted.append(path)
+        return evicted
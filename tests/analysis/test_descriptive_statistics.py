@@ -0,0 +1,52 @@
+"""Tests for the one pass descriptive statistics of the final data set."""
+
+### packages ###
+import numpy as np
+import pandas as pd
+import pytest
+
+### functions tested ###
+from financial_development_and_income_inequality.analysis.descriptive_statistics import (
+    data_chunks,
+    descriptive_statistics,
+)
+
+
+### numeric variables of the finalized version of the data set ###
+@pytest.fixture()
+def numeric_data(final_data):
+    return final_data.select_dtypes("number")
+
+
+### the statistics are compared with pandas, for chunks processed serially and in parallel ###
+
+# test for the summary statistics and the correlation matrix
+@pytest.mark.parametrize(("chunk_size", "n_workers"), [(120, 1), (7, 1), (13, 2)])
+def test_descriptive_statistics(numeric_data, chunk_size, n_workers):
+    """
+    Tests whether the summary statistics and the correlation matrix calculated chunk by chunk
+    are equal to the ones of pandas (including the missing values of the variables with leads).
+    """
+    summary, correlation = descriptive_statistics(
+        data_chunks(numeric_data, chunk_size),
+        n_workers=n_workers,
+    )
+    pd.testing.assert_frame_equal(summary, numeric_data.describe().T, rtol=1e-10)
+    pd.testing.assert_frame_equal(correlation, numeric_data.corr(), atol=1e-10)
+
+
+# test for the quantile sketches
+def test_quantile_sketch(numeric_data):
+    """
+    Tests whether the quantiles remain between the minimum and maximum and, for continuous
+    variables, close to the exact quantiles when the sketches are compressed.
+    """
+    numeric_data = numeric_data.loc[:, numeric_data.nunique() > 10]
+    summary, _ = descriptive_statistics(data_chunks(numeric_data, 10), sketch_size=60)
+    expected = numeric_data.describe().T
+    quartiles = summary[["25%", "50%", "75%"]].to_numpy()
+    assert (quartiles >= summary[["min"]].to_numpy()).all()
+    assert (quartiles <= summary[["max"]].to_numpy()).all()
+    error = np.abs(quartiles - expected[["25%", "50%", "75%"]].to_numpy())
+    spread = (expected["max"] - expected["min"]).to_numpy()[:, None]
+    assert (error <= 0.05 * spread).all()
@@ -0,0 +1,67 @@
+"""Tests for the design diagnostics of the OLS and time fixed effects models."""
+
+### packages ###
+import numpy as np
+import pytest
+from statsmodels.stats.outliers_influence import variance_inflation_factor
+
+### functions tested ###
+from financial_development_and_income_inequality.analysis.design_diagnostics import (
+    design_diagnostics,
+    factorize_design,
+    factorized_least_squares,
+)
+from financial_development_and_income_inequality.analysis.least_squares import (
+    model_design,
+    model_variables,
+)
+
+
+### design matrix of the OLS model, taken from the finalized version of the data set ###
+@pytest.fixture()
+def design(final_data):
+    return model_design(*model_variables(final_data))
+
+
+### the diagnostics are compared with statsmodels and the collinear columns are detected ###
+
+# test for variance inflation factors and collinear sets
+def test_design_diagnostics(design):
+    """
+    Tests whether the collinear main explanatory variables are detected and whether the
+    variance inflation factors of the remaining columns are equal to the ones of statsmodels.
+    """
+    X, _, terms = design
+    diagnostics = design_diagnostics(factorize_design(X), terms)
+    assert diagnostics["rank"] == len(terms) - 1
+    assert diagnostics["collinear_sets"] == [
+        ["fin_dev_all", "fin_dev_db", "fin_dev_fb"]
+    ]
+    assert np.isinf(diagnostics["vif"][:3]).all()
+
+    # without fin_dev_all, the design has full rank
+    diagnostics = design_diagnostics(factorize_design(X[:, 1:]), terms[1:])
+    exog = np.column_stack([np.ones(len(X)), X[:, 1:]])
+    expected = [variance_inflation_factor(exog, j) for j in range(1, exog.shape[1])]
+    np.testing.assert_allclose(diagnostics["vif"], expected, rtol=1e-6)
+    assert diagnostics["collinear_sets"] == []
+    assert np.isfinite(diagnostics["condition_number"])
+
+
+# test for the least squares fit with the factorized design
+def test_factorized_least_squares(design):
+    """
+    Tests whether the minimum norm coefficients and the fitted values are equal to the ones
+    of a least squares solver applied to the design matrix directly.
+    """
+    X, Y, _ = design
+    fit = factorized_least_squares(factorize_design(X), Y)
+    X_centered, Y_centered = X - X.mean(axis=0), Y - Y.mean(axis=0)
+    expected = np.linalg.lstsq(X_centered, Y_centered, rcond=None)[0]
+    np.testing.assert_allclose(fit["coefficients"], expected, rtol=1e-6)
+    np.testing.assert_allclose(
+        fit["intercept"] + X @ fit["coefficients"],
+        Y - fit["residuals"],
+        atol=1e-8,
+    )
+    assert fit["df_resid"] == len(X) - X.shape[1]
@@ -0,0 +1,68 @@
+"""Tests for the estimates store of the OLS and time fixed effect models."""
+
+### packages ###
+import numpy as np
+import pytest
+
+### functions tested ###
+from financial_development_and_income_inequality.analysis.estimates_store import (
+    combine_stores,
+    estimates_to_store,
+    load_estimates_store,
+    save_estimates_store,
+)
+from financial_development_and_income_inequality.analysis.fixed_effects_model import (
+    run_fixed_effects_model,
+)
+from financial_development_and_income_inequality.analysis.ols_model import (
+    run_ols_model,
+)
+
+
+### estimates store containing the baseline regressions of both models ###
+@pytest.fixture()
+def store(final_data):
+    return combine_stores(
+        estimates_to_store(
+            {"ols_model_estimates": run_ols_model(final_data)},
+            model="ols",
+        ),
+        estimates_to_store(
+            {"fixed_effects_model_estimates": run_fixed_effects_model(final_data)},
+            model="fixed_effects",
+        ),
+    )
+
+
+### checking whether the estimates are unchanged after saving and loading the store ###
+
+# test for saving and loading the store
+def test_store_round_trip(store, tmp_path):
+    """
+    Tests whether the arrays of the loaded estimates store are equal to the saved arrays and
+    whether the numerical arrays are memory-mapped.
+    """
+    save_estimates_store(store, tmp_path / "estimates.npz")
+    loaded = load_estimates_store(tmp_path / "estimates.npz")
+    for field in store:
+        np.testing.assert_array_equal(np.asarray(loaded[field]), store[field])
+    assert isinstance(loaded["coefficients"], np.memmap)
+
+
+### checking whether the specifications are selected by their metadata ###
+
+# test for selecting specifications
+def test_store_select(store, tmp_path):
+    """
+    Tests whether the three baseline regressions of the time fixed effects model are selected
+    in the order of the outcome variables.
+    """
+    save_estimates_store(store, tmp_path / "estimates.npz")
+    loaded = load_estimates_store(tmp_path / "estimates.npz")
+    rows = loaded.select(model="fixed_effects", group="fixed_effects_model_estimates")
+    assert list(loaded["outcome"][rows]) == [
+        "fin_diff_all_lead",
+        "fin_diff_pc_lead",
+        "fin_diff_peh_lead",
+    ]
+    assert (loaded["nobs"][rows] == 120).all()
@@ -0,0 +1,67 @@
+"""Tests for the out-of-sample forecast evaluation of the OLS and time fixed effect models."""
+
+### packages ###
+import numpy as np
+import pandas as pd
+
+### functions tested ###
+from financial_development_and_income_inequality.analysis.forecast_evaluation import (
+    diebold_mariano_test,
+    run_forecast_evaluation,
+)
+from financial_development_and_income_inequality.analysis.least_squares import (
+    model_variables,
+)
+
+
+### the incrementally updated forecasts are compared with refitted models ###
+
+# test for rolling window forecasts of the OLS model
+def test_rolling_forecasts_ols(final_data):
+    """
+    Tests whether the rolling window forecasts of the OLS model are equal to the forecasts
+    obtained when refitting the model on every training window.
+    """
+    results = run_forecast_evaluation(final_data, window_size=40)
+    X, ys, control_vars = model_variables(final_data)
+    design = pd.concat([X, control_vars], axis=1).ffill().bfill().to_numpy()
+    Y = np.column_stack([y.to_numpy() for y in ys])
+    for i, origin in list(enumerate(results["origins"]))[::10]:
+        rows = slice(max(0, origin - 43), origin - 3)
+        training = np.column_stack([np.ones(len(design[rows])), design[rows]])
+        coefficients = np.linalg.lstsq(training, Y[rows], rcond=None)[0]
+        np.testing.assert_allclose(
+            results["forecasts"][i],
+            np.r_[1, design[origin]] @ coefficients,
+            rtol=1e-6,
+        )
+
+
+# test for the cache of the factorizations
+def test_forecast_cache_shared(final_data):
+    """
+    Tests whether the forecasts of the OLS and time fixed effects models are unchanged when
+    both models share one cache of the factorizations of the training windows.
+    """
+    cache = {}
+    for model in ["ols", "fixed_effects", "ols"]:
+        cached = run_forecast_evaluation(final_data, model=model, cache=cache)
+        expected = run_forecast_evaluation(final_data, model=model)
+        np.testing.assert_array_equal(cached["forecasts"], expected["forecasts"])
+    assert len({key[0] for key in cache}) == 2
+
+
+### checking the symmetry of the Diebold-Mariano test ###
+
+# test for Diebold-Mariano test
+def test_diebold_mariano_symmetry():
+    """
+    Tests whether swapping the forecasts and the benchmark changes the sign of the
+    Diebold-Mariano statistic, but not the p-value.
+    """
+    rng = np.random.default_rng(0)
+    errors, errors_benchmark = rng.normal(size=(2, 60, 3))
+    statistic, p_value = diebold_mariano_test(errors, errors_benchmark)
+    statistic_swapped, p_value_swapped = diebold_mariano_test(errors_benchmark, errors)
+    np.testing.assert_allclose(statistic, -statistic_swapped)
+    np.testing.assert_allclose(p_value, p_value_swapped)
@@ -0,0 +1,101 @@
+"""Tests for the hypothesis tests on the estimates of the OLS and time fixed effects models."""
+
+### packages ###
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+
+### functions tested ###
+from financial_development_and_income_inequality.analysis.estimates_store import (
+    combine_stores,
+    estimates_to_store,
+)
+from financial_development_and_income_inequality.analysis.fixed_effects_model import (
+    fit_fixed_effects_model,
+)
+from financial_development_and_income_inequality.analysis.hypothesis_tests import (
+    nested_f_tests,
+    wald_tests,
+)
+from financial_development_and_income_inequality.analysis.least_squares import (
+    model_design,
+    model_variables,
+)
+from financial_development_and_income_inequality.analysis.ols_model import (
+    fit_ols_model,
+)
+
+
+### the tests are compared with the tests of statsmodels ###
+
+# test for Wald tests on the estimates store
+def test_wald_tests(final_data):
+    """
+    Tests whether the equality test of fin_dev_db and fin_dev_fb and the joint significance
+    test of both variables are equal to the F-tests of statsmodels (without fin_dev_all).
+    """
+    X, ys, control_vars = model_variables(final_data)
+    X = X.drop(columns="fin_dev_all")
+    store = estimates_to_store({"ols": fit_ols_model(X, ys, control_vars)}, "ols")
+    design, Y, terms = model_design(X, ys, control_vars)
+    for hypotheses, restriction in [
+        ([{"fin_dev_db": 1, "fin_dev_fb": -1}], "fin_dev_db = fin_dev_fb"),
+        (["fin_dev_db", "fin_dev_fb"], "fin_dev_db = 0, fin_dev_fb = 0"),
+    ]:
+        tests = wald_tests(store, hypotheses)
+        for i in range(Y.shape[1]):
+            exog = pd.DataFrame(sm.add_constant(design), columns=["const"] + terms)
+            expected = sm.OLS(Y[:, i], exog).fit().f_test(restriction)
+            np.testing.assert_allclose(tests["statistic"].iloc[i], expected.fvalue)
+            np.testing.assert_allclose(tests["p_value"].iloc[i], expected.pvalue)
+            assert tests["df_num"].iloc[i] == expected.df_num
+
+
+# test for the year effects
+def test_nested_f_tests(final_data):
+    """
+    Tests whether the F-tests of the year effects are equal to the ones of statsmodels, and
+    whether the joint test of the collinear main explanatory variables has two degrees of
+    freedom.
+    """
+    X, ys, control_vars = model_variables(final_data)
+    store = combine_stores(
+        estimates_to_store({"ols": fit_ols_model(X, ys, control_vars)}, "ols"),
+        estimates_to_store(
+            {"fe": fit_fixed_effects_model(final_data, X, ys, control_vars)},
+            "fixed_effects",
+        ),
+    )
+    tests = nested_f_tests(store)
+    dummies = pd.get_dummies(final_data["Year"])
+    dummies.columns = dummies.columns.astype(str)
+    restricted, Y, _ = model_design(X, ys, control_vars)
+    unrestricted, _, _ = model_design(X, ys, control_vars, dummies)
+    for i in range(Y.shape[1]):
+        expected = (
+            sm.OLS(Y[:, i], sm.add_constant(unrestricted))
+            .fit()
+            .compare_f_test(sm.OLS(Y[:, i], sm.add_constant(restricted)).fit())
+        )
+        np.testing.assert_allclose(tests["statistic"].iloc[i], expected[0])
+        np.testing.assert_allclose(tests["p_value"].iloc[i], expected[1])
+        assert tests["df_num"].iloc[i] == expected[2]
+
+    joint = wald_tests(store, ["fin_dev_all", "fin_dev_db", "fin_dev_fb"])
+    assert (joint["df_num"] == 2).all()
+
+
+# test for restrictions which are not estimable
+def test_wald_tests_not_estimable(final_data):
+    """
+    Tests whether the test of fin_dev_db alone (not estimable, since fin_dev_all is part of
+    the design) is NaN, while the equality test of fin_dev_db and fin_dev_fb is finite.
+    """
+    X, ys, control_vars = model_variables(final_data)
+    store = estimates_to_store({"ols": fit_ols_model(X, ys, control_vars)}, "ols")
+    single = wald_tests(store, ["fin_dev_db"])
+    assert single["statistic"].isna().all()
+    assert (single["df_num"] == 0).all()
+    contrast = wald_tests(store, [{"fin_dev_db": 1, "fin_dev_fb": -1}])
+    assert np.isfinite(contrast["statistic"]).all()
+    assert (contrast["df_num"] == 1).all()
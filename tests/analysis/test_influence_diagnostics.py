@@ -0,0 +1,97 @@
+"""Tests for the influence diagnostics of the OLS and time fixed effect models."""
+
+### packages ###
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+### functions tested ###
+from financial_development_and_income_inequality.analysis.influence_diagnostics import (
+    influence_diagnostics,
+    run_fixed_effects_influence,
+    run_ols_influence,
+)
+from financial_development_and_income_inequality.analysis.least_squares import (
+    model_design,
+    model_variables,
+)
+
+
+### the analytical leave-one-year-out coefficients are compared with refitted models ###
+
+# test for leave-one-year-out coefficients of the OLS model
+def test_leave_year_out_ols(final_data):
+    """
+    Tests whether the leave-one-year-out coefficients of the OLS model are equal to the
+    coefficients obtained when refitting the model without the respective year.
+    """
+    diagnostics = run_ols_influence(final_data)
+    X, ys, control_vars = model_variables(final_data)
+    design, Y, _ = model_design(X, ys, control_vars)
+    for i, year in enumerate(diagnostics["clusters"][::7]):
+        keep = (final_data["Year"] != year).to_numpy()
+        refit = influence_diagnostics(design[keep], Y[keep])["coefficients"]
+        np.testing.assert_allclose(
+            diagnostics["cluster_coefficients"][i * 7],
+            refit,
+            rtol=1e-6,
+            atol=1e-6,
+        )
+
+
+# test for leave-one-out coefficients of the time fixed effects model
+def test_leave_one_out_fixed_effects(final_data):
+    """
+    Tests whether the leave-one-out coefficients of GDP_nom in the time fixed effects model
+    are equal to the coefficients obtained when refitting the model with year dummies, and
+    whether DFBETAS are missing (without warnings) for the coefficients which are not identified.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        diagnostics = run_fixed_effects_influence(final_data)
+    not_identified = np.isnan(diagnostics["dfbetas"]).all(axis=(0, 2))
+    assert [
+        term for term, missing in zip(diagnostics["terms"], not_identified) if missing
+    ] == ["fin_dev_all", "fin_dev_db", "fin_dev_fb", "edu_att"]
+    X, ys, control_vars = model_variables(final_data)
+    dummies = pd.get_dummies(final_data["Year"]).astype(float)
+    design, Y, _ = model_design(X, ys, control_vars, dummies=dummies)
+    for i in [0, 55, 119]:
+        keep = np.arange(len(design)) != i
+        refit = np.linalg.lstsq(design[keep], Y[keep], rcond=None)[0]
+        np.testing.assert_allclose(
+            diagnostics["coefficients"][3] - diagnostics["dfbeta"][i, 3],
+            refit[3],
+            rtol=1e-6,
+        )
+
+
+### the leverage values sum up to the number of estimated parameters ###
+
+# test for leverage
+def test_leverage_sum(final_data):
+    """
+    Tests whether the leverage values of the OLS model sum up to the rank of the design
+    matrix plus one (intercept), given that fin_dev_all = fin_dev_db + fin_dev_fb.
+    """
+    diagnostics = run_ols_influence(final_data)
+    assert diagnostics["leverage"].sum() == pytest.approx(11)
+
+
+# test for observations with a leverage of one
+def test_leverage_one(final_data):
+    """
+    Tests whether the leave-one-out diagnostics are NaN (without warnings) for an observation
+    which is fitted exactly, due to an indicator column of this observation.
+    """
+    design, Y, _ = model_design(*model_variables(final_data))
+    indicator = (np.arange(len(design)) == 0).astype(float)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        diagnostics = influence_diagnostics(np.column_stack([design, indicator]), Y)
+    assert diagnostics["leverage"][0] == pytest.approx(1)
+    for name in ["dfbeta", "dfbetas", "cooks_distance"]:
+        assert np.isnan(diagnostics[name][0]).all()
+    assert np.isfinite(diagnostics["cooks_distance"][1:]).all()
@@ -0,0 +1,140 @@
+"""Tests for the IV regressions of the OLS and time fixed effect models."""
+
+### packages ###
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+
+### functions tested ###
+from financial_development_and_income_inequality.analysis.instrumental_variables import (
+    iv_regression,
+    lagged_instruments,
+    run_iv_model,
+)
+from financial_development_and_income_inequality.analysis.least_squares import (
+    explanatory_variables,
+    mean_impute,
+    model_design,
+    model_variables,
+)
+
+
+### design of the IV regressions: fin_dev_db and fin_dev_fb are instrumented by their ###
+### lags and fb_num (fin_dev_all is dropped, since it is their sum)                  ###
+@pytest.fixture()
+def iv_design(final_data):
+    design, Y, _ = model_design(*model_variables(final_data))
+    instruments = pd.concat(
+        [
+            lagged_instruments(final_data, ["fin_dev_db", "fin_dev_fb"]),
+            final_data[["fb_num"]],
+        ],
+        axis=1,
+    )
+    # full matrices of the regressors and instruments, including the intercept
+    exogenous = np.column_stack([np.ones(len(design)), design[:, 3:]])
+    Z = mean_impute(instruments.to_numpy(dtype=float))
+    return {
+        "design": design[:, 1:],
+        "Y": Y,
+        "instruments": Z,
+        "X_full": np.column_stack([design[:, 1:3], exogenous]),
+        "Z_full": np.column_stack([Z, exogenous]),
+    }
+
+
+### the partialled out estimates are compared with the textbook formulas ###
+
+# test for 2SLS estimates
+def test_two_stage_least_squares(iv_design):
+    """
+    Tests whether the 2SLS coefficients, standard errors and first stage F-statistics are
+    equal to the ones calculated from the full matrices of regressors and instruments.
+    """
+    results = iv_regression(
+        iv_design["design"],
+        iv_design["Y"],
+        [0, 1],
+        iv_design["instruments"],
+    )
+    X, Z, Y = iv_design["X_full"], iv_design["Z_full"], iv_design["Y"]
+    X_hat = Z @ np.linalg.lstsq(Z, X, rcond=None)[0]
+    gram_inv = np.linalg.inv(X_hat.T @ X_hat)
+    coefficients = gram_inv @ X_hat.T @ Y
+    sigma2 = ((Y - X @ coefficients) ** 2).sum(axis=0) / (len(X) - X.shape[1])
+    np.testing.assert_allclose(results["coefficients"], coefficients[:2], rtol=1e-6)
+    np.testing.assert_allclose(
+        results["std_errors"],
+        np.sqrt(np.outer(np.diag(gram_inv)[:2], sigma2)),
+        rtol=1e-6,
+    )
+    for j in range(2):
+        first_stage = sm.OLS(X[:, j], Z).fit()
+        np.testing.assert_allclose(
+            results["first_stage"]["f_statistics"][j],
+            first_stage.f_test(np.eye(Z.shape[1])[:3]).fvalue,
+            rtol=1e-6,
+        )
+
+
+# test for two-step GMM estimates
+def test_two_step_gmm(iv_design):
+    """
+    Tests whether the two-step GMM coefficients, standard errors and J statistics are equal
+    to the ones calculated from the full matrices of regressors and instruments.
+    """
+    results = iv_regression(
+        iv_design["design"],
+        iv_design["Y"],
+        [0, 1],
+        iv_design["instruments"],
+        method="gmm",
+    )
+    X, Z, Y = iv_design["X_full"], iv_design["Z_full"], iv_design["Y"]
+    X_hat = Z @ np.linalg.lstsq(Z, X, rcond=None)[0]
+    for m in range(Y.shape[1]):
+        residuals = Y[:, m] - X @ np.linalg.lstsq(X_hat, Y[:, m], rcond=None)[0]
+        weights = np.linalg.inv((Z * residuals[:, None] ** 2).T @ Z)
+        covariance = np.linalg.inv(X.T @ Z @ weights @ Z.T @ X)
+        coefficients = covariance @ X.T @ Z @ weights @ Z.T @ Y[:, m]
+        moments = Z.T @ (Y[:, m] - X @ coefficients)
+        np.testing.assert_allclose(
+            results["coefficients"][:, m],
+            coefficients[:2],
+            rtol=1e-6,
+        )
+        np.testing.assert_allclose(
+            results["std_errors"][:, m],
+            np.sqrt(np.diag(covariance)[:2]),
+            rtol=1e-6,
+        )
+        np.testing.assert_allclose(
+            results["j_statistic"][m],
+            moments @ weights @ moments,
+            rtol=1e-6,
+        )
+
+
+### coefficients which are not identified are NaN ###
+
+# test for the default endogenous regressors
+def test_run_iv_model_identified(final_data, iv_design):
+    """
+    Tests whether the default IV model instruments fin_dev_db and fin_dev_fb (equal to the
+    design without fin_dev_all), and whether the results are NaN if all three collinear main
+    explanatory variables are endogenous.
+    """
+    default = run_iv_model(final_data)
+    expected = iv_regression(
+        iv_design["design"],
+        iv_design["Y"],
+        [0, 1],
+        iv_design["instruments"],
+    )
+    assert default["terms"] == ["fin_dev_db", "fin_dev_fb"]
+    np.testing.assert_allclose(default["std_errors"], expected["std_errors"])
+    assert np.isfinite(default["std_errors"]).all()
+    collinear = run_iv_model(final_data, endogenous=explanatory_variables)
+    assert np.isnan(collinear["coefficients"]).all()
+    assert np.isnan(collinear["std_errors"]).all()
@@ -0,0 +1,92 @@
+"""Tests for the OLS and time fixed effects models with interaction terms."""
+
+### packages ###
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+
+### functions tested ###
+from financial_development_and_income_inequality.analysis.interactions import (
+    default_interactions,
+    fit_interaction_model,
+    interaction_cross_products,
+    marginal_effects,
+    run_interaction_model,
+    time_trend,
+)
+from financial_development_and_income_inequality.analysis.least_squares import (
+    model_design,
+    model_variables,
+)
+
+
+### the model with interactions is compared with statsmodels ###
+
+# test for the coefficients and marginal effects
+def test_interaction_model(final_data):
+    """
+    Tests whether the coefficients, standard errors and marginal effects of the model with
+    interactions (accumulated in small chunks, without fin_dev_all) are equal to the ones of
+    statsmodels, fitted on the design with the interaction columns.
+    """
+    X, ys, control_vars = model_variables(final_data)
+    X = X.drop(columns="fin_dev_all")
+    design, Y, terms = model_design(
+        X,
+        ys,
+        pd.concat([control_vars, time_trend(final_data)], axis=1),
+    )
+    exog = pd.DataFrame(design, columns=terms)
+    for left, right in default_interactions:
+        exog[f"{left}:{right}"] = exog[left] * exog[right]
+    pairs = [
+        (terms.index(left), terms.index(right)) for left, right in default_interactions
+    ]
+    fit = fit_interaction_model(
+        interaction_cross_products(design, Y, pairs, chunk_size=7),
+        list(exog.columns),
+    )
+    points = pd.DataFrame({"FSI": [0.0, 1.0]})
+    effects, std_errors = marginal_effects(fit, "fin_dev_db", points)
+    means = exog.mean()
+    for i in range(Y.shape[1]):
+        expected = sm.OLS(Y[:, i], sm.add_constant(exog)).fit()
+        np.testing.assert_allclose(
+            fit["coefficients"][:, i], expected.params[1:], rtol=1e-8
+        )
+        np.testing.assert_allclose(
+            np.sqrt(np.diagonal(fit["covariance"][i])),
+            expected.bse[1:],
+            rtol=1e-8,
+        )
+        for point, value in enumerate(points["FSI"]):
+            test = expected.t_test(
+                f"fin_dev_db + {means['fincri_0708']} * fin_dev_db:fincri_0708"
+                f" + {value} * fin_dev_db:FSI + {means['trend']} * fin_dev_db:trend = 0",
+            )
+            np.testing.assert_allclose(effects[point, i], test.effect[0], rtol=1e-8)
+            np.testing.assert_allclose(std_errors[point, i], test.sd[0, 0], rtol=1e-8)
+
+
+# test for the collinear interaction terms of the time fixed effects model
+def test_run_interaction_model(final_data):
+    """
+    Tests whether fin_dev_all is left out of the time fixed effects model with interactions,
+    whether the year dummies are not reported, and whether the marginal effects are NaN if
+    fin_dev_all is interacted as well (fin_dev_all = fin_dev_db + fin_dev_fb).
+    """
+    results = run_interaction_model(final_data, model="fixed_effects")
+    assert "fin_dev_all" not in results["terms"]
+    assert "1991" not in results["terms"]
+    assert results["coefficients"].shape == (len(results["terms"]), 3)
+    assert np.isfinite(results["marginal_effects"].to_numpy()).all()
+
+    collinear = run_interaction_model(
+        final_data,
+        interactions=[("fin_dev_all", "FSI"), ("fin_dev_db", "FSI")],
+        model="fixed_effects",
+    )
+    assert ["fin_dev_db", "fin_dev_fb", "fin_dev_all"] in collinear["diagnostics"][
+        "collinear_sets"
+    ]
+    assert collinear["marginal_effects"].isna().all(axis=None)
@@ -1,7 +1,7 @@
 """Tests for the OLS and time fixed effect models."""
 
 ### packages ###
-import pandas as pd
+import numpy as np
 import pytest
 
 ### time fixed effects model function tested ###
@@ -15,32 +15,6 @@ from financial_development_and_income_inequality.analysis.ols_model import (
     run_ols_model_robust,
 )
 
-### folder and function used for creating the finalized version of the data set ###
-from financial_development_and_income_inequality.config import SRC
-from financial_development_and_income_inequality.data_management.data_set_management import (
-    generate_variables,
-)
-
-### arguments used for the function that creates the finalized version of the data set ###
-from financial_development_and_income_inequality.data_management.task_data_set_management import (
-    sectors_percentage_increase_calculation,
-    sectors_percentage_increase_diff,
-    target_col,
-)
-
-
-### finalized version of the data set ###
-@pytest.fixture()
-def final_data():
-    initial_data_set = pd.read_pickle(SRC / "data" / "initial_data_set.pkl")
-    final_data_set = generate_variables(
-        initial_data_set,
-        sectors_percentage_increase_calculation,
-        sectors_percentage_increase_diff,
-        target_col,
-    )
-    return final_data_set
-
 
 ### tests for the OLS and time fixed effects models ###
 ### tests related with the expected signs of the coefficients ###
@@ -102,3 +76,22 @@ def test_compare_coeff(final_data):
     assert all(coeff > 0 for coeff in coeff_baseline) and all(
         coeff > 0 for coeff in coeff_robust
     )
+
+
+### coefficients which are not identified (collinear columns) have no standard errors ###
+
+# test for the standard errors of collinear columns
+def test_std_errors_collinear(final_data):
+    """
+    Tests whether the standard errors of the collinear financial development variables (and of edu_att,
+    which is constant within years, in the time fixed effects model) are NaN, and all others finite.
+    """
+    fin_dev = ["fin_dev_all", "fin_dev_db", "fin_dev_fb"]
+    for results, collinear in [
+        (run_ols_model(final_data), fin_dev),
+        (run_fixed_effects_model(final_data), fin_dev + ["edu_att"]),
+    ]:
+        for result in results:
+            std_errors = dict(zip(result["terms"], result["std_errors"][0]))
+            for term, std_error in std_errors.items():
+                assert np.isnan(std_error) == (term in collinear)
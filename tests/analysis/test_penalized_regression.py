@@ -0,0 +1,58 @@
+"""Tests for the penalized regressions of the OLS and time fixed effect models."""
+
+### packages ###
+import numpy as np
+from sklearn.linear_model import enet_path
+
+### functions tested ###
+from financial_development_and_income_inequality.analysis.least_squares import (
+    model_design,
+    model_variables,
+)
+from financial_development_and_income_inequality.analysis.penalized_regression import (
+    run_penalized_regression,
+)
+
+
+### the paths are compared with the paths of scikit-learn ###
+
+# test for elastic net path
+def test_elastic_net_path(final_data):
+    """
+    Tests whether the elastic net path of the OLS model is equal to the path calculated by
+    scikit-learn on the standardized regressors.
+    """
+    results = run_penalized_regression(final_data, alpha=0.5, n_lambdas=20, n_folds=0)
+    design, Y, _ = model_design(*model_variables(final_data))
+    scale = design.std(axis=0)
+    standardized = (design - design.mean(axis=0)) / scale
+    for m in range(Y.shape[1]):
+        _, coefficients, _ = enet_path(
+            standardized,
+            Y[:, m] - Y[:, m].mean(),
+            l1_ratio=0.5,
+            alphas=results["lambdas"][:, m],
+            tol=1e-12,
+            max_iter=100000,
+        )
+        np.testing.assert_allclose(
+            results["coefficients"][:, :, m] * scale,
+            coefficients.T,
+            atol=1e-5,
+        )
+
+
+### checking whether the cross-validation does not depend on the number of worker processes ###
+
+# test for deterministic cross-validation
+def test_cross_validation_deterministic(final_data):
+    """
+    Tests whether the cross-validation errors of the lasso path are the same when the folds
+    are evaluated in the current process and in two worker processes, and whether the
+    penalty selected by the one standard error rule is at least the one with the
+    smallest error.
+    """
+    serial = run_penalized_regression(final_data, n_lambdas=20)
+    parallel = run_penalized_regression(final_data, n_lambdas=20, n_workers=2)
+    np.testing.assert_array_equal(serial["cv_mse"], parallel["cv_mse"])
+    assert (serial["lambda_1se"] >= serial["lambda_min"]).all()
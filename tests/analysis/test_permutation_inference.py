@@ -0,0 +1,68 @@
+"""Tests for the permutation inference of the OLS and time fixed effect models."""
+
+### packages ###
+import numpy as np
+
+### functions tested ###
+from financial_development_and_income_inequality.analysis.least_squares import (
+    explanatory_variables,
+)
+from financial_development_and_income_inequality.analysis.permutation_inference import (
+    block_permutation_indices,
+    run_fixed_effects_permutation,
+    run_ols_permutation,
+)
+
+
+### checking whether the permuted indices keep the quarters of a year together ###
+
+# test for block permutation indices
+def test_block_permutation_indices():
+    """
+    Tests whether every row of the permuted indices is a permutation of all observations
+    in which blocks of four consecutive quarters stay together.
+    """
+    indices = block_permutation_indices(120, 50, 4, np.random.default_rng(0))
+    assert (np.sort(indices, axis=1) == np.arange(120)).all()
+    assert (indices[:, ::4] % 4 == 0).all()
+    assert (np.diff(indices.reshape(50, 30, 4), axis=2) == 1).all()
+
+
+### checking whether the p-values do not depend on the number of worker processes ###
+
+# test for deterministic p-values
+def test_permutation_p_values_deterministic(final_data):
+    """
+    Tests whether the permutation p-values are the same when the permutations are evaluated
+    in the current process and in two worker processes.
+    """
+    serial = run_ols_permutation(final_data, n_permutations=200, chunk_size=50)
+    parallel = run_ols_permutation(
+        final_data,
+        n_permutations=200,
+        chunk_size=50,
+        n_workers=2,
+    )
+    np.testing.assert_array_equal(serial["p_values"], parallel["p_values"])
+    assert ((serial["p_values"] > 0) & (serial["p_values"] <= 1)).all()
+
+
+### checking whether coefficients which are not identified are not tested ###
+
+# test for collinear tested variables
+def test_permutation_not_identified(final_data):
+    """
+    Tests whether the results are NaN if all three main explanatory variables are tested
+    (fin_dev_all = fin_dev_db + fin_dev_fb), while fin_dev_db and fin_dev_fb are tested by
+    default.
+    """
+    collinear = run_fixed_effects_permutation(
+        final_data,
+        terms=explanatory_variables,
+        n_permutations=20,
+    )
+    for name in ["coefficients", "t_values", "p_values"]:
+        assert np.isnan(collinear[name]).all()
+    default = run_fixed_effects_permutation(final_data, n_permutations=20)
+    assert default["terms"] == ["fin_dev_db", "fin_dev_fb"]
+    assert np.isfinite(default["t_values"]).all()
@@ -0,0 +1,76 @@
+"""Tests for the quantile regressions of the OLS and time fixed effects models."""
+
+### packages ###
+import numpy as np
+from scipy.optimize import linprog
+
+### functions tested ###
+from financial_development_and_income_inequality.analysis.least_squares import (
+    model_design,
+    model_variables,
+)
+from financial_development_and_income_inequality.analysis.quantile_regression import (
+    quantile_regression,
+    run_quantile_regression,
+)
+
+
+### the quantile regressions are compared with the linear program solved by scipy ###
+
+# test for the quantile regression estimates
+def test_quantile_regression(final_data):
+    """
+    Tests whether the check loss of the estimated quantile regressions is equal to the
+    optimal value of the linear program, solved with the HiGHS solver of scipy.
+    """
+    design, Y, _ = model_design(*model_variables(final_data))
+    n_obs, n_regressors = design.shape
+    results = quantile_regression(design, Y, n_boot=0)
+    for i, tau in enumerate(results["quantiles"]):
+        for m in range(Y.shape[1]):
+            residuals = (
+                Y[:, m]
+                - results["intercepts"][i, m]
+                - design @ results["coefficients"][i, :, m]
+            )
+            loss = (residuals * (tau - (residuals < 0))).sum()
+            # min tau 1'u + (1 - tau) 1'v subject to b0 + X b + u - v = y
+            optimum = linprog(
+                np.r_[
+                    np.zeros(n_regressors + 1),
+                    np.full(n_obs, tau),
+                    np.full(n_obs, 1 - tau),
+                ],
+                A_eq=np.hstack(
+                    [np.ones((n_obs, 1)), design, np.eye(n_obs), -np.eye(n_obs)],
+                ),
+                b_eq=Y[:, m],
+                bounds=[(None, None)] * (n_regressors + 1) + [(0, None)] * (2 * n_obs),
+                method="highs",
+            ).fun
+            np.testing.assert_allclose(loss, optimum, rtol=1e-5)
+
+
+# test for the bootstrap standard errors
+def test_quantile_regression_bootstrap(final_data):
+    """
+    Tests whether the bootstrap standard errors of the time fixed effects model are NaN for
+    the collinear main explanatory variables and edu_att (constant within years), positive
+    otherwise, and equal for serial and parallel estimation.
+    """
+    serial = run_quantile_regression(final_data, "fixed_effects", n_boot=50)
+    parallel = run_quantile_regression(
+        final_data,
+        "fixed_effects",
+        n_boot=50,
+        n_workers=2,
+    )
+    assert serial["coefficients"].shape == (5, len(serial["terms"]), 3)
+    not_identified = np.isin(
+        serial["terms"],
+        ["fin_dev_all", "fin_dev_db", "fin_dev_fb", "edu_att"],
+    )
+    assert np.isnan(serial["std_errors"][:, not_identified]).all()
+    assert (serial["std_errors"][:, ~not_identified] > 0).all()
+    for field in ["coefficients", "intercepts", "std_errors"]:
+        np.testing.assert_array_equal(serial[field], parallel[field])
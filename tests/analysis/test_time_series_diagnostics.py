@@ -0,0 +1,90 @@
+"""Tests for the unit root and cointegration tests of the model variables."""
+
+### packages ###
+import numpy as np
+import pytest
+from statsmodels.tsa.stattools import adfuller, coint, kpss
+
+### functions tested ###
+from financial_development_and_income_inequality.analysis.time_series_diagnostics import (
+    common_samples,
+    engle_granger_tests,
+    unit_root_tests,
+)
+
+
+### the batched tests are compared with the tests of statsmodels ###
+
+# test for ADF and KPSS tests
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize("regression", ["c", "ct"])
+def test_unit_root_tests(final_data, regression):
+    """
+    Tests whether the batched ADF and KPSS statistics, p-values and numbers of lags are
+    equal to the ones of adfuller and kpss of statsmodels, for all tested columns.
+    """
+    results = unit_root_tests(final_data, regression=regression)
+    assert "fin_diff_all_lead" in results.index
+    for column, result in results.iterrows():
+        series = final_data[column].iloc[int(result["start"]) : int(result["end"])]
+        adf = adfuller(series, regression=regression, autolag="AIC")
+        stationarity = kpss(series, regression=regression, nlags="auto")
+        np.testing.assert_allclose(result["adf_statistic"], adf[0], rtol=1e-6)
+        np.testing.assert_allclose(result["adf_p_value"], adf[1], rtol=1e-6, atol=1e-10)
+        assert (result["adf_lags"], result["adf_nobs"]) == adf[2:4]
+        np.testing.assert_allclose(result["kpss_statistic"], stationarity[0])
+        assert result["kpss_lags"] == stationarity[2]
+
+
+# test for Engle-Granger tests
+def test_engle_granger_tests(final_data):
+    """
+    Tests whether the batched Engle-Granger statistics and p-values are equal to the ones
+    of coint of statsmodels, for pairs with different samples.
+    """
+    dependents = ["fin_diff_all_lead", "fin_diff_pc"]
+    regressors = ["fin_dev_all", "fin_dev_fb"]
+    results = engle_granger_tests(final_data, dependents, regressors)
+    for (dependent, regressor), result in results.iterrows():
+        sample = final_data[[dependent, regressor]].dropna()
+        statistic, p_value, critical = coint(sample[dependent], sample[regressor])
+        np.testing.assert_allclose(result["statistic"], statistic, rtol=1e-6)
+        np.testing.assert_allclose(result["p_value"], p_value, rtol=1e-6)
+        np.testing.assert_allclose(
+            result[["crit_1%", "crit_5%", "crit_10%"]].to_numpy(dtype=float),
+            critical,
+        )
+
+
+### series with missing values within their span are tested on their longest stretch ###
+
+# test for Engle-Granger tests of series with missing values within their span
+def test_engle_granger_tests_gaps(final_data):
+    """
+    Tests whether pairs with missing values within their span are tested on the longest
+    stretch where both series are observed.
+    """
+    final_data.loc[final_data.index[50], "fin_dev_fb"] = np.nan
+    results = engle_granger_tests(final_data, ["fin_diff_pc"], ["fin_dev_fb"])
+    result = results.loc[("fin_diff_pc", "fin_dev_fb")]
+    observed = final_data[["fin_diff_pc", "fin_dev_fb"]].notna().all(axis=1)
+    assert observed.iloc[51:].all()
+    sample = final_data.iloc[51:]
+    assert result["nobs_coint"] == len(sample)
+    statistic, p_value, _ = coint(sample["fin_diff_pc"], sample["fin_dev_fb"])
+    np.testing.assert_allclose(result["statistic"], statistic, rtol=1e-6)
+    np.testing.assert_allclose(result["p_value"], p_value, rtol=1e-6)
+
+
+# test for the samples of the series
+def test_common_samples(final_data):
+    """
+    Tests whether edu_att (missing in 1998) is tested on its longest stretch of observations
+    and whether columns without variation are reported with missing results.
+    """
+    samples = common_samples(final_data, ["edu_att", "FSI"])
+    assert samples[(32, 120)] == ["edu_att"]
+    final_data["constant"] = 1.0
+    results = unit_root_tests(final_data, columns=["edu_att", "constant"])
+    assert results.loc["edu_att", ["start", "end"]].tolist() == [32, 120]
+    assert results.loc["constant"].isna().all()
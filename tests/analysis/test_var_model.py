@@ -0,0 +1,109 @@
+"""Tests for the VAR model of financial development and the labor cost differences."""
+
+### packages ###
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tsa.api import VAR
+
+### functions tested ###
+from financial_development_and_income_inequality.analysis.var_model import (
+    bootstrap_irf_bands,
+    complete_sample,
+    fit_var,
+    granger_causality,
+    impulse_responses,
+    select_lag_order,
+    var_variables,
+)
+
+
+### series of the VAR model, taken from the finalized version of the data set ###
+@pytest.fixture()
+def var_values(final_data):
+    return complete_sample(final_data, var_variables)
+
+
+### the VAR model is compared with the VAR model of statsmodels ###
+
+# test for VAR estimates
+def test_var_estimates(var_values):
+    """
+    Tests whether the information criteria, coefficients, residual covariance matrix,
+    Granger causality statistics and impulse responses are equal to the ones of statsmodels.
+    """
+    model = VAR(var_values)
+    criteria = select_lag_order(var_values, maxlags=6)
+    selected = model.select_order(6)
+    for criterion in ["aic", "bic", "hqic", "fpe"]:
+        np.testing.assert_allclose(
+            criteria[criterion],
+            selected.ics[criterion],
+            rtol=1e-6,
+            atol=1e-6,
+        )
+
+    fit, expected = fit_var(var_values, 3), model.fit(3)
+    np.testing.assert_allclose(fit["lag_coefficients"], expected.coefs, atol=1e-8)
+    np.testing.assert_allclose(fit["intercept"], expected.intercept, atol=1e-8)
+    np.testing.assert_allclose(fit["sigma_u"], expected.sigma_u, rtol=1e-8)
+    causality = granger_causality(fit, var_variables)
+    for caused, causing in [
+        ("fin_diff_pc", "fin_dev_fb"),
+        ("fin_dev_db", "fin_diff_all"),
+    ]:
+        np.testing.assert_allclose(
+            causality.loc[(caused, causing), "statistic"],
+            expected.test_causality(
+                var_variables.index(caused),
+                var_variables.index(causing),
+                kind="f",
+            ).test_statistic,
+            rtol=1e-6,
+        )
+    np.testing.assert_allclose(
+        impulse_responses(fit["lag_coefficients"], fit["sigma_u"], 10),
+        expected.irf(10).orth_irfs,
+        atol=1e-6,
+    )
+
+
+### checking whether the bands do not depend on the number of worker processes ###
+
+# test for deterministic bootstrap bands
+def test_bootstrap_bands_deterministic(var_values):
+    """
+    Tests whether the bootstrap bands are the same when the replicates are simulated in
+    the current process and in two worker processes, and whether they are ordered.
+    """
+    fit = fit_var(var_values, 2)
+    serial = bootstrap_irf_bands(var_values, fit, n_replicates=60, chunk_size=20)
+    parallel = bootstrap_irf_bands(
+        var_values,
+        fit,
+        n_replicates=60,
+        chunk_size=20,
+        n_workers=2,
+    )
+    np.testing.assert_array_equal(serial[0], parallel[0])
+    assert (serial[0] <= serial[1]).all()
+
+
+### only missing values at the start or end of the sample are excluded ###
+
+# test for the sample of the VAR model
+def test_complete_sample():
+    """
+    Tests whether missing values at the start and end of the sample are trimmed and whether
+    missing values within the sample raise an error instead of being dropped.
+    """
+    data = pd.DataFrame(
+        {"a": [np.nan, 1.0, 2.0, 3.0, 4.0], "b": [0.0, 1.0, 2.0, 3.0, np.nan]},
+    )
+    np.testing.assert_array_equal(
+        complete_sample(data, ["a", "b"]),
+        data.iloc[1:4].to_numpy(),
+    )
+    data.loc[2, "b"] = np.nan
+    with pytest.raises(ValueError, match="'b'"):
+        complete_sample(data, ["a", "b"])
@@ -0,0 +1,35 @@
+"""Fixtures shared by the tests."""
+
+### packages ###
+import pytest
+
+### folder and function used for creating the finalized version of the data set ###
+from financial_development_and_income_inequality.config import SRC
+from financial_development_and_income_inequality.data_management.columnar_storage import (
+    load_data_set,
+)
+from financial_development_and_income_inequality.data_management.data_set_management import (
+    generate_variables,
+)
+from financial_development_and_income_inequality.data_management.task_data_set_management import (
+    sectors_percentage_increase_calculation,
+    sectors_percentage_increase_diff,
+    target_col,
+)
+
+
+### initial version of the data set ###
+@pytest.fixture()
+def initial_data_set():
+    return load_data_set(SRC / "data" / "initial_data_set.arrow")
+
+
+### finalized version of the data set ###
+@pytest.fixture()
+def final_data(initial_data_set):
+    return generate_variables(
+        initial_data_set,
+        sectors_percentage_increase_calculation,
+        sectors_percentage_increase_diff,
+        target_col,
+    )
@@ -0,0 +1,41 @@
+"""Tests for the columnar storage of the data sets passed between the stages."""
+
+### packages ###
+from pandas.testing import assert_frame_equal
+
+### folder containing the initial data set ###
+
+### functions tested ###
+from financial_development_and_income_inequality.data_management.columnar_storage import (
+    link_data_set,
+    load_data_set,
+    save_data_set,
+)
+
+
+### the data sets are stored without loss and only the requested columns are read ###
+
+# test for storing and loading a data set
+def test_save_load_data_set(initial_data_set, tmp_path):
+    """
+    Tests whether the stored data set is loaded with identical values and data types, and whether only
+    the requested columns are read, in the requested order.
+    """
+    path = tmp_path / "data.arrow"
+    save_data_set(initial_data_set, path)
+    assert_frame_equal(load_data_set(path), initial_data_set)
+    columns = ["fb_num", "Country", "FSI"]
+    assert_frame_equal(load_data_set(path, columns), initial_data_set[columns])
+
+
+# test for the link of a data set
+def test_link_data_set(initial_data_set, tmp_path):
+    """
+    Tests whether the linked file shares the content of the stored data set and replaces an existing file.
+    """
+    path = tmp_path / "data.arrow"
+    save_data_set(initial_data_set, path)
+    (tmp_path / "link.arrow").write_text("outdated")
+    link_data_set(path, tmp_path / "link.arrow")
+    assert (tmp_path / "link.arrow").samefile(path)
+    assert_frame_equal(load_data_set(tmp_path / "link.arrow"), initial_data_set)
@@ -12,12 +12,16 @@ from financial_development_and_income_inequality.config import SRC
 
 ### functions tested ###
 from financial_development_and_income_inequality.data_management.data_set_creation import (
+    assemble_data_set,
+    data_creation,
     load_csv_data_deposits,
     load_csv_data_labor_costs,
+    load_source,
+    source_files,
 )
 
 # test related packages
-from pandas.testing import assert_series_equal
+from pandas.testing import assert_frame_equal, assert_series_equal
 
 
 ### path to the directory containing the initial data files ###
@@ -134,3 +138,25 @@ def test_expected_values_foreign_banks(directory_initial_data_files):
     assert_series_equal(results2[56:60], expected_values_2005)
     # checking equality of values 2015 (all quarters)
     assert_series_equal(results2[96:100], expected_values_2015)
+
+
+### checking whether the data set assembled from the variables of the single ###
+### initial data files is identical to the one created at once                ###
+
+# test for the per-file creation of the initial data set
+def test_assemble_data_set(directory_initial_data_files):
+    """
+    Tests whether every initial data file is loaded into a single variable of 120 quarters, and whether
+    the data set assembled from these variables is identical to the one of the function data_creation.
+    """
+    sources = {
+        variable: load_source(variable, directory_initial_data_files / file_name)
+        for variable, file_name in source_files.items()
+    }
+    for variable, source in sources.items():
+        assert list(source.columns) == [variable]
+        assert len(source) == 120
+    assert_frame_equal(
+        assemble_data_set(sources),
+        data_creation(pd.DataFrame(), directory_initial_data_files),
+    )
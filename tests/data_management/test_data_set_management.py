@@ -5,22 +5,31 @@
 
 ### packages ###
 import numpy as np
-import pandas as pd
 import pytest
 
 ### folder used for creating the finalized version of the data set ###
 from financial_development_and_income_inequality.config import SRC
+from financial_development_and_income_inequality.data_management.columnar_storage import (
+    load_data_set,
+)
 
 ### functions tested ###
 from financial_development_and_income_inequality.data_management.data_set_management import (
+    PriceTerms,
+    adjust_seasonality,
     create_lead_variables,
+    deflate_columns,
     explanatory_variables,
     generate_variables,
     percentage_increase_differences,
+    rebased_price_index,
+    seasonally_adjust,
 )
 
 ### arguments used for the function that creates the finalized version of the data set ###
 from financial_development_and_income_inequality.data_management.task_data_set_management import (
+    nominal_columns,
+    seasonal_columns,
     sectors_percentage_increase_calculation,
     sectors_percentage_increase_diff,
     target_col,
@@ -30,7 +39,7 @@ from financial_development_and_income_inequality.data_management.task_data_set_m
 ### finalized version of the data set ###
 @pytest.fixture()
 def data():
-    initial_data = pd.read_pickle(SRC / "data" / "initial_data_set.pkl")
+    initial_data = load_data_set(SRC / "data" / "initial_data_set.arrow")
     final_data = generate_variables(
         initial_data,
         sectors_percentage_increase_calculation,
@@ -135,3 +144,93 @@ def test_explanatory_variables(data):
     assert (
         exp_variables.loc[:, "fin_dev_db"] > exp_variables.loc[:, "fin_dev_fb"]
     ).all(), "fin_dev_db is not larger than fin_dev_fb in all of its values"
+
+
+###                      tests for real terms                                   ###
+### checking whether the nominal variables are deflated by the rebased CPI and  ###
+### whether the financial development variables (ratios of nominal variables)   ###
+### are the same in real and nominal terms                                      ###
+
+# test for deflating the nominal variables
+def test_deflate_columns(data):
+    """
+    Tests whether the deflated variables are equal to the nominal variables in the base
+    period (on average), and whether the financial development variables are unchanged.
+    """
+    deflator = rebased_price_index(data, base_period=2015)
+    assert np.isclose(deflator[(data["Year"] == 2015).to_numpy()].mean(), 1)
+    nominal = data[nominal_columns].to_numpy()
+    real = deflate_columns(data, nominal_columns, base_period=2015)
+    # the nominal variables are not overwritten
+    np.testing.assert_array_equal(data[nominal_columns].to_numpy(), nominal)
+    np.testing.assert_allclose(
+        real[nominal_columns].to_numpy() * deflator[:, None],
+        data[nominal_columns].to_numpy(),
+    )
+    real = explanatory_variables(real)
+    np.testing.assert_allclose(
+        real[["fin_dev_all", "fin_dev_db", "fin_dev_fb"]],
+        data[["fin_dev_all", "fin_dev_db", "fin_dev_fb"]],
+    )
+    with pytest.raises(ValueError):
+        rebased_price_index(data, base_period=(1990, 1))
+
+
+# test for the nominal and real variants sharing the block of nominal values
+def test_price_terms(data):
+    """
+    Tests whether the nominal variant is the data set itself, whether the real variant is
+    only calculated once and whether both are given by the same block of nominal values.
+    """
+    terms = PriceTerms(data, nominal_columns, base_period=(1991, 1))
+    assert terms._real is None and terms.variant(real=False) is data
+    real = terms.variant(real=True)
+    assert terms.real is real
+    np.testing.assert_allclose(
+        real[nominal_columns].to_numpy(),
+        terms.values / terms.deflator[:, None],
+    )
+    np.testing.assert_array_equal(real["CPI"], data["CPI"])
+
+
+###                    tests for seasonal adjustment                            ###
+### checking whether known seasonal factors are removed and whether the         ###
+### quarterly growth rates of the adjusted series do not depend on the quarter  ###
+
+# test for seasonally adjusting a series with known seasonal factors
+def test_seasonally_adjust():
+    """
+    Tests whether the seasonal factors of a series with a linear trend are removed, for the
+    multiplicative and additive model.
+    """
+    quarters = np.tile(np.arange(1, 5), 10)
+    trend = 100 + np.arange(40.0)
+    seasons = np.array([0.9, 1.05, 1.0, 1.05])[quarters - 1]
+    values = np.column_stack([trend * seasons, trend + 10 * (seasons - 1)])
+    # the seasonal factors average to one, hence the adjusted series is close to the trend
+    np.testing.assert_allclose(
+        seasonally_adjust(values[:, :1], quarters)[:, 0],
+        trend,
+        rtol=1e-2,
+    )
+    np.testing.assert_allclose(
+        seasonally_adjust(values[:, 1:], quarters, "additive")[:, 0],
+        trend,
+        atol=1e-8,
+    )
+
+
+# test for seasonally adjusting the data set
+def test_adjust_seasonality(data):
+    """
+    Tests whether the mean quarterly growth rates of the adjusted labor costs and GDP are
+    similar across quarters, and whether the parallel adjustment is equal to the serial one.
+    """
+    adjusted = adjust_seasonality(data.copy(), seasonal_columns)
+    growth = np.log(adjusted[seasonal_columns]).diff()
+    quarterly = growth.groupby(adjusted["Quarter"]).mean()
+    assert (quarterly.max() - quarterly.min() < 0.01).all()
+    parallel = adjust_seasonality(data.copy(), seasonal_columns, n_workers=2)
+    np.testing.assert_array_equal(
+        parallel[seasonal_columns], adjusted[seasonal_columns]
+    )
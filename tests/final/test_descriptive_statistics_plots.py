@@ -0,0 +1,51 @@
+"""Tests for the plots depicting the descriptive statistics of the data."""
+
+### packages ###
+from matplotlib.collections import PathCollection, PolyCollection
+
+### functions tested ###
+from financial_development_and_income_inequality.final.descriptive_statistics_plots import (
+    scatter_matrix_plot,
+    x_variables,
+    y_variables,
+)
+
+
+### the scatter matrix shows all pairs in one figure, large data sets are reduced ###
+
+# test for the layout of the scatter matrix
+def test_scatter_matrix_plot(final_data):
+    """
+    Tests whether all pairs of variables are drawn in one figure with shared axes and
+    rasterized point layers containing all observations.
+    """
+    fig = scatter_matrix_plot(final_data)
+    axes = fig.axes
+    assert len(axes) == len(x_variables) * len(y_variables)
+    # panels in the same column share the horizontal axis, panels in the same row the vertical one
+    assert axes[0].get_shared_x_axes().joined(axes[0], axes[len(x_variables)])
+    assert axes[0].get_shared_y_axes().joined(axes[0], axes[1])
+    for ax in axes:
+        (points,) = [c for c in ax.collections if isinstance(c, PathCollection)]
+        assert points.get_rasterized()
+        assert len(points.get_offsets()) == len(final_data)
+
+
+# test for the subsample and the hexagonal bins of large data sets
+def test_scatter_matrix_plot_large_data(final_data):
+    """
+    Tests whether at most max_points points are drawn for larger data sets, and hexagonal
+    bins instead of points for data sets above density_points observations.
+    """
+    large_data = final_data.sample(1000, replace=True, random_state=0)
+    fig = scatter_matrix_plot(large_data, max_points=100)
+    for ax in fig.axes:
+        (points,) = ax.collections
+        assert len(points.get_offsets()) == 100
+
+    fig = scatter_matrix_plot(large_data, max_points=100, density_points=500)
+    for ax in fig.axes:
+        (bins,) = ax.collections
+        assert isinstance(bins, PolyCollection)
+        assert bins.get_rasterized()
+        assert bins.get_array().max() > 1
@@ -0,0 +1,92 @@
+"""Tests for the incremental build of the presentation."""
+
+### packages ###
+import json
+import shutil
+
+### functions tested ###
+from financial_development_and_income_inequality.config import BLD, PAPER_DIR
+from financial_development_and_income_inequality.final.document_build import (
+    build_document,
+    document_inputs,
+    undeclared_inputs,
+)
+
+### document of the presentation ###
+document = PAPER_DIR / "financial_development_and_income_inequality_pres.tex"
+
+
+### the inputs of the document are found and the document is only built if they change ###
+
+# test for the inputs of the presentation
+def test_document_inputs():
+    """
+    Tests whether the bibliography, figures and tables included into the presentation are found.
+    """
+    assert document_inputs(document) == [
+        PAPER_DIR / "refs.bib",
+        BLD / "python" / "figures" / "labor_cost_increase.png",
+        BLD / "python" / "figures" / "foreign_banks_presence.png",
+        BLD / "latex" / "tables" / "ols_baseline.tex",
+        BLD / "latex" / "tables" / "fixed_effects_baseline.tex",
+    ]
+
+
+# test for the inputs which are not declared as dependencies
+def test_undeclared_inputs(tmp_path):
+    """
+    Tests whether an input added to the document after its dependencies were collected is found.
+    """
+    tex_path = tmp_path / "document.tex"
+    tex_path.write_text("\\input{table}\n")
+    declared = document_inputs(tex_path)
+    assert undeclared_inputs(tex_path, declared) == []
+    tex_path.write_text("\\input{table}\n\\includegraphics[width=1cm]{figure.png}\n")
+    assert undeclared_inputs(tex_path, declared) == [tmp_path / "figure.png"]
+
+
+# test for the incremental build
+def test_build_document(tmp_path):
+    """
+    Tests whether the document is only compiled if the document or one of its inputs changes,
+    and whether the preamble is only precompiled if it changes.
+    """
+    tex_path = tmp_path / "source" / "document.tex"
+    tex_path.parent.mkdir()
+    table = tmp_path / "source" / "table.tex"
+    table.write_text("1 & 2")
+    tex_path.write_text(
+        "\\documentclass{article}\n\\begin{document}\n\\input{table}\n% \\input{old}\n"
+        "\\end{document}\n",
+    )
+    calls = []
+
+    def format_builder(tex_path, build_dir):
+        calls.append("format")
+        (build_dir / "document_preamble.fmt").write_text("")
+        return build_dir / "document_preamble"
+
+    def compiler(tex_path, build_dir, format_path):
+        calls.append("compile")
+        assert format_path == build_dir / "document_preamble"
+        (build_dir / "document.pdf").write_text(table.read_text())
+
+    build_dir = tmp_path / "build"
+    kwargs = {"format_builder": format_builder, "compiler": compiler}
+    assert build_document(tex_path, build_dir, **kwargs)["format_built"]
+    assert not build_document(tex_path, build_dir, **kwargs)["compiled"]
+    assert calls == ["format", "compile"]
+
+    # changing an input compiles the document with the precompiled preamble
+    table.write_text("1 & 3")
+    report = build_document(tex_path, build_dir, **kwargs)
+    assert report["compiled"] and not report["format_built"]
+    assert calls == ["format", "compile", "compile"]
+    stored = json.loads((build_dir / "document_build_report.json").read_text())
+    assert set(stored) >= {"hash_seconds", "format_seconds", "compile_seconds"}
+
+    # changing the preamble precompiles it again
+    tex_path.write_text("\\usepackage{booktabs}\n" + tex_path.read_text())
+    assert build_document(tex_path, build_dir, **kwargs)["format_built"]
+    assert calls[-2:] == ["format", "compile"]
+    shutil.rmtree(build_dir)
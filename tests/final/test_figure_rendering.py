@@ -0,0 +1,100 @@
+"""Tests for the rendering of the figures depicting the descriptive statistics."""
+
+### packages ###
+import matplotlib
+import matplotlib.pyplot as plt
+
+### functions tested ###
+from financial_development_and_income_inequality.final.figure_rendering import (
+    figure_key,
+    render_figure,
+    render_figures,
+)
+from financial_development_and_income_inequality.final.task_plots import figures
+
+
+### the figures are rendered without pyplot, serially, in parallel and with a render cache ###
+
+# test for the lifecycle of a single figure
+def test_render_figure(final_data, tmp_path):
+    """
+    Tests whether a figure is saved, is not registered by pyplot and is cleared after saving.
+    """
+    created = []
+
+    def plot(data, **kwargs):
+        fig = figures[0][1](data, **kwargs)
+        created.append(fig)
+        return fig
+
+    path = render_figure(plot, final_data, tmp_path / "figure.png")
+    assert path.stat().st_size > 0
+    assert plt.get_fignums() == []
+    assert created[0].axes == []
+
+
+# test for the parallel rendering of all figures
+def test_render_figures(final_data, tmp_path):
+    """
+    Tests whether the figures rendered in a process pool are identical to the ones rendered
+    one by one.
+    """
+    paths = {}
+    for n_workers in [1, 2]:
+        paths[n_workers] = render_figures(
+            [
+                (plot, kwargs, tmp_path / f"{name}_{n_workers}.png", columns)
+                for name, plot, kwargs, columns in figures
+            ],
+            final_data,
+            n_workers,
+        )
+    assert len(paths[1]) == len(figures) == 12
+    for serial, parallel in zip(paths[1], paths[2]):
+        assert serial.read_bytes() == parallel.read_bytes()
+
+
+# test for the render cache
+def test_render_cache(final_data, tmp_path):
+    """
+    Tests whether only the figures plotting changed variables are rendered again.
+    """
+    jobs = [
+        (plot, kwargs, tmp_path / f"{name}.png", columns)
+        for name, plot, kwargs, columns in figures
+    ]
+    cache = tmp_path / "render_cache.json"
+    assert len(render_figures(jobs, final_data, cache=cache)) == 12
+    assert render_figures(jobs, final_data, cache=cache) == []
+    # a variable which is not plotted
+    final_data["GDP_nom"] = final_data["GDP_nom"] + 1
+    assert render_figures(jobs, final_data, cache=cache) == []
+    # a variable of the foreign banks plot and a deleted figure
+    final_data["fb_num"] = final_data["fb_num"] + 1
+    (tmp_path / "scatter_plot1.png").unlink()
+    assert render_figures(jobs, final_data, cache=cache) == [
+        tmp_path / "foreign_banks_presence.png",
+        tmp_path / "scatter_plot1.png",
+    ]
+
+
+### the dependencies of a figure are its plotted variables, plot function and settings ###
+
+# test for the plotted variables and the key of a figure
+def test_figure_key(final_data):
+    """
+    Tests whether the declared variables of every figure are all the plot function needs,
+    and whether the key of a figure only depends on these variables and on the matplotlib
+    settings.
+    """
+    for _, plot, kwargs, columns in figures:
+        plot(final_data[columns], **kwargs).clear()
+    _, plot, kwargs, columns = figures[0]
+    assert columns == ["Year", "fin", "pc", "peh", "all"]
+    key = figure_key(plot, final_data, kwargs, columns)
+    changed = final_data.assign(GDP_nom=final_data["GDP_nom"] + 1)
+    assert figure_key(plot, changed, kwargs, columns) == key
+    changed = final_data.assign(fin=final_data["fin"] + 1)
+    assert figure_key(plot, changed, kwargs, columns) != key
+    with matplotlib.rc_context({"lines.linewidth": 3}):
+        assert figure_key(plot, final_data, kwargs, columns) != key
@@ -0,0 +1,153 @@
+"""Tests for the table engine of the OLS and time fixed effects models."""
+
+### packages ###
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+### functions tested ###
+from financial_development_and_income_inequality.analysis.estimates_store import (
+    combine_stores,
+    estimates_to_store,
+)
+from financial_development_and_income_inequality.analysis.fixed_effects_model import (
+    run_fixed_effects_model,
+)
+from financial_development_and_income_inequality.analysis.ols_model import (
+    run_ols_model,
+    run_ols_model_robust,
+)
+
+### folder and function used for creating the finalized version of the data set ###
+from financial_development_and_income_inequality.final.tables_estimates_models import (
+    estimates_table,
+    latex_estimates_table,
+    table_to_csv,
+    table_to_latex,
+    table_to_markdown,
+    write_if_changed,
+)
+from financial_development_and_income_inequality.final.task_tables import row_names
+
+
+### estimates store containing the baseline regressions and robustness checks of both models ###
+@pytest.fixture()
+def store(final_data):
+    return combine_stores(
+        estimates_to_store(
+            {
+                "ols_model_estimates": run_ols_model(final_data),
+                "ols_model_estimates_robust_checks": run_ols_model_robust(
+                    final_data,
+                ),
+            },
+            model="ols",
+        ),
+        estimates_to_store(
+            {"fixed_effects_model_estimates": run_fixed_effects_model(final_data)},
+            model="fixed_effects",
+        ),
+    )
+
+
+### the tables are built from the arrays of the store for any number of specifications ###
+
+# test for the table engine
+def test_estimates_table(store):
+    """
+    Tests whether the table contains the coefficients, R-squared values and numbers of
+    observations of every selected specification, whether coefficients which are not
+    identified are NaN, and whether columns with the same outcome variable are named by all
+    metadata fields.
+    """
+    table = estimates_table(store, row_names, model="fixed_effects")
+    assert list(table.columns) == list(store["outcome"][-3:])
+    assert list(table.index) == row_names + ["R^2", "N"]
+    not_identified = np.isin(
+        row_names, ["fin_dev_all", "fin_dev_db", "fin_dev_fb", "edu_att"]
+    )
+    assert table.loc[np.array(row_names)[not_identified]].isna().all(axis=None)
+    np.testing.assert_array_equal(
+        table.loc[np.array(row_names)[~not_identified]].T,
+        store["coefficients"][-3:, ~not_identified],
+    )
+    np.testing.assert_array_equal(table.loc["N"], store["nobs"][-3:])
+
+    table = estimates_table(store, row_names + ["missing"], outcome="fin_diff_all_lead")
+    assert list(table.columns) == [
+        "ols/ols_model_estimates/fin_diff_all_lead",
+        "fixed_effects/fixed_effects_model_estimates/fin_diff_all_lead",
+    ]
+    assert table.loc["missing"].isna().all()
+    np.testing.assert_array_equal(table.loc["R^2"], store["rsquared"][[0, 6]])
+
+
+# test for the csv, latex and markdown outputs
+def test_table_writers(store):
+    """
+    Tests whether the csv output is a machine-readable csv file with unrounded values (and
+    empty cells for coefficients which are not identified), and whether the latex and
+    markdown outputs contain all rows of the table.
+    """
+    table = estimates_table(store, row_names, model="ols", group="ols_model_estimates")
+    parsed = pd.read_csv(io.StringIO(table_to_csv(table)), index_col="variable")
+    pd.testing.assert_frame_equal(parsed, table, check_names=False)
+    assert parsed.loc[["fin_dev_all", "fin_dev_db", "fin_dev_fb"]].isna().all(axis=None)
+    assert (parsed.loc["N"] == 120).all()
+
+    latex = table_to_latex(table)
+    assert latex.count(r" \\") == len(table) + 1
+    assert r"fin\_dev\_db" in latex and r"R$^2$" in latex
+    assert len(table_to_markdown(table).splitlines()) == len(table) + 2
+
+
+# test for the latex tables with standard errors and significance stars
+def test_latex_estimates_table(store, tmp_path):
+    """
+    Tests whether the standard errors are shown below the coefficients, whether the stars
+    follow the t-tests of the coefficients and whether unchanged tables are not rewritten.
+    """
+    criteria = {"model": "ols", "group": "ols_model_estimates"}
+    latex = latex_estimates_table(store, row_names, **criteria)
+    lines = latex.splitlines()
+    row = lines.index(next(line for line in lines if line.startswith("FSI &")))
+    coefficient, std_error = store["coefficients"][0, 6], store["std_errors"][0, 6]
+    assert lines[row].split(" & ")[1].startswith(f"{coefficient:.3f}")
+    assert lines[row + 1].split(" & ")[1] == f"({std_error:.3f})"
+    t_value = abs(coefficient / std_error)
+    assert ("$^{***}$" in lines[row].split(" & ")[1]) == (
+        t_value > stats.t.ppf(0.995, store["df_resid"][0])
+    )
+
+    path = tmp_path / "ols_baseline.tex"
+    assert write_if_changed(path, latex)
+    modified = path.stat().st_mtime_ns
+    assert not write_if_changed(path, latex)
+    assert path.stat().st_mtime_ns == modified
+    assert write_if_changed(path, latex + "%")
+
+
+# test for the coefficients which are not identified, labels and highlighted variables
+def test_latex_estimates_table_not_identified(store):
+    """
+    Tests whether coefficients of collinear variables (the financial development variables, and edu_att
+    in the time fixed effects model) are shown as "--" without standard errors and stars, explained in
+    the footnote, and whether labels and highlighting are applied.
+    """
+    latex = latex_estimates_table(
+        store,
+        row_names,
+        labels={"edu_att": "educ_att"},
+        highlight=["fin_dev_all"],
+        model="fixed_effects",
+    )
+    lines = latex.splitlines()
+    for label in [r"\alert{fin\_dev\_all}", r"fin\_dev\_db", "educ\\_att"]:
+        row = next(line for line in lines if line.startswith(label + " &"))
+        assert row == label + " & -- & -- & --" + r" \\"
+    assert "not identified" in lines[-2]
+    row = lines.index(next(line for line in lines if line.startswith("GDP\\_nom &")))
+    assert lines[row + 1].startswith(" & (")
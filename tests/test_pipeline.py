@@ -0,0 +1,106 @@
+"""Tests for running the whole project in memory."""
+
+### packages ###
+import numpy as np
+import pytest
+from pandas.testing import assert_frame_equal
+
+### folder, modules and functions used for creating the results step by step ###
+from financial_development_and_income_inequality.analysis import least_squares
+from financial_development_and_income_inequality.config import SRC
+from financial_development_and_income_inequality.data_management.columnar_storage import (
+    load_data_set,
+)
+from financial_development_and_income_inequality.data_management.data_set_management import (
+    generate_variables,
+)
+from financial_development_and_income_inequality.data_management.task_data_set_management import (
+    sectors_percentage_increase_calculation,
+    sectors_percentage_increase_diff,
+    target_col,
+)
+
+### functions tested ###
+from financial_development_and_income_inequality.pipeline import run_pipeline
+from financial_development_and_income_inequality.stage_cache import StageCache
+
+
+### results of the whole pipeline ###
+@pytest.fixture(scope="module")
+def results():
+    return run_pipeline()
+
+
+### the pipeline gives the same results as the tasks, with and without stage cache ###
+
+# test for the results of the pipeline
+def test_run_pipeline(results):
+    """
+    Tests whether the data sets are identical to the ones created by the tasks, and whether the tables
+    contain the estimates of the store.
+    """
+    initial_data_set = load_data_set(SRC / "data" / "initial_data_set.arrow")
+    assert_frame_equal(results["initial_data_set"], initial_data_set)
+    assert_frame_equal(
+        results["final_data_set"],
+        generate_variables(
+            initial_data_set,
+            sectors_percentage_increase_calculation,
+            sectors_percentage_increase_diff,
+            target_col,
+        ),
+    )
+    estimates = results["estimates"]
+    table = results["tables"]["ols_baseline"]
+    row = list(estimates["group"]).index("ols_model_estimates")
+    column = list(estimates["terms"]).index("GDP_nom")
+    assert table.loc["GDP_nom"].iloc[0] == estimates["coefficients"][row, column]
+    assert set(results["latex_tables"]) == set(results["tables"])
+    assert set(results["timings"]) == {
+        "data_creation",
+        "generate_variables",
+        "estimation",
+        "tables",
+    }
+
+
+# test for the pipeline with a stage cache and changed parameters
+def test_run_pipeline_cache(results, tmp_path):
+    """
+    Tests whether a repeated run with a stage cache only loads stored results, with identical tables,
+    and whether changing a parameter computes the stages depending on it again.
+    """
+    cache = StageCache(tmp_path)
+    run_pipeline({"cache": cache})
+    misses = cache.misses
+    cached = run_pipeline({"cache": cache})
+    assert cache.misses == misses
+    for name, table in results["tables"].items():
+        assert_frame_equal(cached["tables"][name], table)
+    changed = run_pipeline({"cache": cache, "row_names": ["GDP_nom"]})
+    assert cache.misses == misses + 2 * len(results["tables"])
+    assert np.array_equal(
+        changed["tables"]["ols_baseline"].loc["GDP_nom"],
+        results["tables"]["ols_baseline"].loc["GDP_nom"],
+    )
+
+
+# test for the pipeline with a stage cache and a changed helper module
+def test_run_pipeline_cache_helper(results, tmp_path, monkeypatch):
+    """
+    Tests whether the stored estimates are not reused if the control variables of the models (defined in
+    a helper module of the model functions) change, and whether the tables then contain the new results.
+    """
+    cache = StageCache(tmp_path)
+    run_pipeline({"cache": cache})
+    misses = cache.misses
+    monkeypatch.setattr(
+        least_squares,
+        "control_variables",
+        [c for c in least_squares.control_variables if c != "edu_att"],
+    )
+    changed = run_pipeline({"cache": cache})
+    # the four model runs and all tables (with new estimates) are computed again
+    assert cache.misses == misses + 4 + 2 * len(results["tables"])
+    assert np.isnan(changed["tables"]["ols_baseline"].loc["edu_att"]).all()
+    assert not np.isnan(results["tables"]["ols_baseline"].loc["edu_att"]).any()
@@ -0,0 +1,199 @@
+"""Tests for the memoization of the stage results."""
+
+### packages ###
+import importlib.util
+import pickle
+import subprocess
+import sys
+import time
+
+from pandas.testing import assert_frame_equal
+
+### folder and functions used for creating the finalized version of the data set ###
+from financial_development_and_income_inequality.data_management.columnar_storage import (
+    load_data_set,
+)
+from financial_development_and_income_inequality.data_management.data_set_management import (
+    generate_variables,
+)
+from financial_development_and_income_inequality.data_management.task_data_set_management import (
+    sectors_percentage_increase_calculation,
+    sectors_percentage_increase_diff,
+    target_col,
+)
+
+### modules and functions used by the model stages ###
+from financial_development_and_income_inequality.analysis import least_squares
+from financial_development_and_income_inequality.analysis.ols_model import run_ols_model
+from financial_development_and_income_inequality.final.tables_estimates_models import (
+    estimates_table,
+)
+
+### functions tested ###
+from financial_development_and_income_inequality.stage_cache import (
+    PACKAGE,
+    StageCache,
+    stage_key,
+)
+
+
+### the results are keyed by the content of the inputs and reused ###
+
+# test for the keys of the stage results
+def test_stage_key(initial_data_set, tmp_path):
+    """
+    Tests whether the key depends on the content of the arguments (not on how they are passed) and on the
+    content of the files passed as paths.
+    """
+    args = (
+        initial_data_set,
+        sectors_percentage_increase_calculation,
+        sectors_percentage_increase_diff,
+    )
+    key = stage_key(generate_variables, args, {"target_col": target_col})
+    assert key == stage_key(
+        generate_variables,
+        (initial_data_set.copy(), sectors_percentage_increase_calculation),
+        {
+            "sectors_percentage_increase_diff": sectors_percentage_increase_diff,
+            "target_col": target_col,
+            "deflation": None,
+        },
+    )
+    assert key != stage_key(generate_variables, args, {"target_col": "all"})
+    changed_data = initial_data_set.copy()
+    changed_data.loc[0, "FSI"] += 1
+    assert key != stage_key(
+        generate_variables,
+        (changed_data,) + args[1:],
+        {"target_col": target_col},
+    )
+    # paths are keyed by the content of the file
+    path = tmp_path / "file.csv"
+    path.write_text("1")
+    key = stage_key(load_data_set, (path,))
+    path.write_text("2")
+    assert key != stage_key(load_data_set, (path,))
+
+
+# test for the keys of stages using helper modules
+def test_stage_key_helpers(tmp_path, monkeypatch):
+    """
+    Tests whether the key changes if a helper module imported by the stage (directly or transitively)
+    is edited, or if a module level parameter of a helper (e.g. the control variables) changes.
+    """
+    # a stage importing a helper module of the project
+    modules = {
+        "helper": "scale = 2\n\ndef double(x):\n    return scale * x\n",
+        "stage": f"from {PACKAGE}.helper import double\n\ndef stage(x):\n    return double(x)\n",
+    }
+    for name, source in modules.items():
+        (tmp_path / f"{name}.py").write_text(source)
+        spec = importlib.util.spec_from_file_location(
+            f"{PACKAGE}.{name}",
+            tmp_path / f"{name}.py",
+        )
+        module = importlib.util.module_from_spec(spec)
+        monkeypatch.setitem(sys.modules, spec.name, module)
+        spec.loader.exec_module(module)
+    stage = sys.modules[f"{PACKAGE}.stage"].stage
+    key = stage_key(stage, (1,))
+    (tmp_path / "helper.py").write_text(modules["helper"].replace("2", "3"))
+    time.sleep(0.01)
+    assert key != stage_key(stage, (1,))
+
+    # the control variables of the models
+    key = stage_key(run_ols_model, (None,))
+    monkeypatch.setattr(
+        least_squares,
+        "control_variables",
+        least_squares.control_variables[:-1],
+    )
+    assert key != stage_key(run_ols_model, (None,))
+
+
+# test for the keys in several processes
+def test_stage_key_processes():
+    """
+    Tests whether the key of a stage whose modules contain functions as parameters (e.g. the writers
+    of the tables) is identical in another process.
+    """
+    code = (
+        "from financial_development_and_income_inequality.final.tables_estimates_models import estimates_table;"
+        "from financial_development_and_income_inequality.stage_cache import stage_key;"
+        "print(stage_key(estimates_table, ({},)))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert output.strip() == stage_key(estimates_table, ({},))
+
+
+# test for the memoization of a stage
+def test_stage_cache_call(initial_data_set, tmp_path):
+    """
+    Tests whether a stage is computed only once for identical inputs, and whether the stored result is
+    identical to the computed one.
+    """
+    cache = StageCache(tmp_path)
+    args = (
+        sectors_percentage_increase_calculation,
+        sectors_percentage_increase_diff,
+        target_col,
+    )
+    # generate_variables adds the variables to the given data set, hence copies are passed
+    computed = cache.call(generate_variables, initial_data_set.copy(), *args)
+    stored = cache.call(generate_variables, initial_data_set.copy(), *args)
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert_frame_equal(stored, computed)
+    # a second cache sharing the directory reuses the result
+    shared_cache = StageCache(tmp_path)
+    shared_cache.call(generate_variables, initial_data_set.copy(), *args)
+    assert shared_cache.hits == 1
+
+
+# test for stored results which cannot be loaded anymore
+def test_stage_cache_stale(tmp_path):
+    """
+    Tests whether stored results which cannot be unpickled (incomplete files and pickles of
+    modules which do not exist anymore) are deleted and computed again.
+    """
+
+    def stage(x):
+        return x + 1
+
+    cache = StageCache(tmp_path)
+    path = tmp_path / f"{stage_key(stage, (1,))}.pkl"
+    # a pickle of a global of a missing module, and an incomplete pickle
+    for content in [b"cmissing_module\nmissing\n.", pickle.dumps(2)[:-3]]:
+        path.write_bytes(content)
+        assert cache.call(stage, 1) == 2
+        assert pickle.loads(path.read_bytes()) == 2
+    assert (cache.misses, cache.hits) == (2, 0)
+    assert cache.call(stage, 1) == 2 and cache.hits == 1
+
+
+# test for the least recently used eviction
+def test_stage_cache_evict(tmp_path):
+    """
+    Tests whether the least recently used results are deleted once the total size exceeds the cap.
+    """
+
+    def stage(size):
+        return bytes(size)
+
+    cache = StageCache(tmp_path, max_bytes=10**6)
+    for size in [400000, 400001]:
+        cache.call(stage, size)
+        time.sleep(0.01)
+    # using the first result again, such that the second one is the least recently used
+    cache.call(stage, 400000)
+    time.sleep(0.01)
+    cache.call(stage, 400002)
+    assert (cache.misses, cache.hits) == (3, 1)
+    assert [path for path, _, _ in cache.entries()] == [
+        tmp_path / f"{stage_key(stage, (size,))}.pkl" for size in [400000, 400002]
+    ]